@@ -9,16 +9,24 @@ class PurePythonAutoplannerService {
     private string $scriptPath;
     private string $tempDir;
     private int $timeoutSeconds;
+    private ?string $daemonAddress;
     
+    /**
+     * $daemonAddress points at a running `pure_autoplanner.py --serve`, either
+     * http://127.0.0.1:8765 or unix:///path/to/planner.sock (default: $JURY_PLANNER_DAEMON).
+     * Without a reachable daemon every request starts its own Python process.
+     */
     public function __construct(
         ?string $pythonExecutable = null, 
         ?string $scriptPath = null,
-        int $timeoutSeconds = 600
+        int $timeoutSeconds = 600,
+        ?string $daemonAddress = null
     ) {
         $this->pythonExecutable = $pythonExecutable ?? $this->findPythonExecutable();
         $this->scriptPath = $scriptPath ?? __DIR__ . '/../planning_engine/pure_autoplanner.py';
         $this->tempDir = sys_get_temp_dir();
         $this->timeoutSeconds = $timeoutSeconds;
+        $this->daemonAddress = $daemonAddress ?? (getenv('JURY_PLANNER_DAEMON') ?: null);
     }
     
     /**
@@ -34,22 +42,28 @@ class PurePythonAutoplannerService {
             // Prepare optimization request
             $request = $this->buildOptimizationRequest($teams, $matches, $constraints, $config);
             
-            // Create temporary files for communication
-            $inputFile = $this->createTempFile('autoplanner_input_', '.json');
-            $outputFile = $this->createTempFile('autoplanner_output_', '.json');
-            
-            // Write request to input file
-            file_put_contents($inputFile, json_encode($request, JSON_PRETTY_PRINT));
-            
-            // Build and execute Python command
-            $command = $this->buildPythonCommand($inputFile, $outputFile, $config);
-            $output = $this->executePythonScript($command);
-            
-            // Read and parse results
-            $result = $this->parseOptimizationResult($outputFile);
-            
-            // Cleanup
-            $this->cleanupTempFiles([$inputFile, $outputFile]);
+            // Prefer the running daemon, it answers in solver time only
+            $result = $this->requestFromDaemon($request, $config);
+            if ($result !== null) {
+                $output = ['daemon' => $this->daemonAddress];
+            } else {
+                // Create temporary files for communication
+                $inputFile = $this->createTempFile('autoplanner_input_', '.json');
+                $outputFile = $this->createTempFile('autoplanner_output_', '.json');
+                
+                // Write request to input file
+                file_put_contents($inputFile, json_encode($request, JSON_PRETTY_PRINT));
+                
+                // Build and execute Python command
+                $command = $this->buildPythonCommand($inputFile, $outputFile, $config);
+                $output = $this->executePythonScript($command);
+                
+                // Read and parse results
+                $result = $this->parseOptimizationResult($outputFile);
+                
+                // Cleanup
+                $this->cleanupTempFiles([$inputFile, $outputFile]);
+            }
             
             return [
                 'success' => true,
@@ -204,9 +218,104 @@ class PurePythonAutoplannerService {
             $args[] = '--verbose';
         }
         
+        // Cached plans are reused unless explicitly disabled
+        if (isset($config['use_cache']) && !$config['use_cache']) {
+            $args[] = '--no-cache';
+        }
+        
         return implode(' ', $args);
     }
     
+    /**
+     * Solve through the planner daemon; null when no daemon is configured or reachable
+     */
+    private function requestFromDaemon(array $request, array $config): ?array {
+        // Same options as buildPythonCommand passes on the command line
+        $query = [];
+        if (!empty($config['solver_type'])) {
+            $query['solver'] = $config['solver_type'];
+        }
+        if (!empty($config['time_limit_seconds'])) {
+            $query['time_limit'] = (int)$config['time_limit_seconds'];
+        }
+        if (isset($config['use_cache']) && !$config['use_cache']) {
+            $query['no_cache'] = 1;
+        }
+        
+        $path = '/optimize' . ($query ? '?' . http_build_query($query) : '');
+        $result = $this->callDaemon('POST', $path, json_encode($request), $this->timeoutSeconds);
+        if ($result === null) {
+            return null;
+        }
+        
+        return $this->validateOptimizationResult($result);
+    }
+    
+    /**
+     * Health of the planner daemon, or null when it is not running
+     */
+    public function getDaemonHealth(): ?array {
+        try {
+            return $this->callDaemon('GET', '/health', null, 5);
+        } catch (Exception $e) {
+            error_log("Python Autoplanner daemon health check failed: " . $e->getMessage());
+            return null;
+        }
+    }
+    
+    /**
+     * Send a request to the planner daemon; null when it cannot be reached
+     */
+    private function callDaemon(string $method, string $path, ?string $body, int $timeoutSeconds): ?array {
+        if ($this->daemonAddress === null || !function_exists('curl_init')) {
+            return null;
+        }
+        
+        $socketPath = null;
+        if (strpos($this->daemonAddress, 'unix://') === 0) {
+            $socketPath = substr($this->daemonAddress, strlen('unix://'));
+            $url = 'http://localhost' . $path;
+        } else {
+            $url = rtrim($this->daemonAddress, '/') . $path;
+        }
+        
+        $curl = curl_init($url);
+        curl_setopt_array($curl, [
+            CURLOPT_RETURNTRANSFER => true,
+            CURLOPT_CUSTOMREQUEST => $method,
+            CURLOPT_CONNECTTIMEOUT => 2,
+            CURLOPT_TIMEOUT => $timeoutSeconds,
+            CURLOPT_HTTPHEADER => ['Content-Type: application/json']
+        ]);
+        if ($socketPath !== null) {
+            curl_setopt($curl, CURLOPT_UNIX_SOCKET_PATH, $socketPath);
+        }
+        if ($body !== null) {
+            curl_setopt($curl, CURLOPT_POSTFIELDS, $body);
+        }
+        
+        $response = curl_exec($curl);
+        $errno = curl_errno($curl);
+        $error = curl_error($curl);
+        curl_close($curl);
+        
+        if ($response === false) {
+            // Not running: fall back to starting Python per request
+            if (in_array($errno, [CURLE_COULDNT_CONNECT, CURLE_COULDNT_RESOLVE_HOST], true)) {
+                error_log("Python Autoplanner daemon not reachable at {$this->daemonAddress}, starting Python instead");
+                return null;
+            }
+            throw new Exception("Python autoplanner daemon request failed: $error");
+        }
+        
+        $result = json_decode($response, true);
+        if (json_last_error() !== JSON_ERROR_NONE) {
+            throw new Exception("Invalid JSON from Python autoplanner daemon: " . json_last_error_msg());
+        }
+        
+        return $result;
+    }
+    
     /**
      * Execute Python script with timeout
      */
@@ -279,6 +388,13 @@ class PurePythonAutoplannerService {
             throw new Exception("Invalid JSON in Python script output: " . json_last_error_msg());
         }
         
+        return $this->validateOptimizationResult($result);
+    }
+    
+    /**
+     * Throw for a result that reports a failed optimization
+     */
+    private function validateOptimizationResult(array $result): array {
         if (!$result['success']) {
             $errors = $result['errors'] ?? ['Unknown optimization error'];
             throw new Exception("Python optimization failed: " . implode(', ', $errors));
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Scaling Benchmark for the Planning Engines
+Sweeps synthetic seasons through each engine and records build time, solve time,
+time to first feasible solution, objective, gap and peak RSS in a baseline JSON
+"""
+
+import json
+import sys
+import os
+import io
+import time
+import logging
+import argparse
+import itertools
+import importlib.util
+import multiprocessing
+import resource
+import tempfile
+import contextlib
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Dict, List, Any
+from dataclasses import asdict
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ortools.sat.python import cp_model
+from planning_engine.season_generator import SeasonSpec, generate_season
+from planning_engine.stopping_policy import StoppingPolicy, SolutionTracker
+from planning_engine.solver_selector import SolveHistory, ProblemFeatures
+
+SEASON_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'wp-juryv1.0.py')
+
+ENGINES = ['season', 'autoplanner', 'autoplanner-mip', 'enhanced', 'scheduler']
+
+# Relative slowdown / objective loss against the baseline that counts as a regression
+DEFAULT_REGRESSION_TOLERANCE = 0.25
+
+# Objectives of the two autoplanner back ends closer than this count as equal
+BACKEND_OBJECTIVE_TOLERANCE = 1e-6
+
+def run_season_engine(season, time_limit: float) -> Dict[str, Any]:
+    """wp-juryv1.0.py: timings come from its own --build-report output"""
+    spec = importlib.util.spec_from_file_location('wp_jury', SEASON_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    report_path = os.path.join(os.getcwd(), 'model_report.json')
+    plan = module.assign_jury_teams_to_matches(**season.season_inputs(), time_limit=time_limit, hint_mode='off',
+                                               seed=season.spec.seed, build_report=report_path)
+    with open(report_path) as f:
+        report = json.load(f)
+    solve = report['solve']
+    return {
+        'status': solve['status'],
+        'build_time': solve['build_time'],
+        'solve_time': solve['solve_time'],
+        'first_solution_time': solve.get('first_solution_time'),
+        'objective': solve['objective'],
+        'gap': solve.get('final_gap'),
+        'stop_reason': solve.get('stop_reason'),
+        'assignments': len(plan) if plan else 0,
+        'variables': report['model']['variables'],
+        'constraints': report['model']['constraints'],
+    }
+
+def run_autoplanner_engine(season, time_limit: float) -> Dict[str, Any]:
+    """pure_autoplanner.py CP-SAT path, with the same solver settings as the service"""
+    from planning_engine.pure_autoplanner import PureJuryOptimizer, SolverType, parse_request_from_json
+
+    request = parse_request_from_json(json.dumps(season.autoplanner_request(int(time_limit))))
+    optimizer = PureJuryOptimizer(SolverType.CONSTRAINT_SAT)
+
+    started = time.perf_counter()
+    model, team_assignments = optimizer._build_cp_sat_model(request)
+    build_time = time.perf_counter() - started
+
+    solver = cp_model.CpSolver()
+    policy = StoppingPolicy.from_config(request.solver_config, max_time_seconds=request.time_limit_seconds)
+    status, outcome = policy.solve(solver, model, SolutionTracker())
+    solved = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+    return {
+        'status': solver.StatusName(status),
+        'build_time': build_time,
+        'solve_time': solver.WallTime(),
+        'first_solution_time': outcome['first_solution_time'],
+        'objective': outcome['objective'],
+        'gap': outcome['final_gap'],
+        'stop_reason': outcome['stop_reason'],
+        'assignments': sum(solver.Value(var) for var in team_assignments.values()) if solved else 0,
+        'variables': len(model.Proto().variables),
+        'constraints': len(model.Proto().constraints),
+        'features': asdict(optimizer._problem_features(request)),
+    }
+
+def run_autoplanner_mip_engine(season, time_limit: float) -> Dict[str, Any]:
+    """pure_autoplanner.py MIP path (SCIP) on the same request as run_autoplanner_engine"""
+    from planning_engine.pure_autoplanner import PureJuryOptimizer, SolverType, parse_request_from_json
+    from ortools.linear_solver import pywraplp
+
+    request = parse_request_from_json(json.dumps(season.autoplanner_request(int(time_limit))))
+    optimizer = PureJuryOptimizer(SolverType.LINEAR)
+
+    started = time.perf_counter()
+    solver = pywraplp.Solver.CreateSolver('SCIP')
+    team_assignments = optimizer._build_linear_model(solver, request)
+    build_time = time.perf_counter() - started
+
+    result = optimizer._solve_linear_model(solver, request, team_assignments)
+    return {
+        'status': result.solver_status,
+        'build_time': build_time,
+        'solve_time': result.solver_time_seconds,
+        'first_solution_time': None,
+        'objective': result.objective_value if result.success else None,
+        'gap': result.metadata['final_gap'],
+        'stop_reason': result.metadata['stop_reason'],
+        'assignments': len(result.assignments),
+        'variables': solver.NumVariables(),
+        'constraints': solver.NumConstraints(),
+        'features': asdict(optimizer._problem_features(request)),
+    }
+
+def run_enhanced_engine(season, time_limit: float) -> Dict[str, Any]:
+    """enhanced_optimizer.py on the PHP export format"""
+    from planning_engine.enhanced_optimizer import EnhancedJuryOptimizer, SolverType
+
+    export_path = os.path.join(os.getcwd(), 'php_export.json')
+    with open(export_path, 'w') as f:
+        json.dump(season.php_export(), f)
+    optimizer = EnhancedJuryOptimizer(SolverType.CONSTRAINT_SAT, StoppingPolicy().with_time_limit(time_limit))
+    optimizer.load_from_php_export(export_path)
+    result = optimizer.optimize_assignments()
+    return {
+        'status': result.metadata.get('solver_status', 'unknown').upper(),
+        'build_time': None,
+        'solve_time': result.solver_time,
+        'first_solution_time': None,
+        'objective': result.optimization_score if result.success else None,
+        'gap': result.metadata.get('final_gap'),
+        'stop_reason': result.metadata.get('stop_reason'),
+        'assignments': len(result.assignments),
+    }
+
+def run_scheduler_engine(season, time_limit: float) -> Dict[str, Any]:
+    """scheduler.py JuryPlanningEngine on model-like objects built from the season"""
+    from planning_engine.scheduler import JuryPlanningEngine
+    # setup_problem logs and swallows errors, so check its backend models import up front
+    importlib.import_module('backend.models')
+
+    teams = [SimpleNamespace(id=team['team_id'], name=team['team_name'], is_active=True, weight=1.0)
+             for team in season.jury_teams if team['team_id'] != 99]
+    matches = [SimpleNamespace(id=match['match_id'], date=match['match_date'],
+                               home_team_id=None, away_team_id=None)
+               for match in season.home_matches]
+    engine = JuryPlanningEngine(StoppingPolicy().with_time_limit(time_limit))
+    started = time.perf_counter()
+    if not engine.setup_problem(matches, teams, [], season.home_matches[0]['match_date'],
+                                season.home_matches[-1]['match_date']):
+        raise RuntimeError('JuryPlanningEngine.setup_problem failed')
+    build_time = time.perf_counter() - started
+    engine.solver.parameters.log_search_progress = False
+    success, result = engine.solve()
+    return {
+        'status': result.get('status', 'failed').upper(),
+        'build_time': build_time,
+        'solve_time': result.get('solve_time'),
+        'first_solution_time': None,
+        'objective': result.get('objective_value') if success else None,
+        'gap': result.get('final_gap'),
+        'stop_reason': result.get('stop_reason'),
+        'assignments': len(result.get('assignments', [])),
+    }
+
+ENGINE_RUNNERS = {
+    'season': run_season_engine,
+    'autoplanner': run_autoplanner_engine,
+    'autoplanner-mip': run_autoplanner_mip_engine,
+    'enhanced': run_enhanced_engine,
+    'scheduler': run_scheduler_engine,
+}
+
+# Autoplanner engines whose runs calibrate the solver selector, by SolverType value
+HISTORY_BACKENDS = {'autoplanner': 'sat', 'autoplanner-mip': 'linear'}
+
+def _run_case(engine: str, spec_data: Dict[str, Any], time_limit: float, queue, history_path: str = None):
+    """Child process body: run one engine on one season and report peak RSS of this process only"""
+    logging.disable(logging.INFO)
+    os.chdir(tempfile.mkdtemp(prefix='jury_benchmark_'))  # Engines write solver.log / reports to the cwd
+    season = generate_season(SeasonSpec(**spec_data))
+    record = {'engine': engine, 'season': season.spec.label(), 'spec': spec_data,
+              'matches': len(season.home_matches)}
+    started = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            record.update(ENGINE_RUNNERS[engine](season, time_limit))
+    except ImportError as e:
+        # enhanced and scheduler need the backend package, which is not always deployed next to the engines
+        record['status'] = 'UNAVAILABLE'
+        record['error'] = f"Engine not importable here: {e}"
+    except Exception as e:
+        record['status'] = 'ERROR'
+        record['error'] = f"{type(e).__name__}: {e}"
+    record['total_time'] = time.perf_counter() - started
+    if history_path and engine in HISTORY_BACKENDS and record.get('features'):
+        SolveHistory(history_path).record('autoplanner', HISTORY_BACKENDS[engine], ProblemFeatures(**record['features']),
+                                          record['build_time'] + record['solve_time'], record['status'], record.get('stop_reason'))
+    record['peak_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+    queue.put(record)
+
+def run_case(engine: str, spec: SeasonSpec, time_limit: float, history_path: str = None) -> Dict[str, Any]:
+    """Run one case in a fresh process so peak RSS is not inherited from earlier cases"""
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=_run_case, args=(engine, asdict(spec), time_limit, queue, history_path))
+    process.start()
+    # Generous margin over the solver limit for model building and interpreter start-up
+    timeout = time_limit * 4 + 120
+    try:
+        record = queue.get(timeout=timeout)
+    except Exception:
+        record = {'engine': engine, 'season': spec.label(), 'spec': asdict(spec), 'status': 'TIMEOUT',
+                  'error': f"No result within {timeout:.0f}s"}
+    process.join(5)
+    if process.is_alive():
+        process.terminate()
+    return record
+
+def sweep_specs(args) -> List[SeasonSpec]:
+    return [SeasonSpec(teams=teams, match_days=days, matches_per_day=per_day, go_competitions=go,
+                       static_assignments=args.static_assignments, locked_ratio=args.locked_ratio,
+                       away_fixtures=args.away_fixtures, seed=args.seed)
+            for teams, days, per_day, go in itertools.product(args.teams, args.match_days,
+                                                              args.matches_per_day, args.go_competitions)]
+
+def compare_backends(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Pair the CP-SAT and MIP autoplanner runs of each season: which was faster and do the objectives agree"""
+    by_season = {}
+    for record in results:
+        if record['engine'] in ('autoplanner', 'autoplanner-mip'):
+            by_season.setdefault(record['season'], {})[record['engine']] = record
+
+    rows = []
+    for season, runs in by_season.items():
+        sat, mip = runs.get('autoplanner'), runs.get('autoplanner-mip')
+        if not sat or not mip:
+            continue
+        both_solved = sat.get('objective') is not None and mip.get('objective') is not None
+        times = {'sat': sat.get('solve_time'), 'linear': mip.get('solve_time')}
+        rows.append({
+            'season': season,
+            'sat_status': sat.get('status'),
+            'linear_status': mip.get('status'),
+            'sat_solve_time': times['sat'],
+            'linear_solve_time': times['linear'],
+            'sat_objective': sat.get('objective'),
+            'linear_objective': mip.get('objective'),
+            'objectives_agree': (abs(sat['objective'] - mip['objective']) <= BACKEND_OBJECTIVE_TOLERANCE * max(1.0, abs(sat['objective']))
+                                 if both_solved else None),
+            'faster': min(times, key=times.get) if None not in times.values() else None,
+        })
+    return rows
+
+def compare_to_baseline(results: List[Dict[str, Any]], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Return a message per case that got slower or worse than the baseline by more than tolerance"""
+    previous = {(r['engine'], r['season']): r for r in baseline.get('results', [])}
+    regressions = []
+    for record in results:
+        old = previous.get((record['engine'], record['season']))
+        if not old or record.get('status') == 'UNAVAILABLE':
+            continue
+        if old.get('status') in ('OPTIMAL', 'FEASIBLE') and record.get('status') not in ('OPTIMAL', 'FEASIBLE'):
+            regressions.append(f"{record['engine']} {record['season']}: {old['status']} -> {record.get('status')}")
+            continue
+        for metric in ('build_time', 'solve_time', 'first_solution_time', 'peak_rss_mb'):
+            if old.get(metric) and record.get(metric) is not None and record[metric] > old[metric] * (1 + tolerance):
+                regressions.append(f"{record['engine']} {record['season']}: {metric} {old[metric]:.2f} -> {record[metric]:.2f}")
+        # Only the season and autoplanner engines minimise; compare objectives where both runs solved
+        if old.get('objective') is not None and record.get('objective') is not None:
+            if record['objective'] > old['objective'] + abs(old['objective']) * tolerance and record['engine'] in ('season', 'autoplanner', 'autoplanner-mip'):
+                regressions.append(f"{record['engine']} {record['season']}: objective {old['objective']:.1f} -> {record['objective']:.1f}")
+    return regressions
+
+def main():
+    """Main entry point for command line usage"""
+    parser = argparse.ArgumentParser(description='Benchmark the planning engines on synthetic seasons')
+    parser.add_argument('--engines', nargs='+', choices=ENGINES, default=['season', 'autoplanner'], help='Engines to run; enhanced and scheduler report UNAVAILABLE without the backend package')
+    parser.add_argument('--teams', type=int, nargs='+', default=[8, 12, 16], help='Jury team counts to sweep')
+    parser.add_argument('--match-days', type=int, nargs='+', default=[12, 24], help='Match day counts to sweep')
+    parser.add_argument('--matches-per-day', type=int, nargs='+', default=[4], help='Matches per day to sweep')
+    parser.add_argument('--go-competitions', type=int, nargs='+', default=[0, 1], help='GO competition counts to sweep')
+    parser.add_argument('--static-assignments', type=int, default=1, help='Teams juried by the static team')
+    parser.add_argument('--locked-ratio', type=float, default=0.0, help='Share of matches locked to a team')
+    parser.add_argument('--away-fixtures', type=int, default=1, help='Away fixtures per match day')
+    parser.add_argument('--seed', type=int, default=1, help='Generator and solver seed')
+    parser.add_argument('--time-limit', type=float, default=30, help='Solver time limit per case in seconds')
+    parser.add_argument('--output', '-o', default='benchmark_baseline.json', help='Baseline JSON to write')
+    parser.add_argument('--compare', help='Earlier baseline JSON to check for regressions')
+    parser.add_argument('--solver-history', help='Also record the autoplanner runs here to calibrate auto solver selection')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_REGRESSION_TOLERANCE,
+                        help='Relative slowdown that counts as a regression')
+    args = parser.parse_args()
+
+    results = []
+    for spec in sweep_specs(args):
+        for engine in args.engines:
+            record = run_case(engine, spec, args.time_limit, args.solver_history)
+            results.append(record)
+            print(f"{engine:15} {record['season']:32} {record.get('status', '?'):10} "
+                  f"build {record.get('build_time') or 0:7.2f}s  first {record.get('first_solution_time') or 0:7.2f}s  "
+                  f"solve {record.get('solve_time') or 0:7.2f}s  rss {record.get('peak_rss_mb') or 0:7.1f}MB"
+                  + (f"  {record['error']}" if record.get('error') else ''))
+
+    backends = compare_backends(results)
+    if backends:
+        print("\nAutoplanner back ends (CP-SAT vs MIP):")
+        for row in backends:
+            print(f"{row['season']:32} sat {row['sat_status'] or '?':10} {row['sat_solve_time'] or 0:7.2f}s  "
+                  f"linear {row['linear_status'] or '?':10} {row['linear_solve_time'] or 0:7.2f}s  "
+                  f"faster {row['faster'] or '-':6}  objectives agree: {row['objectives_agree']}")
+
+    baseline = {
+        'created': datetime.now().isoformat(),
+        'time_limit': args.time_limit,
+        'ortools': getattr(sys.modules.get('ortools'), '__version__', None),
+        'results': results,
+        'backend_comparison': backends,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(baseline, f, indent=2, default=str)
+    print(f"Baseline written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare_to_baseline(results, json.load(f), args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        sys.exit(1 if regressions else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Rolling duty windows for the planning engines
+Groups a team's assignment variables into day buckets, finds the windows of
+period_days that can exceed a duty limit, and builds prefix sums over the buckets
+so every window becomes one two-term constraint
+"""
+
+from datetime import date, datetime
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Iterable, Tuple
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+EPOCH = datetime(1970, 1, 1)
+
+def day_number(date_time: str) -> int:
+    """Proleptic ordinal of the date part of 'YYYY-MM-DD[ HH:MM:SS]'"""
+    return date.fromisoformat(str(date_time)[:10]).toordinal()
+
+def epoch_seconds(date_time: str) -> int:
+    """Seconds since 1970-01-01 of a naive 'YYYY-MM-DD[ HH:MM:SS]'; no time zone is applied"""
+    return int((datetime.fromisoformat(str(date_time).replace(' ', 'T')) - EPOCH).total_seconds())
+
+@dataclass
+class DutyTimeline:
+    """A team's assignment variable keys bucketed by match day, days ascending"""
+    name: str
+    days: List[int] = field(default_factory=list)
+    day_keys: List[List[Any]] = field(default_factory=list)
+
+    @classmethod
+    def from_dated_keys(cls, name: str, dated_keys: Iterable[Tuple[int, Any]]) -> 'DutyTimeline':
+        buckets = {}
+        for day, key in dated_keys:
+            buckets.setdefault(day, []).append(key)
+        days = sorted(buckets)
+        return cls(name, days, [buckets[day] for day in days])
+
+    def windows(self, period_days: int, limit: int) -> List[Tuple[int, int]]:
+        """
+        (first, last) bucket indices of the windows of period_days calendar days
+        starting at each match day. Windows inside an earlier one and windows
+        with no more keys than the limit are left out.
+        """
+        windows = []
+        last = -1
+        keys_in_window = 0
+        previous_last = -1
+        for first, start in enumerate(self.days):
+            if first > 0:
+                keys_in_window -= len(self.day_keys[first - 1])
+            while last + 1 < len(self.days) and self.days[last + 1] < start + period_days:
+                last += 1
+                keys_in_window += len(self.day_keys[last])
+            if last != previous_last and keys_in_window > limit:
+                windows.append((first, last))
+            previous_last = last
+        return windows
+
+    def key_count(self, first: int, last: int) -> int:
+        return sum(len(keys) for keys in self.day_keys[first:last + 1])
+
+def cp_sat_prefix_sums(model, timeline: DutyTimeline, variables: Dict[Any, Any]) -> List[Any]:
+    """IntVars holding the running duty count after each bucket"""
+    prefix_sums = []
+    previous, bound = 0, 0
+    for index, keys in enumerate(timeline.day_keys):
+        bound += len(keys)
+        prefix = model.NewIntVar(0, bound, f"{timeline.name}_through_{index}")
+        model.Add(prefix == previous + sum(variables[key] for key in keys))
+        prefix_sums.append(prefix)
+        previous = prefix
+    return prefix_sums
+
+def linear_prefix_sums(solver, timeline: DutyTimeline, variables: Dict[Any, Any]) -> List[Any]:
+    """Continuous MIP variables holding the running duty count after each bucket; integral at every solution"""
+    prefix_sums = []
+    previous, bound = 0, 0
+    for index, keys in enumerate(timeline.day_keys):
+        bound += len(keys)
+        prefix = solver.NumVar(0, bound, f"{timeline.name}_through_{index}")
+        solver.Add(prefix == previous + solver.Sum([variables[key] for key in keys]))
+        prefix_sums.append(prefix)
+        previous = prefix
+    return prefix_sums
+
+def window_sum(prefix_sums: List[Any], first: int, last: int):
+    """Duties in buckets first..last as the difference of two prefix sums"""
+    return prefix_sums[last] - prefix_sums[first - 1] if first > 0 else prefix_sums[last]
@@ -9,7 +9,7 @@ import sys
 import os
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 from enum import Enum
 
 # Add the parent directory to the path to import our modules
@@ -18,6 +18,9 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from ortools.linear_solver import pywraplp
 from ortools.sat.python import cp_model
 from planning_engine.rule_manager import RuleConfigurationManager, RuleTemplate
+from planning_engine.stopping_policy import StoppingPolicy, StopReason
+from planning_engine.solver_selector import SolverSelector, ProblemFeatures
+from planning_engine.duty_windows import DutyTimeline, day_number, cp_sat_prefix_sums, linear_prefix_sums, window_sum
 from backend.models import RuleType, DutyType
 
 class SolverType(Enum):
@@ -44,8 +47,12 @@ class EnhancedJuryOptimizer:
     Supports both template-based and PHP-imported constraints
     """
     
-    def __init__(self, solver_type: SolverType = SolverType.AUTO):
+    def __init__(self, solver_type: SolverType = SolverType.AUTO, stopping_policy: Optional[StoppingPolicy] = None,
+                 selector: Optional[SolverSelector] = None):
         self.solver_type = solver_type
+        self.stopping_policy = stopping_policy or StoppingPolicy()
+        self.selector = selector
+        self.selection = None
         self.rule_manager = RuleConfigurationManager()
         self.teams = []
         self.matches = []
@@ -80,17 +87,39 @@ class EnhancedJuryOptimizer:
         start_time = datetime.now()
         
         # Choose solver based on problem size and type
+        features = self._problem_features() if self.selector and self.solver_type == SolverType.AUTO else None
         if self.solver_type == SolverType.AUTO:
-            effective_solver_type = self._choose_optimal_solver()
+            effective_solver_type = self._choose_optimal_solver(features)
         else:
             effective_solver_type = self.solver_type
         
         print(f"Using {effective_solver_type.value} solver for optimization")
         
-        if effective_solver_type == SolverType.CONSTRAINT_SAT:
-            result = self._optimize_with_sat_solver()
-        else:
-            result = self._optimize_with_linear_solver()
+        # Race the back ends when the cost model cannot tell them apart
+        result = None
+        if self.selection and self.selection.unclear and self.selector.race_seconds:
+            backend, result = self.selector.race({
+                SolverType.CONSTRAINT_SAT.value: lambda seconds, workers: self._race(SolverType.CONSTRAINT_SAT, seconds, workers),
+                SolverType.LINEAR.value: lambda seconds, workers: self._race(SolverType.LINEAR, seconds, workers),
+            }, effective_solver_type.value)
+            effective_solver_type = SolverType(backend)
+            self.selection.backend, self.selection.reason = backend, 'race'
+            print(f"Race picked the {backend} solver")
+        
+        if result is None:
+            solve_started = datetime.now()
+            if effective_solver_type == SolverType.CONSTRAINT_SAT:
+                result = self._optimize_with_sat_solver()
+            else:
+                result = self._optimize_with_linear_solver()
+            result.solver_time = (datetime.now() - solve_started).total_seconds()
+        
+        # Only auto selection feeds the solve history
+        if self.selection:
+            self.selector.history.record('enhanced', effective_solver_type.value, features, result.solver_time,
+                                         result.metadata.get('solver_status', 'unknown'), result.metadata.get('stop_reason'))
+        if self.selection:
+            result.metadata['solver_selection'] = asdict(self.selection)
         
         end_time = datetime.now()
         solver_time = (end_time - start_time).total_seconds()
@@ -102,18 +131,50 @@ class EnhancedJuryOptimizer:
         
         return result
     
-    def _choose_optimal_solver(self) -> SolverType:
-        """Choose the best solver based on problem characteristics"""
+    def _choose_optimal_solver(self, features: Optional[ProblemFeatures] = None) -> SolverType:
+        """
+        Choose the solver the selector predicts to be faster; the problem-size
+        heuristic decides without a selector or until enough runs are recorded
+        """
         num_vars = len(self.teams) * len(self.matches) * 2  # Approximate
         hard_constraints = sum(1 for c in self.constraints if c.get('rule_type') == 'FORBIDDEN')
         
         # Use SAT solver for problems with many hard constraints or binary decisions
         if hard_constraints > 10 or num_vars > 1000:
-            return SolverType.CONSTRAINT_SAT
+            heuristic = SolverType.CONSTRAINT_SAT
         else:
-            return SolverType.LINEAR
+            heuristic = SolverType.LINEAR
+        if not self.selector:
+            return heuristic
+        
+        self.selection = self.selector.choose(features or self._problem_features(), heuristic.value)
+        return SolverType(self.selection.backend)
     
-    def _optimize_with_linear_solver(self) -> OptimizationResult:
+    def _problem_features(self) -> ProblemFeatures:
+        """Cost model features of the loaded configuration"""
+        coverage_rows = sum(1 for match in self.matches for duty in match.get('required_duties', []) if duty.get('required'))
+        hard_constraints = sum(1 for c in self.constraints if c.get('rule_type') == 'FORBIDDEN')
+        return ProblemFeatures(
+            variables=len(self.teams) * len(self.matches) * 2,
+            hard_constraints=coverage_rows + hard_constraints,
+            soft_constraints=len(self.constraints) - hard_constraints,
+            # Every variable is in its coverage row and each rule ranges over all assignments
+            density=1.0 + len(self.constraints),
+            days=len({str(match['date_time'])[:10] for match in self.matches}),
+        )
+    
+    def _race(self, solver_type: SolverType, seconds: float, workers: int) -> Tuple[OptimizationResult, bool, Optional[float]]:
+        """Optimize with one solver for `seconds` on `workers` threads; used by SolverSelector.race"""
+        policy = self.stopping_policy.with_time_limit(seconds)
+        started = datetime.now()
+        if solver_type == SolverType.CONSTRAINT_SAT:
+            result = self._optimize_with_sat_solver(policy, workers)
+        else:
+            result = self._optimize_with_linear_solver(policy, workers)
+        result.solver_time = (datetime.now() - started).total_seconds()
+        return result, result.metadata.get('stop_reason') == StopReason.OPTIMAL, result.metadata.get('final_gap')
+    
+    def _optimize_with_linear_solver(self, policy: Optional[StoppingPolicy] = None, workers: Optional[int] = None) -> OptimizationResult:
         """Optimize using linear programming solver"""
         solver = pywraplp.Solver.CreateSolver('SCIP')
         if not solver:
@@ -162,21 +223,40 @@ class EnhancedJuryOptimizer:
         
         # Add constraint-based objective terms
         for constraint_def in self.constraints:
-            self._add_linear_objective_terms(objective, assignment_vars, constraint_def)
-        
-        # Solve
-        status = solver.Solve()
+            self._add_linear_objective_terms(solver, objective, assignment_vars, constraint_def)
+        
+        # Solve within the hard cap of the stopping policy
+        policy = policy or self.stopping_policy
+        if policy.max_time_seconds:
+            solver.SetTimeLimit(int(policy.max_time_seconds * 1000))  # milliseconds
+        if workers:
+            solver.SetNumThreads(workers)
+        # MPSolverParameters has no absolute gap, so absolute_gap only stops the SAT back end
+        parameters = pywraplp.MPSolverParameters()
+        if policy.relative_gap is not None:
+            parameters.SetDoubleParam(pywraplp.MPSolverParameters.RELATIVE_MIP_GAP, policy.relative_gap)
+        status = solver.Solve(parameters)
         
         if status == pywraplp.Solver.OPTIMAL or status == pywraplp.Solver.FEASIBLE:
             assignments = self._extract_linear_solution(assignment_vars)
+            objective_value = solver.Objective().Value()
+            gap = abs(objective_value - solver.Objective().BestBound()) / max(1.0, abs(objective_value))
+            if status == pywraplp.Solver.OPTIMAL:
+                stop_reason = StopReason.OPTIMAL if gap < 1e-9 else StopReason.GAP_LIMIT
+            else:
+                stop_reason = StopReason.TIME_LIMIT
             return OptimizationResult(
                 success=True,
                 assignments=assignments,
-                optimization_score=solver.Objective().Value(),
+                optimization_score=objective_value,
                 constraints_satisfied=constraints_satisfied,
                 total_constraints=constraints_added,
                 solver_time=0,  # Will be set by caller
-                metadata={'solver_status': 'optimal' if status == pywraplp.Solver.OPTIMAL else 'feasible'},
+                metadata={
+                    'solver_status': 'optimal' if status == pywraplp.Solver.OPTIMAL else 'feasible',
+                    'stop_reason': stop_reason,
+                    'final_gap': gap
+                },
                 period=self._get_optimization_period()
             )
         else:
@@ -187,11 +267,12 @@ class EnhancedJuryOptimizer:
                 constraints_satisfied=0,
                 total_constraints=constraints_added,
                 solver_time=0,
-                metadata={'solver_status': 'infeasible', 'error': 'No feasible solution found'},
+                metadata={'solver_status': 'infeasible', 'error': 'No feasible solution found',
+                          'stop_reason': StopReason.INFEASIBLE if status == pywraplp.Solver.INFEASIBLE else StopReason.UNKNOWN},
                 period={}
             )
     
-    def _optimize_with_sat_solver(self) -> OptimizationResult:
+    def _optimize_with_sat_solver(self, policy: Optional[StoppingPolicy] = None, workers: Optional[int] = None) -> OptimizationResult:
         """Optimize using constraint satisfaction solver"""
         model = cp_model.CpModel()
         
@@ -245,11 +326,11 @@ class EnhancedJuryOptimizer:
         if objective_terms:
             model.Maximize(sum(objective_terms))
         
-        # Solve
+        # Solve under the shared stopping policy (5 minute hard cap by default)
         solver = cp_model.CpSolver()
-        solver.parameters.max_time_in_seconds = 300  # 5 minute timeout
-        
-        status = solver.Solve(model)
+        if workers:
+            solver.parameters.num_workers = workers
+        status, outcome = (policy or self.stopping_policy).solve(solver, model)
         
         if status in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
             assignments = self._extract_sat_solution(solver, assignment_vars)
@@ -262,7 +343,9 @@ class EnhancedJuryOptimizer:
                 solver_time=0,
                 metadata={
                     'solver_status': 'optimal' if status == cp_model.OPTIMAL else 'feasible',
-                    'solver_stats': self._get_solver_stats(solver)
+                    'solver_stats': self._get_solver_stats(solver),
+                    'stop_reason': outcome['stop_reason'],
+                    'final_gap': outcome['final_gap']
                 },
                 period=self._get_optimization_period()
             )
@@ -274,7 +357,8 @@ class EnhancedJuryOptimizer:
                 constraints_satisfied=0,
                 total_constraints=constraints_added,
                 solver_time=0,
-                metadata={'solver_status': 'infeasible', 'error': 'No feasible solution found'},
+                metadata={'solver_status': 'infeasible', 'error': 'No feasible solution found',
+                          'stop_reason': outcome['stop_reason']},
                 period={}
             )
     
@@ -316,7 +400,7 @@ class EnhancedJuryOptimizer:
             elif template == 'rest_between_matches':
                 return self._add_rest_between_linear(solver, assignment_vars, parameters)
             elif template == 'max_duties_per_period':
-                return self._add_max_duties_linear(solver, assignment_vars, parameters)
+                return self._add_max_duties_linear(solver, assignment_vars, parameters, self._is_hard_rule(constraint_def))
             elif template == 'dedicated_team_assignment':
                 return self._add_dedicated_team_linear(solver, assignment_vars, parameters)
             # Add more constraint types as needed
@@ -337,7 +421,7 @@ class EnhancedJuryOptimizer:
             elif template == 'rest_between_matches':
                 return self._add_rest_between_sat(model, assignment_vars, parameters)
             elif template == 'max_duties_per_period':
-                return self._add_max_duties_sat(model, assignment_vars, parameters)
+                return self._add_max_duties_sat(model, assignment_vars, parameters, self._is_hard_rule(constraint_def))
             elif template == 'dedicated_team_assignment':
                 return self._add_dedicated_team_sat(model, assignment_vars, parameters)
             # Add more constraint types as needed
@@ -394,7 +478,104 @@ class EnhancedJuryOptimizer:
         
         return True
     
-    def _add_linear_objective_terms(self, objective, assignment_vars: Dict, constraint_def: Dict):
+    def _max_duties_timeline(self, assignment_vars: Dict, parameters: Dict) -> Optional[Tuple[DutyTimeline, List[Tuple[int, int]], int]]:
+        """The team's duties bucketed by day and the windows that can exceed max_duties"""
+        team_id = parameters.get('team_id')
+        max_duties = parameters.get('max_duties')
+        period_days = parameters.get('period_days')
+        
+        if not team_id or max_duties is None or not period_days:
+            return None
+        
+        # Only matches between the optional start and end dates count
+        start_date = parameters.get('start_date')
+        end_date = parameters.get('end_date')
+        dated_keys = []
+        for match in self.matches:
+            match_date = match['date_time'][:10]
+            if (start_date and match_date < start_date) or (end_date and match_date > end_date):
+                continue
+            for duty_type in ['clock', 'score']:
+                var_name = f"assign_{team_id}_{match['id']}_{duty_type}"
+                if var_name in assignment_vars:
+                    dated_keys.append((day_number(match_date), var_name))
+        
+        timeline = DutyTimeline.from_dated_keys(f"duties_{team_id}", dated_keys)
+        return timeline, timeline.windows(period_days, max_duties), max_duties
+    
+    def _is_hard_rule(self, constraint_def: Dict) -> bool:
+        """Forbidden and required rules are hard constraints; the others only steer the objective"""
+        return constraint_def.get('rule_type') in ('FORBIDDEN', 'REQUIRED')
+    
+    def _add_max_duties_linear(self, solver, assignment_vars: Dict, parameters: Dict, hard: bool = True) -> bool:
+        """
+        Add max duties per period constraint to linear solver, one row per window.
+        Soft rules get their windows with slack from _add_linear_objective_terms instead.
+        """
+        windowed = self._max_duties_timeline(assignment_vars, parameters)
+        if not windowed:
+            return False
+        
+        timeline, windows, max_duties = windowed
+        if hard and windows:
+            prefix_sums = linear_prefix_sums(solver, timeline, assignment_vars)
+            for first, last in windows:
+                solver.Add(window_sum(prefix_sums, first, last) <= max_duties)
+        
+        return True
+    
+    def _add_max_duties_sat(self, model, assignment_vars: Dict, parameters: Dict, hard: bool = True) -> bool:
+        """
+        Add max duties per period constraint to SAT solver, one row per window.
+        Soft rules get their windows with slack from _get_sat_objective_terms instead.
+        """
+        windowed = self._max_duties_timeline(assignment_vars, parameters)
+        if not windowed:
+            return False
+        
+        timeline, windows, max_duties = windowed
+        if hard and windows:
+            prefix_sums = cp_sat_prefix_sums(model, timeline, assignment_vars)
+            for first, last in windows:
+                model.Add(window_sum(prefix_sums, first, last) <= max_duties)
+        
+        return True
+    
+    def _max_duties_slack_linear(self, solver, assignment_vars: Dict, parameters: Dict) -> List:
+        """Soft max duties windows for the linear solver; each slack counts the duties over the limit"""
+        windowed = self._max_duties_timeline(assignment_vars, parameters)
+        if not windowed or not windowed[1]:
+            return []
+        
+        timeline, windows, max_duties = windowed
+        prefix_sums = linear_prefix_sums(solver, timeline, assignment_vars)
+        slacks = []
+        for first, last in windows:
+            slack = solver.NumVar(0, timeline.key_count(first, last) - max_duties,
+                                  f"{timeline.name}_over_{timeline.days[first]}")
+            solver.Add(window_sum(prefix_sums, first, last) - slack <= max_duties)
+            slacks.append(slack)
+        
+        return slacks
+    
+    def _max_duties_slack_sat(self, model, assignment_vars: Dict, parameters: Dict) -> List:
+        """Soft max duties windows for the SAT solver; each slack counts the duties over the limit"""
+        windowed = self._max_duties_timeline(assignment_vars, parameters)
+        if not windowed or not windowed[1]:
+            return []
+        
+        timeline, windows, max_duties = windowed
+        prefix_sums = cp_sat_prefix_sums(model, timeline, assignment_vars)
+        slacks = []
+        for first, last in windows:
+            slack = model.NewIntVar(0, timeline.key_count(first, last) - max_duties,
+                                    f"{timeline.name}_over_{timeline.days[first]}")
+            model.Add(window_sum(prefix_sums, first, last) - slack <= max_duties)
+            slacks.append(slack)
+        
+        return slacks
+    
+    def _add_linear_objective_terms(self, solver, objective, assignment_vars: Dict, constraint_def: Dict):
         """Add objective terms for linear solver based on constraint"""
         weight = constraint_def.get('weight', 0)
         template = constraint_def.get('template')
@@ -410,6 +591,11 @@ class EnhancedJuryOptimizer:
                     var_name = f"assign_{team_id}_{match['id']}_{duty_type}"
                     if var_name in assignment_vars:
                         objective.SetCoefficient(assignment_vars[var_name], weight * strength)
+        
+        elif template == 'max_duties_per_period' and not self._is_hard_rule(constraint_def):
+            # Every duty over the limit costs the rule's weight
+            for slack in self._max_duties_slack_linear(solver, assignment_vars, parameters):
+                objective.SetCoefficient(slack, -abs(weight))
     
     def _get_sat_objective_terms(self, model, assignment_vars: Dict, constraint_def: Dict) -> List:
         """Get objective terms for SAT solver based on constraint"""
@@ -429,6 +615,11 @@ class EnhancedJuryOptimizer:
                     if var_name in assignment_vars:
                         terms.append(assignment_vars[var_name] * int(weight * strength))
         
+        elif template == 'max_duties_per_period' and not self._is_hard_rule(constraint_def):
+            # Every duty over the limit costs the rule's weight
+            for slack in self._max_duties_slack_sat(model, assignment_vars, parameters):
+                terms.append(slack * -abs(weight))
+        
         return terms
     
     def _extract_linear_solution(self, assignment_vars: Dict) -> List[Dict[str, Any]]:
@@ -543,7 +734,7 @@ def main():
     output_path = sys.argv[2]
     
     # Create optimizer
-    optimizer = EnhancedJuryOptimizer(SolverType.AUTO)
+    optimizer = EnhancedJuryOptimizer(SolverType.AUTO, selector=SolverSelector('enhanced'))
     
     # Load configuration from PHP
     if not optimizer.load_from_php_export(config_path):
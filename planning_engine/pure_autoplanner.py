@@ -9,21 +9,44 @@ import sys
 import os
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, replace
 from enum import Enum
 import argparse
 import logging
+import hashlib
+import tempfile
+import signal
+import socket
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
 
 # Add the parent directory to the path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from ortools.sat.python import cp_model
 from ortools.linear_solver import pywraplp
+from planning_engine.stopping_policy import StoppingPolicy, StopReason
+from planning_engine.solver_selector import SolverSelector, SolveHistory, ProblemFeatures
+from planning_engine.duty_windows import (DutyTimeline, SECONDS_PER_DAY, epoch_seconds, cp_sat_prefix_sums,
+                                          linear_prefix_sums, window_sum)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Size bound of the on-disk model/result cache
+DEFAULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Part of every cache key; bump it whenever the model built from a request changes meaning
+CACHE_FORMAT_VERSION = 4
+
+# Address of the planner daemon (--serve) when no Unix socket is given
+DEFAULT_SERVER_HOST = '127.0.0.1'
+DEFAULT_SERVER_PORT = 8765
+
 class SolverType(Enum):
     """Available solver types"""
     CONSTRAINT_SAT = "sat"
@@ -37,6 +60,9 @@ class ConstraintType(Enum):
     LESS_PREFERRED = "less_preferred"
     MOST_PREFERRED = "most_preferred"
 
+# Rule types whose limits are hard constraints; the rest are penalised in the objective
+HARD_RULE_TYPES = ("forbidden", "required")
+
 @dataclass
 class Team:
     """Jury team representation"""
@@ -87,6 +113,12 @@ class OptimizationRequest:
     constraints: List[Constraint]
     solver_config: Dict[str, Any]
     time_limit_seconds: int = 300
+    match_times: List[int] = None  # Epoch seconds of each match, parallel to matches
+    
+    def __post_init__(self):
+        # Parse the match times once; every time-based constraint reads them from here
+        if self.match_times is None:
+            self.match_times = [epoch_seconds(match.date_time) for match in self.matches]
 
 @dataclass
 class OptimizationResult:
@@ -101,18 +133,170 @@ class OptimizationResult:
     metadata: Dict[str, Any]
     errors: List[str] = None
 
+@dataclass
+class DutyLimit:
+    """
+    At most `limit` of the assignment variables at `keys` may be 1; soft limits get a violation variable.
+    A window limit leaves keys empty and covers buckets first..last of a timeline instead.
+    """
+    name: str
+    keys: List[Tuple[int, int, str]]
+    limit: int
+    soft: bool = True
+    timeline: Optional[DutyTimeline] = None
+    first: int = 0
+    last: int = 0
+    
+    @property
+    def size(self) -> int:
+        """Number of assignment variables the limit covers"""
+        return self.timeline.key_count(self.first, self.last) if self.timeline else len(self.keys)
+
+def canonical_hash(data: Any) -> str:
+    """SHA-256 of the canonical JSON form of data"""
+    encoded = json.dumps(data, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+class PlanCache:
+    """
+    Content-addressed disk cache of built CP-SAT models and optimization results.
+    Models are keyed by teams, matches (including locks) and constraints; results
+    additionally by solver type, time limit and solver config. Least recently used
+    entries are evicted once the cache grows past max_bytes.
+    """
+    
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir or os.getenv('JURY_PLANNER_CACHE_DIR') or os.path.join(tempfile.gettempdir(), 'jury_planner_cache')
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+    
+    @staticmethod
+    def request_keys(request: OptimizationRequest, solver_type: SolverType) -> Tuple[str, str]:
+        """Return (model_key, result_key) for a request"""
+        model_key = canonical_hash({
+            'version': CACHE_FORMAT_VERSION,
+            'teams': sorted((asdict(team) for team in request.teams), key=lambda team: team['id']),
+            'matches': sorted((asdict(match) for match in request.matches), key=lambda match: match['id']),
+            'constraints': sorted((asdict(constraint) for constraint in request.constraints), key=lambda constraint: constraint['id']),
+        })
+        result_key = canonical_hash({
+            'version': CACHE_FORMAT_VERSION,
+            'model': model_key,
+            'solver_type': solver_type.value,
+            'time_limit_seconds': request.time_limit_seconds,
+            'solver_config': request.solver_config,
+        })
+        return model_key, result_key
+    
+    def _path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.cache_dir, key + suffix)
+    
+    def _read(self, path: str, mode: str = 'r'):
+        """Read a cache file and mark it as recently used, or return None"""
+        try:
+            with open(path, mode) as f:
+                content = f.read()
+            os.utime(path)
+            return content
+        except (OSError, ValueError):
+            return None
+    
+    def _write(self, path: str, content, mode: str = 'w'):
+        """Write a cache file; a failed write only costs the entry, never the solve"""
+        # Write-then-rename so a concurrent run never reads a partial entry; the temp file
+        # is unique per call because daemon threads may write the same key at once
+        fd, temp_path = tempfile.mkstemp(prefix=os.path.basename(path) + '.', suffix='.tmp', dir=self.cache_dir)
+        try:
+            with os.fdopen(fd, mode) as f:
+                f.write(content)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write cache entry {path}: {e}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+    
+    def get_result(self, result_key: str) -> Optional[OptimizationResult]:
+        content = self._read(self._path(result_key, '.result.json'))
+        if content is None:
+            return None
+        try:
+            data = json.loads(content)
+            data['assignments'] = [Assignment(**assignment) for assignment in data['assignments']]
+            return OptimizationResult(**data)
+        except (ValueError, TypeError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable cached result {result_key}: {e}")
+            return None
+    
+    def put_result(self, result_key: str, result: OptimizationResult):
+        self._write(self._path(result_key, '.result.json'), json.dumps(asdict(result), default=str))
+        self._evict()
+    
+    def get_model(self, model_key: str) -> Optional[Tuple[bytes, Dict[str, Any]]]:
+        """Return the serialized CpModelProto and its variable map / cached solution"""
+        meta = self._read(self._path(model_key, '.model.json'))
+        proto = self._read(self._path(model_key, '.model.pb'), 'rb')
+        if meta is None or proto is None:
+            return None
+        try:
+            return proto, json.loads(meta)
+        except ValueError:
+            return None
+    
+    def put_model(self, model_key: str, model: cp_model.CpModel, team_assignments: Dict, constraints_applied: int):
+        self._write(self._path(model_key, '.model.pb'), model.Proto().SerializeToString(), 'wb')
+        self._write_model_meta(model_key, team_assignments, constraints_applied, None)
+        self._evict()
+    
+    def put_solution(self, model_key: str, team_assignments: Dict, constraints_applied: int, solution: List[int]):
+        self._write_model_meta(model_key, team_assignments, constraints_applied, solution)
+    
+    def _write_model_meta(self, model_key, team_assignments, constraints_applied, solution):
+        meta = {
+            'variables': [[match_id, team_id, duty_type, var.Index()]
+                          for (match_id, team_id, duty_type), var in team_assignments.items()],
+            'constraints_applied': constraints_applied,
+            'solution': solution,
+        }
+        self._write(self._path(model_key, '.model.json'), json.dumps(meta))
+    
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
 class PureJuryOptimizer:
     """
     Pure Python jury assignment optimizer using OR-Tools
     No PHP dependencies - all logic contained in Python
     """
     
-    def __init__(self, solver_type: SolverType = SolverType.AUTO):
+    def __init__(self, solver_type: SolverType = SolverType.AUTO, cache: Optional[PlanCache] = None,
+                 selector: Optional[SolverSelector] = None):
         self.solver_type = solver_type
+        self.cache = cache
+        self.selector = selector
+        self.selection = None
         self.model = None
         self.solver = None
         self.variables = {}
         self.constraints_applied = 0
+        self._prefix_sums = {}  # Running duty sums per timeline of the model being built
         
     def optimize(self, request: OptimizationRequest) -> OptimizationResult:
         """
@@ -124,18 +308,58 @@ class PureJuryOptimizer:
         
         try:
             # Choose solver
+            features = self._problem_features(request) if self.selector and self.solver_type == SolverType.AUTO else None
             if self.solver_type == SolverType.AUTO:
-                solver_type = self._choose_optimal_solver(request)
+                solver_type = self._choose_optimal_solver(request, features)
             else:
                 solver_type = self.solver_type
                 
             logger.info(f"Using solver: {solver_type.value}")
             
+            model_key = result_key = None
+            if self.cache:
+                model_key, result_key = self.cache.request_keys(request, solver_type)
+                result = self.cache.get_result(result_key)
+                if result:
+                    logger.info(f"Returning cached plan {result_key[:12]}")
+                    result.metadata['cache'] = 'hit'
+                    result.solver_time_seconds = (datetime.now() - start_time).total_seconds()
+                    return result
+            
+            # Race the back ends when the cost model cannot tell them apart
+            result = None
+            if self.selection and self.selection.unclear and self.selector.race_seconds:
+                backend, result = self.selector.race({
+                    SolverType.CONSTRAINT_SAT.value: lambda seconds, workers: self._race(request, SolverType.CONSTRAINT_SAT, seconds, workers),
+                    SolverType.LINEAR.value: lambda seconds, workers: self._race(request, SolverType.LINEAR, seconds, workers),
+                }, solver_type.value)
+                self.selection.backend, self.selection.reason = backend, 'race'
+                if SolverType(backend) != solver_type:
+                    solver_type = SolverType(backend)
+                    if self.cache:
+                        model_key, result_key = self.cache.request_keys(request, solver_type)
+                if result:
+                    result.metadata['cache'] = 'miss' if self.cache else 'off'
+            
             # Build and solve model
-            if solver_type == SolverType.CONSTRAINT_SAT:
-                result = self._solve_with_cp_sat(request)
-            else:
-                result = self._solve_with_linear(request)
+            if result is None:
+                solve_started = time.perf_counter()
+                if solver_type == SolverType.CONSTRAINT_SAT:
+                    result = self._solve_with_cp_sat(request, model_key)
+                else:
+                    result = self._solve_with_linear(request)
+                    result.metadata['cache'] = 'miss' if self.cache else 'off'
+                result.solver_time_seconds = time.perf_counter() - solve_started
+            
+            # Build plus solve time of the back end that produced the plan; only auto selection feeds the history
+            if self.selection:
+                self.selector.history.record('autoplanner', solver_type.value, features, result.solver_time_seconds,
+                                             result.solver_status, result.metadata.get('stop_reason'))
+            if self.selection:
+                result.metadata['solver_selection'] = asdict(self.selection)
+            
+            if self.cache and result.success:
+                self.cache.put_result(result_key, result)
                 
             end_time = datetime.now()
             result.solver_time_seconds = (end_time - start_time).total_seconds()
@@ -157,17 +381,133 @@ class PureJuryOptimizer:
                 errors=[str(e)]
             )
     
-    def _choose_optimal_solver(self, request: OptimizationRequest) -> SolverType:
-        """Choose the best solver based on problem characteristics"""
-        # Use CP-SAT for complex constraint problems
+    def _choose_optimal_solver(self, request: OptimizationRequest, features: Optional[ProblemFeatures] = None) -> SolverType:
+        """
+        Choose the back end the selector predicts to be faster; the fixed heuristic
+        decides without a selector or until enough runs are recorded
+        """
+        # Use CP-SAT for complex constraint problems, Linear for simpler problems
         if len(request.constraints) > 10 or any(c.constraint_type in ['team_unavailable', 'dedicated_team_assignment'] for c in request.constraints):
-            return SolverType.CONSTRAINT_SAT
-        # Use Linear for simpler problems
-        return SolverType.LINEAR
+            heuristic = SolverType.CONSTRAINT_SAT
+        else:
+            heuristic = SolverType.LINEAR
+        if not self.selector:
+            return heuristic
+        
+        self.selection = self.selector.choose(features or self._problem_features(request), heuristic.value)
+        return SolverType(self.selection.backend)
     
-    def _solve_with_cp_sat(self, request: OptimizationRequest) -> OptimizationResult:
+    def _problem_features(self, request: OptimizationRequest) -> ProblemFeatures:
+        """Cost model features: the variables and constraint rows both back ends build"""
+        keys = {(match.id, team.id, duty['type']): None for match in request.matches for team in request.teams
+                if team.is_active for duty in match.required_duties}
+        limits = [limit for constraint in request.constraints if constraint.is_active
+                  for limit in self._duty_limits(constraint, request, keys)]
+        active_teams = sum(1 for team in request.teams if team.is_active)
+        # Duty coverage rows, one-duty-per-match rows, running-sum rows of the windowed limits and the hard limits
+        coverage_rows = sum(len(match.required_duties) for match in request.matches)
+        one_duty_rows = active_teams * sum(1 for match in request.matches if len(match.required_duties) > 1)
+        timelines = {limit.timeline.name: limit.timeline for limit in limits if limit.timeline}
+        prefix_rows = sum(len(timeline.days) for timeline in timelines.values())
+        nonzeros = (2 * len(keys) + sum(2 if limit.timeline else len(limit.keys) for limit in limits)
+                    + sum(timeline.key_count(0, len(timeline.days) - 1) + 2 * len(timeline.days) for timeline in timelines.values()))
+        return ProblemFeatures(
+            variables=len(keys),
+            hard_constraints=coverage_rows + one_duty_rows + prefix_rows + sum(1 for limit in limits if not limit.soft),
+            soft_constraints=sum(1 for limit in limits if limit.soft),
+            density=nonzeros / max(1, len(keys)),
+            days=len({match.date_time[:10] for match in request.matches}),
+        )
+    
+    def _race(self, request: OptimizationRequest, solver_type: SolverType, seconds: float,
+              workers: int) -> Tuple[OptimizationResult, bool, Optional[float]]:
+        """Solve with one back end for `seconds` on `workers` threads on a separate optimizer; used by SolverSelector.race"""
+        race_request = replace(request, time_limit_seconds=seconds, solver_config=dict(request.solver_config, num_workers=workers))
+        optimizer = PureJuryOptimizer(solver_type)
+        started = time.perf_counter()
+        if solver_type == SolverType.CONSTRAINT_SAT:
+            result = optimizer._solve_with_cp_sat(race_request)
+        else:
+            result = optimizer._solve_with_linear(race_request)
+        result.solver_time_seconds = time.perf_counter() - started
+        return result, result.metadata.get('stop_reason') == StopReason.OPTIMAL, result.metadata.get('final_gap')
+    
+    def _solve_with_cp_sat(self, request: OptimizationRequest, model_key: Optional[str] = None) -> OptimizationResult:
         """Solve using CP-SAT (Constraint Programming)"""
+        cached_model = self.cache.get_model(model_key) if self.cache and model_key else None
+        if cached_model:
+            # Near hit: same model, different solver settings - reuse it and warm-start from the cached plan
+            model, team_assignments, solution = self._restore_cp_sat_model(*cached_model)
+            cache_state = 'model'
+            if solution:
+                for var, value in zip(team_assignments.values(), solution):
+                    model.AddHint(var, value)
+            logger.info(f"Reusing cached model {model_key[:12]}{' with solution hint' if solution else ''}")
+        else:
+            model, team_assignments = self._build_cp_sat_model(request)
+            cache_state = 'miss' if self.cache else 'off'
+            if self.cache and model_key:
+                self.cache.put_model(model_key, model, team_assignments, self.constraints_applied)
+        
+        # Solve; solver_config may override the gap and no-improvement limits and the worker count
+        solver = cp_model.CpSolver()
+        if request.solver_config.get('num_workers'):
+            solver.parameters.num_workers = int(request.solver_config['num_workers'])
+        policy = StoppingPolicy.from_config(request.solver_config, max_time_seconds=request.time_limit_seconds)
+        status, outcome = policy.solve(solver, model)
+        
+        # Extract results
+        assignments = []
+        if status in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
+            matches_by_id = {m.id: m for m in request.matches}
+            for (match_id, team_id, duty_type), var in team_assignments.items():
+                if solver.Value(var) == 1:
+                    match = matches_by_id[match_id]
+                    assignments.append(Assignment(
+                        match_id=match_id,
+                        team_id=team_id,
+                        duty_type=duty_type,
+                        assignment_time=match.date_time,
+                        confidence_score=0.95
+                    ))
+            if self.cache and model_key:
+                self.cache.put_solution(model_key, team_assignments, self.constraints_applied,
+                                        [solver.Value(var) for var in team_assignments.values()])
+        
+        return OptimizationResult(
+            success=status in [cp_model.OPTIMAL, cp_model.FEASIBLE],
+            assignments=assignments,
+            objective_value=solver.ObjectiveValue() if status in [cp_model.OPTIMAL, cp_model.FEASIBLE] else 0,
+            constraints_satisfied=self.constraints_applied,
+            total_constraints=len([c for c in request.constraints if c.is_active]),
+            solver_time_seconds=solver.WallTime(),
+            solver_status=solver.StatusName(status),
+            metadata={
+                "solver_type": "CP-SAT",
+                "num_variables": len(team_assignments),
+                "num_constraints": model.Proto().constraints.__len__(),
+                "cache": cache_state,
+                "stop_reason": outcome['stop_reason'],
+                "final_gap": outcome['final_gap'],
+                "first_solution_time": outcome['first_solution_time']
+            }
+        )
+    
+    def _restore_cp_sat_model(self, proto: bytes, meta: Dict[str, Any]) -> Tuple[cp_model.CpModel, Dict, Optional[List[int]]]:
+        """Rebuild a CpModel and its assignment variables from a cached proto"""
+        model = cp_model.CpModel()
+        model.Proto().ParseFromString(proto)
+        team_assignments = {
+            (match_id, team_id, duty_type): model.GetBoolVarFromProtoIndex(index)
+            for match_id, team_id, duty_type, index in meta['variables']
+        }
+        self.constraints_applied = meta['constraints_applied']
+        return model, team_assignments, meta.get('solution')
+    
+    def _build_cp_sat_model(self, request: OptimizationRequest) -> Tuple[cp_model.CpModel, Dict]:
+        """Build the CP-SAT model and return it with its assignment variables"""
         model = cp_model.CpModel()
+        self._prefix_sums = {}
         
         # Create decision variables: team_assignment[match_id, team_id, duty_type]
         team_assignments = {}
@@ -235,40 +575,7 @@ class PureJuryOptimizer:
         if objective_terms:
             model.Minimize(sum(objective_terms))
         
-        # Solve
-        solver = cp_model.CpSolver()
-        solver.parameters.max_time_in_seconds = request.time_limit_seconds
-        
-        status = solver.Solve(model)
-        
-        # Extract results
-        assignments = []
-        if status in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
-            for (match_id, team_id, duty_type), var in team_assignments.items():
-                if solver.Value(var) == 1:
-                    match = next(m for m in request.matches if m.id == match_id)
-                    assignments.append(Assignment(
-                        match_id=match_id,
-                        team_id=team_id,
-                        duty_type=duty_type,
-                        assignment_time=match.date_time,
-                        confidence_score=0.95
-                    ))
-        
-        return OptimizationResult(
-            success=status in [cp_model.OPTIMAL, cp_model.FEASIBLE],
-            assignments=assignments,
-            objective_value=solver.ObjectiveValue() if status in [cp_model.OPTIMAL, cp_model.FEASIBLE] else 0,
-            constraints_satisfied=self.constraints_applied,
-            total_constraints=len([c for c in request.constraints if c.is_active]),
-            solver_time_seconds=solver.WallTime(),
-            solver_status=solver.StatusName(status),
-            metadata={
-                "solver_type": "CP-SAT",
-                "num_variables": len(team_assignments),
-                "num_constraints": model.Proto().constraints.__len__()
-            }
-        )
+        return model, team_assignments
     
     def _solve_with_linear(self, request: OptimizationRequest) -> OptimizationResult:
         """Solve using Linear Programming"""
@@ -286,6 +593,12 @@ class PureJuryOptimizer:
                 errors=["Linear solver not available"]
             )
         
+        team_assignments = self._build_linear_model(solver, request)
+        return self._solve_linear_model(solver, request, team_assignments)
+    
+    def _build_linear_model(self, solver: pywraplp.Solver, request: OptimizationRequest) -> Dict:
+        """Build the MIP equivalent of _build_cp_sat_model and return its assignment variables"""
+        self._prefix_sums = {}
         # Create binary variables for assignments
         team_assignments = {}
         for match in request.matches:
@@ -297,21 +610,65 @@ class PureJuryOptimizer:
                     var_name = f"assign_{match.id}_{team.id}_{duty_type}"
                     team_assignments[(match.id, team.id, duty_type)] = solver.BoolVar(var_name)
         
-        # Constraints and objective similar to CP-SAT implementation
-        # (Simplified for brevity - would implement full linear constraints)
+        # Constraint 1: Each required duty must be assigned
+        for match in request.matches:
+            for duty in match.required_duties:
+                assigned_teams = [team_assignments[(match.id, team.id, duty['type'])] for team in request.teams
+                                  if team.is_active and (match.id, team.id, duty['type']) in team_assignments]
+                if assigned_teams:
+                    solver.Add(solver.Sum(assigned_teams) == duty['count'])
+        
+        # Constraint 2: Team cannot be assigned to multiple duties in same match
+        for match in request.matches:
+            for team in request.teams:
+                if not team.is_active:
+                    continue
+                team_duties = [team_assignments[(match.id, team.id, duty['type'])] for duty in match.required_duties
+                               if (match.id, team.id, duty['type']) in team_assignments]
+                if len(team_duties) > 1:
+                    solver.Add(solver.Sum(team_duties) <= 1)
+        
+        # Apply custom constraints
+        constraint_violations = []
+        for constraint in request.constraints:
+            if not constraint.is_active:
+                continue
+            
+            violation_vars = self._apply_constraint_linear(solver, constraint, request, team_assignments)
+            if violation_vars:
+                constraint_violations.extend(violation_vars)
+                self.constraints_applied += 1
+        
+        # Same objective as the CP-SAT model: violations cost 1000, every assignment earns 1
+        solver.Minimize(solver.Sum([violation_var * 1000 for violation_var in constraint_violations] +
+                                   [var * -1 for var in team_assignments.values()]))
         
-        # Set time limit
-        solver.SetTimeLimit(request.time_limit_seconds * 1000)  # milliseconds
+        return team_assignments
+    
+    def _solve_linear_model(self, solver: pywraplp.Solver, request: OptimizationRequest, team_assignments: Dict) -> OptimizationResult:
+        """Solve a model built by _build_linear_model under the request's stopping policy"""
+        # SCIP takes the hard cap and the relative gap; it has no no-improvement stop
+        policy = StoppingPolicy.from_config(request.solver_config, max_time_seconds=request.time_limit_seconds)
+        if policy.max_time_seconds:
+            solver.SetTimeLimit(int(policy.max_time_seconds * 1000))  # milliseconds
+        if request.solver_config.get('num_workers'):
+            solver.SetNumThreads(int(request.solver_config['num_workers']))
+        parameters = pywraplp.MPSolverParameters()
+        if policy.relative_gap is not None:
+            parameters.SetDoubleParam(pywraplp.MPSolverParameters.RELATIVE_MIP_GAP, policy.relative_gap)
         
         # Solve
-        status = solver.Solve()
+        status = solver.Solve(parameters)
+        solved = status in [pywraplp.Solver.OPTIMAL, pywraplp.Solver.FEASIBLE]
         
         # Extract results
         assignments = []
-        if status in [pywraplp.Solver.OPTIMAL, pywraplp.Solver.FEASIBLE]:
+        objective = bound = gap = None
+        if solved:
+            matches_by_id = {m.id: m for m in request.matches}
             for (match_id, team_id, duty_type), var in team_assignments.items():
                 if var.solution_value() > 0.5:
-                    match = next(m for m in request.matches if m.id == match_id)
+                    match = matches_by_id[match_id]
                     assignments.append(Assignment(
                         match_id=match_id,
                         team_id=team_id,
@@ -319,86 +676,97 @@ class PureJuryOptimizer:
                         assignment_time=match.date_time,
                         confidence_score=0.90
                     ))
+            objective = solver.Objective().Value()
+            bound = solver.Objective().BestBound()
+            gap = abs(objective - bound) / max(1.0, abs(objective))
+        
+        if status == pywraplp.Solver.OPTIMAL:
+            stop_reason = StopReason.OPTIMAL if gap < 1e-9 else StopReason.GAP_LIMIT
+        elif status == pywraplp.Solver.FEASIBLE:
+            stop_reason = StopReason.TIME_LIMIT
+        elif status == pywraplp.Solver.INFEASIBLE:
+            stop_reason = StopReason.INFEASIBLE
+        else:
+            stop_reason = StopReason.UNKNOWN
         
         return OptimizationResult(
-            success=status in [pywraplp.Solver.OPTIMAL, pywraplp.Solver.FEASIBLE],
+            success=solved,
             assignments=assignments,
-            objective_value=solver.Objective().Value() if status in [pywraplp.Solver.OPTIMAL, pywraplp.Solver.FEASIBLE] else 0,
+            objective_value=objective if solved else 0,
             constraints_satisfied=self.constraints_applied,
             total_constraints=len([c for c in request.constraints if c.is_active]),
             solver_time_seconds=solver.WallTime() / 1000.0,
             solver_status=self._linear_status_name(status),
             metadata={
                 "solver_type": "Linear",
-                "num_variables": len(team_assignments)
+                "num_variables": len(team_assignments),
+                "num_constraints": solver.NumConstraints(),
+                "stop_reason": stop_reason,
+                "final_gap": gap
             }
         )
     
-    def _apply_constraint_cp_sat(self, model, constraint: Constraint, request: OptimizationRequest, team_assignments) -> List:
-        """Apply a constraint to the CP-SAT model"""
+    def _duty_limits(self, constraint: Constraint, request: OptimizationRequest, team_assignments) -> List[DutyLimit]:
+        """
+        Translate a custom constraint into limits on sums of assignment variables.
+        Both back ends build their constraints from these, so CP-SAT and the MIP
+        always share the same semantics.
+        """
         constraint_type = constraint.constraint_type
         params = constraint.parameters
         
-        violation_vars = []
+        limits = []
         
         if constraint_type == "max_duties_per_period":
-            # Limit duties per team per period
+            # Limit duties per team in every window of period_days starting on a match day
             max_duties = params.get('max_duties', 3)
             period_days = params.get('period_days', 7)
+            rule_type = str(getattr(constraint.rule_type, 'value', constraint.rule_type)).lower()
+            soft = rule_type not in HARD_RULE_TYPES
+            match_days = [(match, time // SECONDS_PER_DAY) for match, time in zip(request.matches, request.match_times)]
             
             for team in request.teams:
                 if not team.is_active:
                     continue
-                    
-                # Group matches by time periods
-                team_duties_in_period = []
-                for match in request.matches:
-                    for duty in match.required_duties:
-                        duty_type = duty['type']
-                        if (match.id, team.id, duty_type) in team_assignments:
-                            team_duties_in_period.append(team_assignments[(match.id, team.id, duty_type)])
                 
-                if team_duties_in_period:
-                    violation_var = model.NewBoolVar(f"violation_max_duties_{team.id}")
-                    model.Add(sum(team_duties_in_period) <= max_duties).OnlyEnforceIf(violation_var.Not())
-                    violation_vars.append(violation_var)
+                # Bucket the team's duties by day; the windows share one running sum per team
+                timeline = DutyTimeline.from_dated_keys(
+                    f"duties_{team.id}",
+                    ((day, (match.id, team.id, duty['type'])) for match, day in match_days
+                     for duty in match.required_duties if (match.id, team.id, duty['type']) in team_assignments))
+                
+                for first, last in timeline.windows(period_days, max_duties):
+                    limits.append(DutyLimit(f"max_duties_{team.id}_{timeline.days[first]}", [], max_duties, soft=soft,
+                                            timeline=timeline, first=first, last=last))
         
         elif constraint_type == "rest_between_matches":
-            # Ensure rest between assignments
+            # A team may take at most one of any set of matches that start less than min_rest_days apart
             min_rest_days = params.get('min_rest_days', 1)
+            rest_seconds = min_rest_days * SECONDS_PER_DAY
+            
+            # Two-pointer sweep over the matches by start time: for each first match, extend the window to
+            # the last match still inside the rest period; windows inside the previous one add nothing
+            order = sorted(range(len(request.matches)), key=lambda index: request.match_times[index])
+            windows = []
+            last = 0
+            for first in range(len(order)):
+                previous_last = last
+                last = max(last, first)
+                while last + 1 < len(order) and \
+                        request.match_times[order[last + 1]] - request.match_times[order[first]] < rest_seconds:
+                    last += 1
+                if last > first and last > previous_last:
+                    windows.append([request.matches[index] for index in order[first:last + 1]])
             
             for team in request.teams:
                 if not team.is_active:
                     continue
                 
-                # Sort matches by date
-                sorted_matches = sorted(request.matches, key=lambda m: m.date_time)
-                
-                for i in range(len(sorted_matches) - 1):
-                    match1 = sorted_matches[i]
-                    match2 = sorted_matches[i + 1]
-                    
-                    # Check if matches are within rest period
-                    date1 = datetime.fromisoformat(match1.date_time.replace(' ', 'T'))
-                    date2 = datetime.fromisoformat(match2.date_time.replace(' ', 'T'))
-                    
-                    if (date2 - date1).days < min_rest_days:
-                        # Cannot assign same team to both matches
-                        team_assigned_1 = []
-                        team_assigned_2 = []
-                        
-                        for duty in match1.required_duties:
-                            if (match1.id, team.id, duty['type']) in team_assignments:
-                                team_assigned_1.append(team_assignments[(match1.id, team.id, duty['type'])])
-                        
-                        for duty in match2.required_duties:
-                            if (match2.id, team.id, duty['type']) in team_assignments:
-                                team_assigned_2.append(team_assignments[(match2.id, team.id, duty['type'])])
-                        
-                        if team_assigned_1 and team_assigned_2:
-                            violation_var = model.NewBoolVar(f"violation_rest_{team.id}_{match1.id}_{match2.id}")
-                            model.Add(sum(team_assigned_1) + sum(team_assigned_2) <= 1).OnlyEnforceIf(violation_var.Not())
-                            violation_vars.append(violation_var)
+                for window in windows:
+                    team_duties = [(match.id, team.id, duty['type']) for match in window for duty in match.required_duties
+                                   if (match.id, team.id, duty['type']) in team_assignments]
+                    if len({match_id for match_id, _, _ in team_duties}) > 1:
+                        limits.append(DutyLimit(f"rest_{team.id}_{window[0].id}_{window[-1].id}", team_duties, 1))
         
         elif constraint_type == "own_match":
             # Teams cannot referee their own matches
@@ -413,11 +781,49 @@ class PureJuryOptimizer:
                         team_duties = []
                         for duty in match.required_duties:
                             if (match.id, team.id, duty['type']) in team_assignments:
-                                team_duties.append(team_assignments[(match.id, team.id, duty['type'])])
+                                team_duties.append((match.id, team.id, duty['type']))
                         
                         if team_duties:
-                            model.Add(sum(team_duties) == 0)
+                            limits.append(DutyLimit(f"own_match_{team.id}_{match.id}", team_duties, 0, soft=False))
         
+        return limits
+    
+    def _limit_sum(self, limit: DutyLimit, team_assignments, build_prefix_sums, add_sum):
+        """Expression for the duties under a limit; a window limit reuses its timeline's running sums"""
+        if not limit.timeline:
+            return add_sum([team_assignments[key] for key in limit.keys])
+        if limit.timeline.name not in self._prefix_sums:
+            self._prefix_sums[limit.timeline.name] = build_prefix_sums(limit.timeline, team_assignments)
+        return window_sum(self._prefix_sums[limit.timeline.name], limit.first, limit.last)
+    
+    def _apply_constraint_cp_sat(self, model, constraint: Constraint, request: OptimizationRequest, team_assignments) -> List:
+        """Apply a constraint to the CP-SAT model"""
+        violation_vars = []
+        for limit in self._duty_limits(constraint, request, team_assignments):
+            duties = self._limit_sum(limit, team_assignments,
+                                     lambda timeline, variables: cp_sat_prefix_sums(model, timeline, variables), sum)
+            if limit.soft:
+                violation_var = model.NewBoolVar(f"violation_{limit.name}")
+                model.Add(duties <= limit.limit).OnlyEnforceIf(violation_var.Not())
+                violation_vars.append(violation_var)
+            else:
+                model.Add(duties <= limit.limit)
+        return violation_vars
+    
+    def _apply_constraint_linear(self, solver: pywraplp.Solver, constraint: Constraint, request: OptimizationRequest, team_assignments) -> List:
+        """Apply a constraint to the MIP; a violation variable relaxes its limit by big-M"""
+        violation_vars = []
+        for limit in self._duty_limits(constraint, request, team_assignments):
+            duties = self._limit_sum(limit, team_assignments,
+                                     lambda timeline, variables: linear_prefix_sums(solver, timeline, variables), solver.Sum)
+            if limit.soft:
+                violation_var = solver.BoolVar(f"violation_{limit.name}")
+                # The sum can never exceed the number of its variables
+                big_m = max(0, limit.size - limit.limit)
+                solver.Add(duties <= limit.limit + big_m * violation_var)
+                violation_vars.append(violation_var)
+            else:
+                solver.Add(duties <= limit.limit)
         return violation_vars
     
     def _linear_status_name(self, status):
@@ -448,31 +854,220 @@ def parse_request_from_json(json_data: str) -> OptimizationRequest:
         time_limit_seconds=data.get('time_limit_seconds', 300)
     )
 
+def apply_request_overrides(request: OptimizationRequest, time_limit: Optional[float] = None,
+                            relative_gap: Optional[float] = None, absolute_gap: Optional[float] = None,
+                            no_improvement: Optional[float] = None):
+    """Apply command line or query string overrides to a parsed request"""
+    if time_limit:
+        request.time_limit_seconds = time_limit
+    
+    # Stopping criteria go through solver_config so they are part of the cache key
+    for name, value in (('relative_gap', relative_gap), ('absolute_gap', absolute_gap),
+                        ('no_improvement_seconds', no_improvement)):
+        if value is not None:
+            request.solver_config[name] = value
+
+def error_result(message: str) -> OptimizationResult:
+    """Failed result for a request that never reached the optimizer"""
+    return OptimizationResult(success=False, assignments=[], objective_value=0, constraints_satisfied=0,
+                              total_constraints=0, solver_time_seconds=0, solver_status="ERROR",
+                              metadata={}, errors=[message])
+
+class PlannerRequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP API of the planner daemon
+    GET /health, POST /optimize with an OptimizationRequest body, POST /shutdown
+    """
+    server_version = 'JuryPlanner/1.0'
+    protocol_version = 'HTTP/1.1'
+    
+    def do_GET(self):
+        if urlparse(self.path).path == '/health':
+            self._send_json(200, self.server.health())
+        else:
+            self._send_json(404, {'error': f"Unknown path {self.path}"})
+    
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path == '/shutdown':
+            self._send_json(202, {'status': 'stopping'})
+            self.server.request_shutdown()
+        elif url.path == '/optimize':
+            self._optimize({name: values[-1] for name, values in parse_qs(url.query).items()})
+        else:
+            self._send_json(404, {'error': f"Unknown path {self.path}"})
+    
+    def _optimize(self, options: Dict[str, str]):
+        """Solve the request body; options mirror the command line flags"""
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = parse_request_from_json(self.rfile.read(length).decode('utf-8'))
+            apply_request_overrides(
+                request,
+                time_limit=int(options['time_limit']) if 'time_limit' in options else None,
+                relative_gap=float(options['relative_gap']) if 'relative_gap' in options else None,
+                absolute_gap=float(options['absolute_gap']) if 'absolute_gap' in options else None,
+                no_improvement=float(options['no_improvement']) if 'no_improvement' in options else None)
+            solver_type = SolverType(options.get('solver', 'auto'))
+        except (ValueError, KeyError, TypeError) as e:
+            self._send_json(400, asdict(error_result(f"Invalid request: {e}")))
+            return
+        
+        use_cache = options.get('no_cache') not in ('1', 'true')
+        result = self.server.optimize(request, solver_type, use_cache)
+        self._send_json(200, asdict(result))
+    
+    def _send_json(self, status: int, payload: Dict[str, Any]):
+        body = json.dumps(payload, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def address_string(self):
+        # Unix socket peers have no (host, port) address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else 'unix'
+    
+    def log_message(self, format, *args):
+        logger.info(f"{self.address_string()} {format % args}")
+
+class PlannerServer(ThreadingHTTPServer):
+    """
+    Long-running planner that keeps OR-Tools loaded between requests.
+    Listens on localhost or a Unix socket; at most max_concurrent solves run at
+    once and shutdown waits for the running ones to finish.
+    """
+    daemon_threads = False
+    
+    def __init__(self, address, cache: Optional[PlanCache], max_concurrent: int = 1,
+                 selector: Optional[SolverSelector] = None):
+        self.unix_socket = isinstance(address, str)
+        if self.unix_socket:
+            self.address_family = socket.AF_UNIX
+            if os.path.exists(address):
+                os.unlink(address)  # Stale socket of a previous run
+        super().__init__(address, PlannerRequestHandler)
+        self.cache = cache
+        self.selector = selector
+        self.max_concurrent = max_concurrent
+        self.slots = threading.BoundedSemaphore(max_concurrent)
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.served = 0
+        self.active = 0
+        self.stopping = False
+    
+    def server_bind(self):
+        if self.unix_socket:
+            # HTTPServer.server_bind resolves the address as (host, port); a socket path only needs the plain bind
+            socketserver.TCPServer.server_bind(self)
+            self.server_name, self.server_port = 'localhost', 0
+        else:
+            super().server_bind()
+    
+    def server_close(self):
+        super().server_close()
+        if self.unix_socket and os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+    
+    def optimize(self, request: OptimizationRequest, solver_type: SolverType, use_cache: bool = True) -> OptimizationResult:
+        with self.slots:
+            with self.lock:
+                self.active += 1
+            try:
+                optimizer = PureJuryOptimizer(solver_type, self.cache if use_cache else None, self.selector)
+                return optimizer.optimize(request)
+            finally:
+                with self.lock:
+                    self.active -= 1
+                    self.served += 1
+    
+    def health(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                'status': 'stopping' if self.stopping else 'ok',
+                'pid': os.getpid(),
+                'uptime_seconds': round(time.monotonic() - self.started, 1),
+                'requests_served': self.served,
+                'active_requests': self.active,
+                'max_concurrent': self.max_concurrent,
+                'cache': self.cache.cache_dir if self.cache else None,
+            }
+    
+    def request_shutdown(self):
+        """Stop accepting requests; serve_forever returns once the loop notices"""
+        with self.lock:
+            if self.stopping:
+                return
+            self.stopping = True
+        # shutdown() blocks until serve_forever exits, so it cannot run on the serving thread
+        threading.Thread(target=self.shutdown, daemon=True).start()
+
+def serve(args, cache: Optional[PlanCache], selector: Optional[SolverSelector]):
+    """Run the planner daemon until SIGTERM, SIGINT or POST /shutdown"""
+    address = args.socket or (args.host, args.port)
+    server = PlannerServer(address, cache, args.max_concurrent, selector)
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: server.request_shutdown())
+    
+    logger.info(f"Planner daemon listening on {args.socket or f'http://{args.host}:{server.server_port}'} "
+                f"(pid {os.getpid()}, {args.max_concurrent} concurrent solves)")
+    try:
+        server.serve_forever()
+    finally:
+        logger.info("Planner daemon stopping, waiting for running solves")
+        # Joins the request threads, so in-flight plans are still delivered
+        server.server_close()
+        logger.info("Planner daemon stopped")
+
 def main():
     """Main entry point for command line usage"""
     parser = argparse.ArgumentParser(description='Pure Python Jury Assignment Optimizer')
-    parser.add_argument('--input', '-i', required=True, help='Input JSON file with optimization request')
+    parser.add_argument('--input', '-i', help='Input JSON file with optimization request')
     parser.add_argument('--output', '-o', help='Output JSON file for results')
     parser.add_argument('--solver', choices=['sat', 'linear', 'auto'], default='auto', help='Solver type')
     parser.add_argument('--time-limit', type=int, default=300, help='Time limit in seconds')
     parser.add_argument('--verbose', '-v', action='store_true', help='Verbose logging')
+    parser.add_argument('--cache-dir', help='Model/result cache directory (default: $JURY_PLANNER_CACHE_DIR or system temp)')
+    parser.add_argument('--cache-max-mb', type=int, default=DEFAULT_CACHE_MAX_BYTES // (1024 * 1024), help='Cache size bound in MB')
+    parser.add_argument('--no-cache', action='store_true', help='Always rebuild and re-solve')
+    parser.add_argument('--relative-gap', type=float, help='Stop once the relative optimality gap is below this')
+    parser.add_argument('--absolute-gap', type=float, help='Stop once the absolute optimality gap is below this')
+    parser.add_argument('--no-improvement', type=float, metavar='SECONDS', help='Stop after this many seconds without improvement')
+    parser.add_argument('--solver-history', help='Solve history for auto solver selection (default: $JURY_PLANNER_SOLVER_HISTORY or system temp)')
+    parser.add_argument('--race', type=float, default=0, metavar='SECONDS',
+                        help='With --solver auto, race both back ends this long when the choice is unclear (0 disables)')
+    parser.add_argument('--serve', action='store_true', help='Run as a daemon that answers POST /optimize requests')
+    parser.add_argument('--host', default=DEFAULT_SERVER_HOST, help='Daemon listen address (default: %(default)s)')
+    parser.add_argument('--port', type=int, default=DEFAULT_SERVER_PORT, help='Daemon listen port (default: %(default)s)')
+    parser.add_argument('--socket', help='Listen on this Unix socket instead of host and port')
+    parser.add_argument('--max-concurrent', type=int, default=1, help='Daemon solves running at once (default: %(default)s)')
     
     args = parser.parse_args()
+    if not args.serve and not args.input:
+        parser.error('--input is required unless --serve is given')
     
     if args.verbose:
         logging.getLogger().setLevel(logging.DEBUG)
     
+    cache = None if args.no_cache else PlanCache(args.cache_dir, args.cache_max_mb * 1024 * 1024)
+    # Only auto selection reads and feeds the solve history; the daemon takes the solver per request
+    selector = SolverSelector('autoplanner', SolveHistory(args.solver_history), args.race or None) \
+        if args.serve or args.solver == 'auto' else None
+    if args.serve:
+        serve(args, cache, selector)
+        return
+    
     try:
         # Read input
         with open(args.input, 'r') as f:
             request = parse_request_from_json(f.read())
         
-        # Override time limit if specified
-        if args.time_limit:
-            request.time_limit_seconds = args.time_limit
+        apply_request_overrides(request, args.time_limit, args.relative_gap, args.absolute_gap, args.no_improvement)
         
         # Run optimization
-        optimizer = PureJuryOptimizer(SolverType(args.solver))
+        optimizer = PureJuryOptimizer(SolverType(args.solver), cache, selector)
         result = optimizer.optimize(request)
         
         # Output results
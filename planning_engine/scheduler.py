@@ -4,6 +4,7 @@ from dataclasses import dataclass
 from enum import Enum
 import logging
 from ortools.sat.python import cp_model
+from planning_engine.stopping_policy import StoppingPolicy
 
 logger = logging.getLogger(__name__)
 
@@ -29,7 +30,8 @@ class JuryPlanningEngine:
     Uses Google OR-Tools CP-SAT solver for optimization
     """
     
-    def __init__(self):
+    def __init__(self, stopping_policy: Optional[StoppingPolicy] = None):
+        self.stopping_policy = stopping_policy or StoppingPolicy()
         self.model = None
         self.solver = None
         self.constraints = []
@@ -43,8 +45,8 @@ class JuryPlanningEngine:
             self.model = cp_model.CpModel()
             self.solver = cp_model.CpSolver()
             
-            # Set solver parameters
-            self.solver.parameters.max_time_in_seconds = 300.0
+            # Set solver parameters; gap limits and the hard cap come from the stopping policy
+            self.stopping_policy.apply(self.solver)
             self.solver.parameters.log_search_progress = True
             
             self._create_variables(matches, teams)
@@ -277,7 +279,7 @@ class JuryPlanningEngine:
             return False, {"error": "Model not initialized"}
         
         try:
-            status = self.solver.Solve(self.model)
+            status, outcome = self.stopping_policy.solve(self.solver, self.model)
             
             if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
                 solution = self._extract_solution()
@@ -286,6 +288,8 @@ class JuryPlanningEngine:
                     "status": "optimal" if status == cp_model.OPTIMAL else "feasible",
                     "objective_value": self.solver.ObjectiveValue(),
                     "solve_time": self.solver.WallTime(),
+                    "stop_reason": outcome['stop_reason'],
+                    "final_gap": outcome['final_gap'],
                     "assignments": solution,
                     "statistics": {
                         "num_variables": self.solver.NumVariables(),
@@ -299,7 +303,8 @@ class JuryPlanningEngine:
             else:
                 return False, {
                     "error": f"No solution found. Status: {self.solver.StatusName(status)}",
-                    "solve_time": self.solver.WallTime()
+                    "solve_time": self.solver.WallTime(),
+                    "stop_reason": outcome['stop_reason']
                 }
                 
         except Exception as e:
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Synthetic Season Generator
+Builds realistic fake seasons so the planning engines can be measured without MySQL or PHP exports
+"""
+
+import json
+import random
+import argparse
+from datetime import datetime, timedelta
+from typing import Dict, List, Any
+from dataclasses import dataclass, field, asdict
+
+# Club prefix shared by the jury team names and the club's home teams
+CLUB_NAME = "MNC Dordrecht"
+
+# Team id of the static jury team used by static_assignments
+STATIC_TEAM_ID = 99
+
+# Hard rules of wp-juryv1.0.py that locked matches must respect
+MAX_DUTIES_PER_DAY = 3
+D1_D2_COUNTERPARTS = {
+    f"{CLUB_NAME} Da1": f"{CLUB_NAME} Da2",
+    f"{CLUB_NAME} Da2": f"{CLUB_NAME} Da1",
+}
+
+@dataclass
+class SeasonSpec:
+    """Size parameters of a synthetic season"""
+    teams: int = 12
+    match_days: int = 24
+    matches_per_day: int = 4
+    go_competitions: int = 1
+    static_assignments: int = 1
+    locked_ratio: float = 0.0
+    away_fixtures: int = 1
+    seed: int = 1
+    start_date: str = "2024-09-07"
+
+    def label(self) -> str:
+        return (f"t{self.teams}-d{self.match_days}-m{self.matches_per_day}-go{self.go_competitions}"
+                f"-s{self.static_assignments}-l{self.locked_ratio:g}-a{self.away_fixtures}")
+
+@dataclass
+class SyntheticSeason:
+    """A generated season in the shape of the wp_jury database rows"""
+    spec: SeasonSpec
+    jury_teams: List[Dict[str, Any]] = field(default_factory=list)
+    home_matches: List[Dict[str, Any]] = field(default_factory=list)
+    away_matches: List[Dict[str, Any]] = field(default_factory=list)
+    static_assignments: Dict[str, int] = field(default_factory=dict)
+
+    def season_inputs(self) -> Dict[str, Any]:
+        """Arguments for assign_jury_teams_to_matches in wp-juryv1.0.py"""
+        return {
+            'home_matches': self.home_matches,
+            'away_matches': self.away_matches,
+            'jury_teams': self.jury_teams,
+            'static_assignments': self.static_assignments,
+        }
+
+    def autoplanner_request(self, time_limit_seconds: int = 300) -> Dict[str, Any]:
+        """Request JSON in the format PurePythonAutoplannerService sends to pure_autoplanner.py"""
+        return {
+            'teams': [{'id': team['team_id'], 'name': team['team_name'], 'capacity_weight': 1.0,
+                       'is_active': True, 'dedicated_to_team': None}
+                      for team in self.jury_teams if team['team_id'] != STATIC_TEAM_ID],
+            'matches': [{'id': match['match_id'], 'date_time': match['date_time'].strftime('%Y-%m-%d %H:%M:%S'),
+                         'home_team': match['home_team'], 'away_team': match['away_team'], 'location': 'Sportpark',
+                         'competition': match['competition'],
+                         'required_duties': [{'type': 'clock', 'count': 1, 'weight': 1.0},
+                                             {'type': 'score', 'count': 1, 'weight': 1.0}],
+                         'importance_multiplier': 1.0, 'is_locked': bool(match.get('locked'))}
+                        for match in self.home_matches],
+            'constraints': [
+                {'id': 1, 'name': 'Own match', 'constraint_type': 'own_match', 'rule_type': 'forbidden',
+                 'weight': -1000.0, 'parameters': {}, 'is_active': True},
+                {'id': 2, 'name': 'Rest between matches', 'constraint_type': 'rest_between_matches',
+                 'rule_type': 'not_preferred', 'weight': -50.0, 'parameters': {'min_rest_days': 1}, 'is_active': True},
+                {'id': 3, 'name': 'Max duties per period', 'constraint_type': 'max_duties_per_period',
+                 'rule_type': 'not_preferred', 'weight': -50.0,
+                 'parameters': {'max_duties': 3, 'period_days': 7}, 'is_active': True},
+            ],
+            'solver_config': {'seed': self.spec.seed},
+            'time_limit_seconds': time_limit_seconds,
+        }
+
+    def php_export(self) -> Dict[str, Any]:
+        """Configuration in the format the PHP constraint editor exports for enhanced_optimizer.py"""
+        request = self.autoplanner_request()
+        for match in request['matches']:
+            for duty in match['required_duties']:
+                duty['required'] = True
+        return {
+            'teams': request['teams'],
+            'matches': request['matches'],
+            'constraints': [
+                {'template': 'rest_between_matches', 'rule_type': 'NOT_PREFERRED', 'weight': -50.0,
+                 'parameters': {'min_rest_days': 1}},
+                {'template': 'max_duties_per_period', 'rule_type': 'NOT_PREFERRED', 'weight': -50.0,
+                 'parameters': {'max_duties': 3, 'period_days': 7}},
+            ],
+            'weight_multipliers': {},
+        }
+
+def generate_season(spec: SeasonSpec) -> SyntheticSeason:
+    """Generate a season: weekend match days, GO blocks at the start of the day, away fixtures and locks"""
+    rng = random.Random(spec.seed)
+    season = SyntheticSeason(spec=spec)
+
+    team_names = [f"{CLUB_NAME} {'H' if i % 2 else 'Da'}{i // 2 + 1}" for i in range(spec.teams)]
+    season.jury_teams = [{'team_id': i + 1, 'team_name': name} for i, name in enumerate(team_names)]
+    season.jury_teams.append({'team_id': STATIC_TEAM_ID, 'team_name': f"{CLUB_NAME} Static"})
+
+    # Youth teams whose home matches are always juried by the static team
+    static_teams = [f"{CLUB_NAME} Jeugd{i + 1}" for i in range(spec.static_assignments)]
+    season.static_assignments = {name: STATIC_TEAM_ID for name in static_teams}
+
+    regular_competitions = ['Heren 1e klasse', 'Dames 1e klasse', 'Heren 2e klasse', 'Dames 2e klasse']
+    go_competitions = [f"GO-{chr(ord('A') + i)}" for i in range(spec.go_competitions)]
+
+    first_day = datetime.fromisoformat(spec.start_date)
+    match_id = 1
+    away_id = 100000
+    for day_index in range(spec.match_days):
+        # Saturday and Sunday of consecutive weekends
+        day = first_day + timedelta(days=7 * (day_index // 2) + day_index % 2)
+        go_count = 2 if go_competitions and day_index % 2 == 0 and spec.matches_per_day >= 3 else 0
+
+        for slot in range(spec.matches_per_day):
+            start = day.replace(hour=10) + timedelta(minutes=75 * slot)
+            competition = rng.choice(go_competitions) if slot < go_count else rng.choice(regular_competitions)
+            if static_teams and slot == spec.matches_per_day - 1 and day_index % 3 == 0:
+                home_team = rng.choice(static_teams)
+            else:
+                home_team = rng.choice(team_names)
+            season.home_matches.append({
+                'match_id': match_id,
+                'match_date': start.date(),
+                'date_time': start,
+                'competition': competition,
+                'home_team': home_team,
+                'away_team': f"Opponent {match_id}",
+            })
+            match_id += 1
+
+        for _ in range(spec.away_fixtures):
+            season.away_matches.append({
+                'match_id': away_id,
+                'match_date': day.date(),
+                'competition': rng.choice(regular_competitions),
+                'home_team': f"Opponent {away_id}",
+                'away_team': rng.choice(team_names),
+            })
+            away_id += 1
+
+    _lock_matches(season, rng)
+    return season
+
+def _lock_matches(season: SyntheticSeason, rng: random.Random):
+    """
+    Lock a share of the matches in runs of consecutive matches, one jury team per run.
+    Each day is tiled into pairs, the last one a triple on odd days, so the GO block at
+    the start of the day is never split and no unlocked match is left without a neighbour.
+    A run goes to a team that is free that day and has no other run that day or the day before.
+    """
+    if season.spec.locked_ratio <= 0:
+        return
+    busy_by_day = {}
+    for match in season.home_matches:
+        busy_by_day.setdefault(match['match_date'], set()).add(match['home_team'])
+    for match in season.away_matches:
+        busy_by_day.setdefault(match['match_date'], set()).add(match['away_team'])
+
+    locked_by_day = {}
+    candidates = [team for team in season.jury_teams if team['team_id'] != STATIC_TEAM_ID]
+    for day, day_matches in _matches_by_day(season).items():
+        locked_by_day[day] = set()
+        for run in _lock_runs(day_matches):
+            if any(match['home_team'] in season.static_assignments for match in run) or rng.random() >= season.spec.locked_ratio:
+                continue
+            previous = locked_by_day.get(day - timedelta(days=1), set())
+            free = [team['team_id'] for team in candidates
+                    if team['team_name'] not in busy_by_day.get(day, ())
+                    and team['team_id'] not in locked_by_day[day] | previous
+                    and not any(D1_D2_COUNTERPARTS.get(match['home_team']) == team['team_name'] for match in run)]
+            if not free:
+                continue
+            team_id = rng.choice(free)
+            locked_by_day[day].add(team_id)
+            for match in run:
+                match['assigned_team'] = team_id
+                match['locked'] = 1
+
+    _check_locks(season, busy_by_day)
+
+def _matches_by_day(season: SyntheticSeason) -> Dict[Any, List[Dict[str, Any]]]:
+    """Home matches by date, sorted by start time"""
+    by_day = {}
+    for match in sorted(season.home_matches, key=lambda match: match['date_time']):
+        by_day.setdefault(match['match_date'], []).append(match)
+    return by_day
+
+def _lock_runs(day_matches: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """Tile a day into consecutive pairs; an odd last match joins the last pair"""
+    if len(day_matches) < 2:
+        return []
+    runs = [day_matches[i:i + 2] for i in range(0, len(day_matches) - 1, 2)]
+    if len(day_matches) % 2:
+        runs[-1].append(day_matches[-1])
+    return runs
+
+def _check_locks(season: SyntheticSeason, busy_by_day: Dict[Any, set]):
+    """Raise ValueError if the locked matches break a hard rule of the season model"""
+    problems = []
+    locked_days = {}
+    for day, day_matches in _matches_by_day(season).items():
+        locked = {}
+        for position, match in enumerate(day_matches):
+            team_id = match.get('assigned_team') if match.get('locked') else None
+            if team_id is None:
+                continue
+            locked.setdefault(team_id, []).append(match)
+            team_name = next(team['team_name'] for team in season.jury_teams if team['team_id'] == team_id)
+            neighbours = day_matches[max(0, position - 1):position] + day_matches[position + 1:position + 2]
+            if not any(neighbour.get('locked') and neighbour.get('assigned_team') == team_id for neighbour in neighbours):
+                problems.append(f"match {match['match_id']}: locked without a neighbouring duty of team {team_id}")
+            if team_name in busy_by_day.get(day, ()):
+                problems.append(f"match {match['match_id']}: team {team_id} plays on {day}")
+            if D1_D2_COUNTERPARTS.get(match['home_team']) == team_name:
+                problems.append(f"match {match['match_id']}: team {team_id} is the D1/D2 counterpart of the home team")
+        for team_id, matches in locked.items():
+            if len(matches) > MAX_DUTIES_PER_DAY:
+                problems.append(f"{day}: team {team_id} has {len(matches)} locked duties")
+            if team_id in locked_days.get(day - timedelta(days=1), ()):
+                problems.append(f"{day}: team {team_id} is also locked the day before")
+        locked_days[day] = set(locked)
+    if problems:
+        raise ValueError("Locked matches break hard rules: " + "; ".join(problems))
+
+def main():
+    """Write a synthetic season as autoplanner request JSON (or PHP export)"""
+    parser = argparse.ArgumentParser(description='Generate a synthetic jury planning season')
+    for name, value in asdict(SeasonSpec()).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value)
+    parser.add_argument('--format', choices=['autoplanner', 'php'], default='autoplanner', help='Output format')
+    parser.add_argument('--output', '-o', help='Output JSON file (default: stdout)')
+    args = parser.parse_args()
+
+    spec = SeasonSpec(**{name: getattr(args, name) for name in asdict(SeasonSpec())})
+    season = generate_season(spec)
+    data = season.autoplanner_request() if args.format == 'autoplanner' else season.php_export()
+
+    output = json.dumps(data, indent=2, default=str)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,221 @@
+"""
+Calibrated solver selection for the planning engines
+Predicts the solve time of each back end from problem features with a cost model
+fitted on locally recorded runs, and can race the back ends when the prediction is unclear
+"""
+
+import os
+import json
+import math
+import time
+import logging
+import tempfile
+import threading
+from collections import Counter
+from datetime import datetime
+from dataclasses import dataclass, asdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Callable, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Back ends as named by the engines' SolverType values
+BACKENDS = ('sat', 'linear')
+
+# Recorded runs per back end before the cost model replaces the engine's fixed heuristic
+MIN_SAMPLES = 5
+
+# Predicted speed-up below which the choice counts as unclear
+CLEAR_SPEEDUP = 1.5
+
+# Most recent runs per engine and back end the cost model is fitted on
+MAX_HISTORY_RUNS = 500
+
+# Runs per engine and back end at which the history file is trimmed back to MAX_HISTORY_RUNS
+COMPACT_HISTORY_RUNS = 2 * MAX_HISTORY_RUNS
+
+# Ridge penalty that keeps the fit stable while few runs are recorded
+RIDGE_PENALTY = 1e-2
+
+@dataclass(frozen=True)
+class ProblemFeatures:
+    """Shape of a planning problem as seen by the cost model"""
+    variables: int
+    hard_constraints: int
+    soft_constraints: int
+    density: float  # Average number of constraint rows a variable appears in
+    days: int
+
+    def vector(self) -> List[float]:
+        """Regressors of the log solve time"""
+        return [1.0, math.log1p(self.variables), math.log1p(self.hard_constraints),
+                math.log1p(self.soft_constraints), self.density, math.log1p(self.days)]
+
+@dataclass
+class Selection:
+    """Back end picked for one request and why"""
+    backend: str
+    reason: str  # 'model', 'fallback' or 'race'
+    predicted_seconds: Optional[Dict[str, float]] = None
+    unclear: bool = False
+
+class SolveHistory:
+    """
+    JSON lines file of finished solves, one line per run. Runs are appended;
+    once an engine and back end reach COMPACT_HISTORY_RUNS the file is
+    rewritten with the most recent MAX_HISTORY_RUNS of each.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv('JURY_PLANNER_SOLVER_HISTORY') or \
+            os.path.join(tempfile.gettempdir(), 'jury_planner_solver_history.jsonl')
+        self._lock = threading.Lock()
+
+    def record(self, engine: str, backend: str, features: ProblemFeatures, solve_time: float,
+               status: str, stop_reason: Optional[str] = None):
+        entry = {
+            'engine': engine,
+            'backend': backend,
+            'features': asdict(features),
+            'solve_time': solve_time,
+            'status': status,
+            'stop_reason': stop_reason,
+            'recorded': datetime.now().isoformat(),
+        }
+        try:
+            with self._lock:
+                with open(self.path, 'a') as f:
+                    f.write(json.dumps(entry) + '\n')
+                self._compact()
+        except OSError as e:
+            logger.warning(f"Could not record solve in {self.path}: {e}")
+
+    def _entries(self) -> List[Dict[str, Any]]:
+        """All readable runs in file order"""
+        entries = []
+        if not os.path.exists(self.path):
+            return entries
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue  # Line cut short by a crash
+        return entries
+
+    def _compact(self):
+        """Rewrite the file with the last MAX_HISTORY_RUNS runs per engine and back end once one has too many"""
+        entries = self._entries()
+        counts = Counter((entry.get('engine'), entry.get('backend')) for entry in entries)
+        if max(counts.values(), default=0) < COMPACT_HISTORY_RUNS:
+            return
+
+        kept, seen = [], Counter()
+        for entry in reversed(entries):
+            key = (entry.get('engine'), entry.get('backend'))
+            seen[key] += 1
+            if seen[key] <= MAX_HISTORY_RUNS:
+                kept.append(entry)
+
+        # Replace in one step so a reader never sees a half written file
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                for entry in reversed(kept):
+                    f.write(json.dumps(entry) + '\n')
+            os.replace(temp_path, self.path)
+        except OSError:
+            os.unlink(temp_path)
+            raise
+
+    def runs(self, engine: str) -> Dict[str, List[Dict[str, Any]]]:
+        """Recorded runs of an engine by back end, most recent last"""
+        runs = {backend: [] for backend in BACKENDS}
+        for entry in self._entries():
+            if entry.get('engine') == engine and entry.get('backend') in runs:
+                runs[entry['backend']].append(entry)
+        return {backend: entries[-MAX_HISTORY_RUNS:] for backend, entries in runs.items()}
+
+class SolverSelector:
+    """
+    Chooses the back end with the lowest predicted solve time. Each back end gets
+    a ridge regression of log solve time on ProblemFeatures, fitted on the engine's
+    recorded runs. Runs stopped by a limit count at the time they used, which
+    understates the slow back end but never favours it.
+    """
+
+    def __init__(self, engine: str, history: Optional[SolveHistory] = None, race_seconds: Optional[float] = None):
+        self.engine = engine
+        self.history = history or SolveHistory()
+        self.race_seconds = race_seconds
+
+    def predict(self, features: ProblemFeatures) -> Optional[Dict[str, Tuple[float, float]]]:
+        """(predicted seconds, RMSE of the log fit) per back end, or None without enough runs"""
+        runs = self.history.runs(self.engine)
+        predictions = {}
+        for backend in BACKENDS:
+            samples = runs[backend]
+            if len(samples) < MIN_SAMPLES:
+                return None
+            x = np.array([ProblemFeatures(**sample['features']).vector() for sample in samples])
+            y = np.log([max(sample['solve_time'], 1e-3) for sample in samples])
+            weights = np.linalg.solve(x.T @ x + RIDGE_PENALTY * np.eye(x.shape[1]), x.T @ y)
+            rmse = float(np.sqrt(np.mean((y - x @ weights) ** 2)))
+            predictions[backend] = (float(math.exp(np.dot(features.vector(), weights))), rmse)
+        return predictions
+
+    def choose(self, features: ProblemFeatures, fallback: str) -> Selection:
+        """
+        Pick a back end; `fallback` is the engine's own heuristic, used until
+        enough runs are recorded. The choice is unclear when the predicted
+        speed-up is within CLEAR_SPEEDUP or within the fit error.
+        """
+        predicted = self.predict(features)
+        if predicted is None:
+            return Selection(fallback, 'fallback', unclear=True)
+
+        seconds = {backend: prediction for backend, (prediction, _) in predicted.items()}
+        fastest = min(seconds, key=seconds.get)
+        margin = math.log(max(seconds.values()) / seconds[fastest])
+        uncertainty = max(rmse for _, rmse in predicted.values())
+        unclear = margin < max(math.log(CLEAR_SPEEDUP), uncertainty)
+        logger.info(f"Predicted solve time: " + ", ".join(f"{backend} {value:.2f}s" for backend, value in seconds.items())
+                    + (" (unclear)" if unclear else ""))
+        return Selection(fastest, 'model', seconds, unclear)
+
+    def race(self, contenders: Dict[str, Callable[[float, int], Tuple[Any, bool, Optional[float]]]],
+             preferred: str) -> Tuple[str, Any]:
+        """
+        Run every back end for race_seconds at the same time. A contender is
+        called with the seconds and its share of the cores as solver workers, so
+        neither back end is slowed by the other's threads, and returns
+        (result, proved optimal, final gap). The first back end to prove
+        optimality wins and its result is returned; otherwise the smaller gap
+        wins, ties go to `preferred`, and the result is None.
+        """
+        workers = max(1, (os.cpu_count() or 1) // len(contenders))
+
+        def timed(run):
+            started = time.perf_counter()
+            result, proven, gap = run(self.race_seconds, workers)
+            return result, proven, gap, time.perf_counter() - started
+
+        with ThreadPoolExecutor(max_workers=len(contenders)) as pool:
+            futures = {backend: pool.submit(timed, run) for backend, run in contenders.items()}
+            outcomes = {backend: future.result() for backend, future in futures.items()}
+
+        proven = [backend for backend, outcome in outcomes.items() if outcome[1]]
+        if proven:
+            winner = min(proven, key=lambda backend: outcomes[backend][3])
+            logger.info(f"Race: {winner} proved optimality in {outcomes[winner][3]:.2f}s")
+            return winner, outcomes[winner][0]
+
+        def gap_key(backend):
+            gap = outcomes[backend][2]
+            return (math.inf if gap is None else gap, backend != preferred)
+        winner = min(outcomes, key=gap_key)
+        logger.info(f"Race: no proof within {self.race_seconds:g}s, continuing with {winner} "
+                    f"(gaps: " + ", ".join(f"{backend} {outcome[2]}" for backend, outcome in outcomes.items()) + ")")
+        return winner, None
@@ -0,0 +1,141 @@
+"""
+Shared stopping policy for the CP-SAT engines
+Stops a solve on a relative or absolute gap, after a stretch without improvement,
+or at a hard wall-clock cap, and reports why the solve stopped and the final gap
+"""
+
+import time
+import threading
+import logging
+from dataclasses import dataclass, replace
+from typing import Dict, Any, Optional, Tuple
+from ortools.sat.python import cp_model
+
+logger = logging.getLogger(__name__)
+
+class StopReason:
+    """Values reported as stop_reason"""
+    OPTIMAL = "optimal"
+    GAP_LIMIT = "gap_limit"
+    NO_IMPROVEMENT = "no_improvement"
+    TIME_LIMIT = "time_limit"
+    INFEASIBLE = "infeasible"
+    MODEL_INVALID = "model_invalid"
+    UNKNOWN = "unknown"
+
+class SolutionTracker(cp_model.CpSolverSolutionCallback):
+    """
+    Solution callback that records when the solver last improved the objective.
+    Engine callbacks subclass it and call SolutionTracker.on_solution_callback(self).
+    """
+
+    def __init__(self):
+        cp_model.CpSolverSolutionCallback.__init__(self)
+        self.solutions = 0
+        self.first_solution_time = None
+        self.last_improvement = None
+
+    def on_solution_callback(self):
+        # CP-SAT only reports strictly improving solutions while optimizing
+        self.solutions += 1
+        if self.first_solution_time is None:
+            self.first_solution_time = self.WallTime()
+        self.last_improvement = time.monotonic()
+
+@dataclass(frozen=True)
+class StoppingPolicy:
+    """When to stop a CP-SAT solve; None disables a criterion"""
+    relative_gap: Optional[float] = 0.005
+    absolute_gap: Optional[float] = None
+    no_improvement_seconds: Optional[float] = 60.0
+    max_time_seconds: Optional[float] = 300.0
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]], **defaults) -> 'StoppingPolicy':
+        """Build a policy from a solver_config dict, falling back to defaults and the class defaults"""
+        policy = replace(cls(), **defaults)
+        config = config or {}
+        values = {name: config[name] for name in ('relative_gap', 'absolute_gap', 'no_improvement_seconds', 'max_time_seconds')
+                  if name in config}
+        return replace(policy, **values)
+
+    def with_time_limit(self, time_limit: Optional[float]) -> 'StoppingPolicy':
+        """Same policy with the hard cap replaced by time_limit, if one is given"""
+        return replace(self, max_time_seconds=time_limit) if time_limit else self
+
+    def apply(self, solver: cp_model.CpSolver):
+        """Set the gap limits and the hard cap on the solver parameters"""
+        if self.max_time_seconds:
+            solver.parameters.max_time_in_seconds = self.max_time_seconds
+        if self.relative_gap is not None:
+            solver.parameters.relative_gap_limit = self.relative_gap
+        if self.absolute_gap is not None:
+            solver.parameters.absolute_gap_limit = self.absolute_gap
+
+    def solve(self, solver: cp_model.CpSolver, model: cp_model.CpModel,
+              callback: Optional[SolutionTracker] = None) -> Tuple[int, Dict[str, Any]]:
+        """Solve under this policy; returns the status and the stop metadata"""
+        self.apply(solver)
+        callback = callback or SolutionTracker()
+
+        stopped_idle = threading.Event()
+        finished = threading.Event()
+        watchdog = None
+        if self.no_improvement_seconds:
+            def watch():
+                while not finished.wait(0.1):
+                    last = getattr(callback, 'last_improvement', None)
+                    if last is not None and time.monotonic() - last >= self.no_improvement_seconds:
+                        stopped_idle.set()
+                        solver.StopSearch()
+                        return
+            watchdog = threading.Thread(target=watch, daemon=True)
+            watchdog.start()
+
+        try:
+            status = solver.Solve(model, callback)
+        finally:
+            finished.set()
+            if watchdog:
+                watchdog.join()
+
+        outcome = self.outcome(solver, status, stopped_idle.is_set())
+        outcome['first_solution_time'] = getattr(callback, 'first_solution_time', None)
+        outcome['solutions'] = getattr(callback, 'solutions', None)
+        logger.info(f"Solve stopped: {outcome['stop_reason']}, gap {outcome['final_gap']}, {outcome['wall_time']:.2f}s")
+        return status, outcome
+
+    def outcome(self, solver: cp_model.CpSolver, status: int, stopped_idle: bool = False) -> Dict[str, Any]:
+        """Stop reason and final gap of a finished solve"""
+        solved = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+        objective = solver.ObjectiveValue() if solved else None
+        bound = solver.BestObjectiveBound() if solved else None
+        gap = abs(objective - bound) / max(1.0, abs(objective)) if solved else None
+
+        if status == cp_model.INFEASIBLE:
+            reason = StopReason.INFEASIBLE
+        elif status == cp_model.MODEL_INVALID:
+            reason = StopReason.MODEL_INVALID
+        elif stopped_idle:
+            reason = StopReason.NO_IMPROVEMENT
+        elif status == cp_model.OPTIMAL:
+            # CP-SAT reports OPTIMAL when a gap limit is reached too
+            reason = StopReason.OPTIMAL if objective == bound else StopReason.GAP_LIMIT
+        elif self.max_time_seconds and solver.WallTime() >= self.max_time_seconds * 0.99:
+            reason = StopReason.TIME_LIMIT
+        else:
+            reason = StopReason.UNKNOWN
+
+        return {
+            'stop_reason': reason,
+            'final_gap': gap,
+            'objective': objective,
+            'best_bound': bound,
+            'wall_time': solver.WallTime(),
+            'policy': {
+                'relative_gap': self.relative_gap,
+                'absolute_gap': self.absolute_gap,
+                'no_improvement_seconds': self.no_improvement_seconds,
+                'max_time_seconds': self.max_time_seconds,
+            },
+        }
@@ -0,0 +1,41 @@
+"""--diagnose must name the rules behind pruned (match, team) pairs"""
+
+import importlib.util
+import os
+import sys
+from datetime import date, datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+spec = importlib.util.spec_from_file_location('wp_jury', os.path.join(ROOT, 'wp-juryv1.0.py'))
+wp_jury = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(wp_jury)
+
+
+def go_block_season():
+    """A GO block of matches 1 and 2 that no team may jury: team 2 plays match 1,
+    team 1 plays match 2 and team 3 is the D1/D2 counterpart of match 2's home team."""
+    jury_teams = [
+        {'team_id': 1, 'team_name': 'MNC Dordrecht Da1'},
+        {'team_id': 2, 'team_name': 'MNC Dordrecht H1'},
+        {'team_id': 3, 'team_name': 'MNC Dordrecht Da2'},
+    ]
+    home_matches = [
+        {'match_id': 1, 'match_date': date(2024, 9, 7), 'date_time': datetime(2024, 9, 7, 10, 0),
+         'competition': 'GO-A', 'home_team': 'MNC Dordrecht H1', 'away_team': 'Opponent 1'},
+        {'match_id': 2, 'match_date': date(2024, 9, 7), 'date_time': datetime(2024, 9, 7, 11, 15),
+         'competition': 'GO-A', 'home_team': 'MNC Dordrecht Da1', 'away_team': 'Opponent 2'},
+    ]
+    return home_matches, [], jury_teams, {}
+
+
+def test_diagnose_names_pruned_pair_families(capsys):
+    home_matches, away_matches, jury_teams, static_assignments = go_block_season()
+    plan = wp_jury.assign_jury_teams_to_matches(home_matches, away_matches, jury_teams, static_assignments,
+                                                time_limit=10, hint_mode='off', seed=1, diagnose=True)
+    assert not plan
+
+    report = capsys.readouterr().out.split('Conflicting hard constraints:')[1]
+    assert 'not_own_match' in report
+    assert 'd1_d2' in report
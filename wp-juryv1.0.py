@@ -1,13 +1,20 @@
 import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, errorcode, pooling
 from ortools.sat.python import cp_model
 from collections import defaultdict
+from contextlib import contextmanager
 from datetime import datetime, date, timedelta
+from dataclasses import dataclass, field
 from dotenv import load_dotenv, find_dotenv
 import os
 import sys
 import logging
 import random
+import argparse
+import time
+import json
+from concurrent.futures import ProcessPoolExecutor
+from planning_engine.stopping_policy import StoppingPolicy, SolutionTracker
 
 # Set up logging
 logging.basicConfig(
@@ -19,36 +26,60 @@ logging.basicConfig(
     ]
 )
 
-class AssignmentDebugCallback(cp_model.CpSolverSolutionCallback):
-    def __init__(self, assignment_vars, matches, jury_teams):
-        cp_model.CpSolverSolutionCallback.__init__(self)
+def get_solver_callback_logger():
+    """Logger for solver progress; its file handler is attached only once per process."""
+    logger = logging.getLogger('solver_callback')
+    logger.setLevel(logging.INFO)
+    if not logger.handlers:
+        fh = logging.FileHandler('solver.log')
+        fh.setLevel(logging.INFO)
+        fh.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+        logger.addHandler(fh)
+    return logger
+
+
+class AssignmentDebugCallback(SolutionTracker):
+    """Records objective, bound and time of every improving solution.
+
+    The full plan is written at most once every `plan_interval` seconds, so a long
+    solve does not spend its time formatting plans.
+    """
+
+    def __init__(self, assignment_vars, matches, jury_teams, plan_interval=None):
+        SolutionTracker.__init__(self)
         self._vars = assignment_vars
         self._matches = matches
         self._jury_teams = jury_teams
         self._team_lookup = {team['team_id']: team['team_name'] for team in jury_teams}
         self._solution_count = 0
-        
-        # Setup logging
-        self.logger = logging.getLogger('solver_callback')
-        self.logger.setLevel(logging.INFO)
-        
-        # Create file handler
-        fh = logging.FileHandler('solver.log')
-        fh.setLevel(logging.INFO)
-        
-        # Create formatter
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        fh.setFormatter(formatter)
-        
-        # Add handler to logger
-        self.logger.addHandler(fh)
+        self._plan_interval = progress_plan_interval if plan_interval is None else plan_interval
+        self._last_plan_time = None
+        self.progress = []
+        self.logger = get_solver_callback_logger()
 
     def log_and_print(self, message):
         print(message)
         self.logger.info(message)
 
     def on_solution_callback(self):
+        SolutionTracker.on_solution_callback(self)
         self._solution_count += 1
+        wall_time = self.WallTime()
+        objective = self.ObjectiveValue()
+        bound = self.BestObjectiveBound()
+        self.progress.append({
+            'solution': self._solution_count,
+            'objective': objective,
+            'bound': bound,
+            'time': wall_time,
+        })
+        self.log_and_print(f"Solution {self._solution_count}: objective {objective:.1f}, bound {bound:.1f}, {wall_time:.2f}s")
+
+        if self._last_plan_time is None or wall_time - self._last_plan_time >= self._plan_interval:
+            self._last_plan_time = wall_time
+            self.log_plan()
+
+    def log_plan(self):
         self.log_and_print(f"\n=== Solution {self._solution_count} ===")
         
         # Group assignments by date for better logging
@@ -85,6 +116,46 @@ class AssignmentDebugCallback(cp_model.CpSolverSolutionCallback):
 # Configuration
 max_assignments_per_day = 3
 
+# Teams that may never jury each other's home matches
+d1_d2_counterparts = {
+    'MNC Dordrecht Da1': 'MNC Dordrecht Da2',
+    'MNC Dordrecht Da2': 'MNC Dordrecht Da1',
+}
+
+# Constraint families guarded by assumption literals when diagnosing an infeasible model
+hard_constraint_families = (
+    'static_assignments', 'no_double_weekend', 'no_consecutive_days', 'forbid_2nd_assignment',
+    'one_team_per_match', 'go_matches', 'max_assignments_per_day', 'away_teams', 'not_own_match', 'd1_d2',
+)
+
+# Constraint kinds counted as boolean in the build profile
+boolean_constraint_kinds = ('bool_or', 'bool_and', 'at_most_one', 'exactly_one', 'bool_xor')
+
+# When a season solve stops: seconds without improvement and a hard cap; --time-limit replaces the cap.
+# No gap limit by default: the blended objective is dominated by the soft-constraint penalties,
+# so any relative gap is reached long before the points difference is optimised
+season_stopping_policy = StoppingPolicy(relative_gap=None, absolute_gap=None, no_improvement_seconds=60, max_time_seconds=300)
+
+# Minimum seconds between full plan dumps from the solver progress callback
+progress_plan_interval = 60
+
+# Solution hints from the stored plan: 'off', 'as-is' or 'repair'
+solution_hint_mode = 'repair'
+
+# Season objective: 'blended' weighted sum or 'staged' (soft constraints, then points difference, then tie-break)
+season_objective_mode = 'blended'
+
+# Symmetry breaking between interchangeable jury teams: 'off', 'points' or 'first-assignment'
+symmetry_breaking_mode = 'first-assignment'
+
+# Planning window used when neither the command line nor the environment sets one
+default_start_date = '2024-09-01'
+default_end_date = '2025-04-30'
+
+# Rolling-horizon decomposition: weekends solved per window and weekends re-planned by the next window
+rolling_window_weekends = 4
+rolling_overlap_weekends = 1
+
 # Load Environment
 def load_env_variables():
     load_dotenv(find_dotenv())  # Load environment variables from .env file
@@ -100,163 +171,176 @@ def load_env_variables():
 
 
 # Database configuration
+connection_pool = None
+connection_pool_size = 2
+
+# Write-back: rows per transaction, retries on lock-wait timeouts, and the locked flag written with each plan
+write_chunk_size = 200
+write_max_retries = 3
+lock_written_assignments = True
 
 
 def get_database_connection(env_vars):
+    """Get a connection from the process-wide pool; close() hands it back to the pool."""
+    global connection_pool
     CONFIG = {
-    'host': env_vars['WP_MYSQL_HOST'],
-    'user': env_vars['WP_MYSQL_USER'],
-    'password': env_vars['WP_MYSQL_PASSWORD'],
-    'database': env_vars['WP_MYSQL_DATABASE'],
-}
-    """Establish a database connection."""
+        'host': env_vars['WP_MYSQL_HOST'],
+        'user': env_vars['WP_MYSQL_USER'],
+        'password': env_vars['WP_MYSQL_PASSWORD'],
+        'database': env_vars['WP_MYSQL_DATABASE'],
+    }
     try:
-        connection = mysql.connector.connect(**CONFIG)
-        return connection
+        if connection_pool is None:
+            connection_pool = pooling.MySQLConnectionPool(pool_name='jury_planner', pool_size=connection_pool_size, **CONFIG)
+        return connection_pool.get_connection()
     except Error as e:
         print(f"Error connecting to MySQL: {e}")
         return None
 
-def get_static_assignments(connection):
-    """Retrieve static assignments from the database."""
-    try:
-        cursor = connection.cursor(dictionary=True)
-        query = """
-        SELECT home_team, jury_team
-        FROM static_assignments
-        """
-        cursor.execute(query)
-        return {row['home_team']: row['jury_team'] for row in cursor.fetchall()}
-    except Error as e:
-        print(f"Error retrieving static assignments: {e}")
-        return {}
-    finally:
-        if cursor:
-            cursor.close()
 
+@dataclass
+class PlanningData:
+    """Everything a planning run reads from the database for one date window."""
+    home_matches: list = field(default_factory=list)           # ordered by date_time, stored assignment merged in
+    away_matches: list = field(default_factory=list)           # away matches of MNC teams
+    jury_teams: list = field(default_factory=list)
+    static_assignments: dict = field(default_factory=dict)     # home_team -> jury_team
+    existing_assignments: dict = field(default_factory=dict)   # match_id -> jury_assignments row, window only
+    home_matches_by_id: dict = field(default_factory=dict)
 
-def fetch_matches(connection, start_date, end_date):
-    existing_assignments = fetch_existing_assignments(connection)
-        
-    cursor = connection.cursor(dictionary=True)
-    
-    # Fetch home matches
-    query = """
-    SELECT DATE(date_time) as match_date, date_time, competition, home_team, away_team, match_id
-    FROM home_matches
-    WHERE date_time BETWEEN %s AND %s
-    ORDER BY date_time
-    """
-    cursor.execute(query, (start_date, end_date))
-    home_matches = cursor.fetchall()
-    
-    # Fetch away matches
-    query = """
-    SELECT DATE(date_time) as match_date, competition, home_team, away_team, match_id
-    FROM all_matches
-    WHERE away_team like '%MNC%' AND date_time BETWEEN %s AND %s 
-    """
-    cursor.execute(query, (start_date, end_date))
-    away_matches = cursor.fetchall()
-    cursor.close()
-    
-    # Process home matches
-    for match in home_matches:
-        match_id = match['match_id']
-        if match_id in existing_assignments:
-            assignment = existing_assignments[match_id]
-            match['assigned_team'] = assignment['team_id']
-            match['locked'] = assignment['locked']
-            
-    # Flatten the lists if they're nested
-    if len(home_matches) == 1 and isinstance(home_matches[0], list):
-        home_matches = home_matches[0]
 
-    if len(away_matches) == 1 and isinstance(away_matches[0], list):
-        away_matches = away_matches[0]        
-    
-    return home_matches, away_matches
+def load_planning_data(connection, start_date, end_date):
+    """Load the planning window over a single cursor.
 
-def fetch_existing_assignments(connection):
+    Stored assignments are joined onto the home matches of the window, so the
+    size of the all-seasons jury_assignments history does not affect load time.
+    """
+    data = PlanningData()
+    cursor = connection.cursor(dictionary=True)
     try:
-        cursor = connection.cursor(dictionary=True)
-        query = "SELECT match_id, team_id, locked FROM jury_assignments"
-        cursor.execute(query)
-        existing_assignments = {str(row['match_id']): row for row in cursor.fetchall()}
-        return existing_assignments
-    except Error as e:
-        print(f"Error fetching existing assignments: {e}")
-        return {}
+        cursor.execute("""
+        SELECT DATE(hm.date_time) AS match_date, hm.date_time, hm.competition, hm.home_team, hm.away_team,
+               hm.match_id, ja.team_id AS assigned_team, ja.locked
+        FROM home_matches hm
+        LEFT JOIN jury_assignments ja ON ja.match_id = hm.match_id
+        WHERE hm.date_time BETWEEN %s AND %s
+        ORDER BY hm.date_time
+        """, (start_date, end_date))
+        for row in cursor.fetchall():
+            assigned_team = row.pop('assigned_team')
+            locked = row.pop('locked')
+            if assigned_team is not None:
+                row['assigned_team'] = assigned_team
+                row['locked'] = locked
+                data.existing_assignments[row['match_id']] = {'match_id': row['match_id'], 'team_id': assigned_team, 'locked': locked}
+            data.home_matches.append(row)
+            data.home_matches_by_id[row['match_id']] = row
+
+        cursor.execute("""
+        SELECT DATE(date_time) AS match_date, competition, home_team, away_team, match_id
+        FROM all_matches
+        WHERE away_team LIKE %s AND date_time BETWEEN %s AND %s
+        """, ('%MNC%', start_date, end_date))
+        data.away_matches = cursor.fetchall()
+
+        cursor.execute("SELECT home_team, jury_team FROM static_assignments")
+        data.static_assignments = {row['home_team']: row['jury_team'] for row in cursor.fetchall()}
+
+        cursor.execute("SELECT id AS team_id, name AS team_name FROM jury_teams")
+        data.jury_teams = cursor.fetchall()
     finally:
-        if cursor:
-            cursor.close()
+        cursor.close()
 
-def get_jury_teams(connection):
-    """Fetch available jury teams."""
-    cursor = connection.cursor(dictionary=True)
-    query = "SELECT id AS team_id, name AS team_name FROM jury_teams"
-    cursor.execute(query)
-    jury_teams = cursor.fetchall()
-    cursor.close()
-    return jury_teams
+    logging.info(f"Loaded {len(data.home_matches)} home matches, {len(data.away_matches)} away matches, "
+                 f"{len(data.existing_assignments)} stored assignments and {len(data.jury_teams)} jury teams "
+                 f"for {start_date:%Y-%m-%d} - {end_date:%Y-%m-%d}")
+    return data
+
+def execute_in_chunks(connection, cursor, sql, rows, chunk_size=None, max_retries=None):
+    """executemany `rows` in chunks of `chunk_size`, one short transaction per chunk.
 
-def insert_assignments_to_database(assignments, connection):
+    A chunk that hits a lock-wait timeout or deadlock is rolled back and retried
+    with a growing delay, so writes give way to the PHP UI instead of failing.
+    """
+    chunk_size = chunk_size or write_chunk_size
+    max_retries = write_max_retries if max_retries is None else max_retries
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        for attempt in range(max_retries + 1):
+            try:
+                connection.start_transaction()
+                cursor.executemany(sql, chunk)
+                connection.commit()
+                break
+            except Error as e:
+                connection.rollback()
+                if e.errno not in (errorcode.ER_LOCK_WAIT_TIMEOUT, errorcode.ER_LOCK_DEADLOCK) or attempt == max_retries:
+                    raise
+                delay = 0.5 * 2 ** attempt
+                logging.warning(f"Lock contention writing rows {start}-{start + len(chunk) - 1} ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+
+def insert_assignments_to_database(assignments, connection, existing_assignments=None, lock_assignments=None):
+    """Write the plan back, touching only rows whose team or lock flag changes.
+
+    Locked rows are never overwritten. New rows are inserted and changed rows are
+    updated in chunks; the update also re-checks `locked = 0` so rows locked in
+    the UI after loading are left alone.
+    """
+    lock_value = int(lock_written_assignments if lock_assignments is None else lock_assignments)
     try:
         cursor = connection.cursor(dictionary=True)
         
-        # Fetch existing assignments with their locked status
-        cursor.execute("SELECT match_id, locked FROM jury_assignments")
-        db_match_data = {}
-        for row in cursor.fetchall():
-            db_match_data[row['match_id']] = {
-                       'locked': row['locked']
-            }
-
-        print("Processed match data:", db_match_data)
-
-        sql = """REPLACE INTO jury_assignments (match_id, team_id, locked)
-                 VALUES (%s, %s, %s)"""
-        
-        data = []
+        # Stored rows of the planned matches, from the loaded window when available
+        if existing_assignments is None:
+            match_ids = sorted({int(assignment['match_id']) for assignment in assignments})
+            existing_assignments = {}
+            if match_ids:
+                cursor.execute(f"SELECT match_id, team_id, locked FROM jury_assignments WHERE match_id IN ({', '.join(['%s'] * len(match_ids))})",
+                               match_ids)
+                existing_assignments = {row['match_id']: row for row in cursor.fetchall()}
+        stored_rows = {int(match_id): row for match_id, row in existing_assignments.items()}
+
+        inserts = []
+        updates = []
+        unchanged_count = 0
         locked_count = 0
-        unlocked_count = 0
         
         for assignment in assignments:
             try:
                 match_id = int(assignment['match_id'])
                 team_id = assignment['team_id']
-                
-                if match_id in db_match_data:
-                    is_locked = db_match_data[match_id]['locked']   
-                    print(f"Found lock status for match {match_id}: {is_locked}")
-                    
-                    if not is_locked:  # If locked = 0 (False), we can update
-                        unlocked_count += 1
-                        print(f"Updating assignment for match {match_id}")
-                        data.append((match_id, team_id, 1))  # Store as 1 in database for locked
-                    else:
-                        locked_count += 1
-                        print(f"Skipping match {match_id} as it is locked")
-                else:
-                    # Handle non-existent match as unlocked
-                    print(f"No database entry found for match {match_id} - treating as unlocked")
-                    unlocked_count += 1
-                    print(f"Updating assignment for match {match_id}")
-                    data.append((match_id, team_id, 1))  # Store as 1 in database for locked
-
             except KeyError as ke:
                 print(f"Missing required key in assignment: {ke}")
                 continue
 
-        if data:
-            cursor.executemany(sql, data)
+            stored = stored_rows.get(match_id)
+            if stored is None:
+                inserts.append((match_id, team_id, lock_value))
+            elif stored['locked']:
+                locked_count += 1
+            elif stored['team_id'] == team_id and int(stored['locked']) == lock_value:
+                unchanged_count += 1
+            else:
+                updates.append((team_id, lock_value, match_id))
+
+        # Finish the read transaction of the load so each chunk gets its own short one
+        if connection.in_transaction:
             connection.commit()
-            print(f"{cursor.rowcount} assignments were inserted/updated successfully.")
-        else:
-            print("No assignments were inserted/updated.")
 
-        print(f"Locked matches: {locked_count}")
-        print(f"Unlocked matches: {unlocked_count}")
+        execute_in_chunks(connection, cursor,
+                          """INSERT INTO jury_assignments (match_id, team_id, locked)
+                             VALUES (%s, %s, %s)
+                             ON DUPLICATE KEY UPDATE team_id = IF(locked, team_id, VALUES(team_id)),
+                                                     locked = IF(locked, locked, VALUES(locked))""",
+                          inserts)
+        execute_in_chunks(connection, cursor,
+                          "UPDATE jury_assignments SET team_id = %s, locked = %s WHERE match_id = %s AND locked = 0",
+                          updates)
+
+        print(f"Write-back: {len(inserts)} inserted, {len(updates)} updated, "
+              f"{unchanged_count} unchanged, {locked_count} skipped (locked)")
         
     except Error as e:
         print(f"Error: {e}")
@@ -301,23 +385,421 @@ def get_playing_teams(home_matches):
 def get_last_match_of_day(day_matches):
     return max(day_matches, key=lambda match: match['date_time'])
 
+
+class AssignmentVars(dict):
+    """Assignment variables keyed by (match_id, team_id).
+
+    Pairs that were pruned before the model was built and pairs of locked matches
+    have no variable; reading them yields their constant (1 for the locked team,
+    0 otherwise) so constraint builders can keep summing over all pairs. Use
+    `key in assignment_vars` where a literal is required.
+    """
+
+    def __init__(self, fixed=None):
+        super().__init__()
+        self.fixed = fixed or {}
+        self.locked_match_ids = {match_id for match_id, _ in self.fixed}
+        self.merged_blocks = set()  # GO blocks whose matches share one literal per team
+
+    def __missing__(self, key):
+        return self.fixed.get(key, 0)
+
+    def literals(self):
+        """Distinct literals; matches of a merged GO block share theirs."""
+        return list({var.Index(): var for var in self.values()}.values())
+
+
+@dataclass
+class PlanningIndex:
+    """Lookups shared by all constraint builders, built once per model."""
+    matches_by_day: dict = field(default_factory=dict)       # day -> home matches sorted by date_time
+    days: list = field(default_factory=list)                  # match days in order
+    first_match_by_day: dict = field(default_factory=dict)
+    last_match_by_day: dict = field(default_factory=dict)
+    weekend_pairs: list = field(default_factory=list)         # (saturday, sunday) pairs that both have matches
+    team_id_by_name: dict = field(default_factory=dict)       # jury team name -> team_id
+    playing_teams_by_day: dict = field(default_factory=dict)  # day -> home teams playing that day
+    away_teams_by_day: dict = field(default_factory=dict)     # day -> teams playing away that day
+    go_match_ids: set = field(default_factory=set)
+    go_matches_by_day: dict = field(default_factory=dict)
+    go_blocks_by_day: dict = field(default_factory=dict)      # day -> tuples of GO match ids that share one jury team
+    go_separated_by_day: dict = field(default_factory=dict)   # day -> (match_id, match_id) GO pairs with different teams
+
+
+def linear_fingerprint(expr):
+    """Canonical ((var index, coefficient), ...), constant) form of a linear expression."""
+    if isinstance(expr, int):
+        return ((), expr)
+    to_map = getattr(expr, 'get_integer_var_value_map', None) or expr.GetIntegerVarValueMap
+    coeffs, constant = to_map()
+    return (tuple(sorted((var.Index(), coef) for var, coef in coeffs.items() if coef)), constant)
+
+
+def constraint_fingerprint(constraint):
+    """Fingerprint of a constraint proto; linear constraints are order-independent."""
+    if constraint.WhichOneof('constraint') == 'linear':
+        return ('linear',
+                tuple(sorted(constraint.enforcement_literal)),
+                tuple(sorted(zip(constraint.linear.vars, constraint.linear.coeffs))),
+                tuple(constraint.linear.domain))
+    return constraint.SerializeToString(deterministic=True)
+
+
+class SeasonModelBuilder:
+    """Tags constraints and objective terms by family and drops exact duplicates.
+
+    Builders run inside `with builder.family(name):`; every constraint they add is
+    attributed to that family. Objective terms go through `objective_terms()`, which
+    keeps each distinct term once. `deduplicate()` removes repeated constraints from
+    the finished model and `report()` logs what each family contributed.
+    `ranges` lists the (family, start, end) constraint index ranges in the model,
+    and `profile` the build time and model growth of each family. `range_days`
+    maps the position of a range built for one day to that day, and `var_days`
+    the index of an auxiliary variable of a per-day rule to its day.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.ranges = []
+        self.range_days = {}
+        self.var_days = {}
+        self._term_fingerprints = set()
+        self.stats = defaultdict(lambda: {'constraints': 0, 'dropped_constraints': 0, 'terms': 0, 'dropped_terms': 0})
+        self.profile = defaultdict(lambda: {'calls': 0, 'wall_time': 0.0, 'variables': 0,
+                                            'linear_constraints': 0, 'boolean_constraints': 0, 'other_constraints': 0})
+
+    @contextmanager
+    def family(self, name, day=None):
+        proto = self.model.Proto()
+        start = len(proto.constraints)
+        variables_before = len(proto.variables)
+        started = time.perf_counter()
+        try:
+            yield self.model
+        finally:
+            end = len(proto.constraints)
+            if day is not None:
+                self.range_days[len(self.ranges)] = day
+            self.ranges.append((name, start, end))
+            profile = self.profile[name]
+            profile['calls'] += 1
+            profile['wall_time'] += time.perf_counter() - started
+            profile['variables'] += len(proto.variables) - variables_before
+            for i in range(start, end):
+                kind = proto.constraints[i].WhichOneof('constraint')
+                if kind == 'linear':
+                    profile['linear_constraints'] += 1
+                elif kind in boolean_constraint_kinds:
+                    profile['boolean_constraints'] += 1
+                else:
+                    profile['other_constraints'] += 1
+
+    def objective_terms(self, name, terms):
+        kept = []
+        for term in terms:
+            fingerprint = linear_fingerprint(term)
+            if not fingerprint[0] and not fingerprint[1]:
+                continue  # Pruned pairs contribute a constant 0
+            if fingerprint[0] and fingerprint in self._term_fingerprints:
+                self.stats[name]['dropped_terms'] += 1
+                continue
+            self._term_fingerprints.add(fingerprint)
+            self.stats[name]['terms'] += 1
+            kept.append(term)
+        return kept
+
+    def deduplicate(self):
+        constraints = self.model.Proto().constraints
+        family_of = ['other'] * len(constraints)
+        for name, start, end in self.ranges:
+            family_of[start:end] = [name] * (end - start)
+
+        seen = set()
+        kept = []
+        kept_before = [0]  # kept_before[i]: constraints kept among the first i
+        for i, constraint in enumerate(constraints):
+            fingerprint = constraint_fingerprint(constraint)
+            if fingerprint in seen:
+                self.stats[family_of[i]]['dropped_constraints'] += 1
+            else:
+                seen.add(fingerprint)
+                self.stats[family_of[i]]['constraints'] += 1
+                kept.append(constraint)
+            kept_before.append(len(kept))
+        self.ranges = [(name, kept_before[start], kept_before[end]) for name, start, end in self.ranges]
+
+        dropped = len(constraints) - len(kept)
+        if dropped:
+            copies = []
+            for constraint in kept:
+                copy = type(constraint)()
+                copy.CopyFrom(constraint)
+                copies.append(copy)
+            del constraints[:]
+            constraints.extend(copies)
+        return dropped
+
+    def report(self):
+        logging.info("Model size per constraint family (kept / dropped duplicates):")
+        for name, stats in sorted(self.stats.items()):
+            logging.info(f"  {name}: {stats['constraints']} / {stats['dropped_constraints']} constraints, "
+                         f"{stats['terms']} / {stats['dropped_terms']} objective terms")
+        logging.info("Build time per family:")
+        for name, profile in sorted(self.profile.items(), key=lambda item: -item[1]['wall_time']):
+            logging.info(f"  {name}: {profile['wall_time']:.3f}s over {profile['calls']} calls, {profile['variables']} variables")
+
+    def family_report(self):
+        """Build profile merged with the dedup statistics, one entry per family."""
+        report = {}
+        for name in sorted(set(self.profile) | set(self.stats)):
+            stats = self.stats.get(name, {})
+            report[name] = dict(self.profile.get(name, {}),
+                                kept_constraints=stats.get('constraints', 0),
+                                dropped_constraints=stats.get('dropped_constraints', 0),
+                                objective_terms=stats.get('terms', 0),
+                                dropped_objective_terms=stats.get('dropped_terms', 0))
+        return report
+
+
+def presolve_statistics(model, time_limit=None):
+    """Run CP-SAT presolve only and return the model size before and after it."""
+    solver = cp_model.CpSolver()
+    solver.parameters.stop_after_presolve = True
+    solver.parameters.log_search_progress = True
+    solver.parameters.log_to_stdout = False
+    if time_limit:
+        solver.parameters.max_time_in_seconds = time_limit
+    log_lines = []
+    solver.log_callback = log_lines.append
+    solver.Solve(model)
+
+    statistics = {'wall_time': solver.WallTime(), 'initial_model': [], 'presolved_model': []}
+    section = None
+    # The solver logs several lines per callback
+    for line in '\n'.join(log_lines).splitlines():
+        if line.startswith('Initial optimization model') or line.startswith('Initial satisfaction model'):
+            section = 'initial_model'
+        elif line.startswith('Presolved optimization model') or line.startswith('Presolved satisfaction model'):
+            section = 'presolved_model'
+        elif not line.strip():
+            section = None
+        elif section and line.startswith('#'):
+            statistics[section].append(line)
+        elif line.startswith('Presolved'):
+            key, _, value = line.partition(':')
+            if value.strip().isdigit():
+                statistics[key] = int(value)
+    return statistics
+
+
+def write_build_report(path, builder, presolve, solve_summary):
+    report = {
+        'families': builder.family_report(),
+        'model': {
+            'variables': len(builder.model.Proto().variables),
+            'constraints': len(builder.model.Proto().constraints),
+        },
+        'presolve': presolve,
+        'solve': solve_summary,
+    }
+    with open(path, 'w') as report_file:
+        json.dump(report, report_file, indent=2, default=str)
+    logging.info(f"Wrote model build report to {path}")
+
+
+def guard_hard_constraints(model, builder, assignment_vars, index):
+    """Put an enforcement literal on every hard constraint, one per (family, day).
+
+    A constraint belongs to the day of the first assignment or auxiliary variable
+    it uses. Constraints without one, such as those on locked matches only, take
+    the day their family was built for, or are grouped per family.
+    Returns {(family, day): guard}.
+    """
+    day_of_match = {match['match_id']: day for day, matches in index.matches_by_day.items() for match in matches}
+    day_of_var = {var.Index(): day_of_match[match_id] for (match_id, _), var in assignment_vars.items()}
+    day_of_var.update(builder.var_days)
+    constraints = model.Proto().constraints
+    guards = {}
+
+    for position, (name, start, end) in enumerate(builder.ranges):
+        if name not in hard_constraint_families:
+            continue
+        range_day = builder.range_days.get(position)
+        for i in range(start, end):
+            constraint = constraints[i]
+            kind = constraint.WhichOneof('constraint')
+            if kind == 'linear':
+                refs = constraint.linear.vars
+            elif kind in ('bool_or', 'bool_and'):
+                refs = getattr(constraint, kind).literals
+            else:
+                continue  # Constraint types without enforcement support stay hard
+            days = sorted({day_of_var[var] for var in (ref if ref >= 0 else -ref - 1 for ref in refs) if var in day_of_var})
+            label = (name, days[0] if days else range_day)
+            if label not in guards:
+                guards[label] = model.NewBoolVar(f"guard_{name}_{label[1]}")
+            constraint.enforcement_literal.append(guards[label].Index())
+    return guards
+
+
+def diagnose_infeasibility(model, builder, assignment_vars, index, time_limit=None, shrink=True):
+    """Report a small set of (family, day) hard-constraint groups that cannot hold together.
+
+    Every group is guarded by an assumption literal and the model is solved for
+    feasibility only; CP-SAT returns the assumptions behind the conflict. With
+    `shrink`, each group of that core is dropped in turn and kept out when the
+    rest is still infeasible, which leaves a minimal conflicting subset.
+    """
+    guards = guard_hard_constraints(model, builder, assignment_vars, index)
+    label_of = {guard.Index(): label for label, guard in guards.items()}
+    model.ClearObjective()
+    model.ClearHints()
+    logging.info(f"Diagnosing infeasibility with {len(guards)} guarded constraint groups")
+
+    def solve_with(labels):
+        model.ClearAssumptions()
+        model.AddAssumptions([guards[label] for label in labels])
+        solver = create_solver(time_limit, None, num_workers=1)
+        return solver, solver.Solve(model)
+
+    solver, status = solve_with(list(guards))
+    if status != cp_model.INFEASIBLE:
+        logging.info(f"Hard constraint families are not in conflict ({solver.StatusName(status)}); "
+                     f"the infeasibility comes from constraints that are not guarded")
+        return []
+
+    core = [label_of[literal] for literal in solver.SufficientAssumptionsForInfeasibility() if literal in label_of]
+    logging.info(f"Solver core has {len(core)} constraint groups")
+    if shrink:
+        for label in list(core):
+            remaining = [other for other in core if other != label]
+            _, status = solve_with(remaining)
+            if status == cp_model.INFEASIBLE:
+                core = remaining
+
+    print("Conflicting hard constraints:")
+    for name, day in sorted(core, key=lambda label: (str(label[1]), label[0])):
+        print(f"  {name} on {day if day is not None else 'the whole season'}")
+    return core
+
+
+def is_go_competition(competition):
+    return 'go' in (competition or '').lower()
+
+
+def group_go_blocks(go_matches):
+    """Split a day's GO matches (sorted by time) into blocks that share one jury team.
+
+    Returns the blocks as tuples of match ids, and the (match_id, match_id) pairs
+    whose jury teams must differ.
+    """
+    ids = tuple(match['match_id'] for match in go_matches)
+    times = [match['date_time'] for match in go_matches]
+
+    if len(ids) == 2:
+        return [ids], []
+    if len(ids) == 3 and (times[0] == times[1] or times[1] == times[2]):
+        return [ids], []
+    if len(ids) == 4 and times[0] == times[1]:
+        if times[2] == times[3]:
+            return [ids], []
+        return [ids[:3]], [(ids[0], ids[3])]
+    if len(ids) >= 5:
+        if times[0] == times[1] and times[2] == times[3]:
+            return [ids[:4]], [(ids[0], ids[4])]
+        if (times[0] == times[1] and times[2] != times[3] or
+                times[0] != times[1] and times[2] == times[3] or
+                times[0] != times[1] and times[1] == times[2]):
+            return [ids[:4]], []
+    return [], []
+
+
+def build_planning_index(home_matches, away_matches, jury_teams):
+    index = PlanningIndex()
+
+    for day, day_matches in group_matches_by_day(home_matches).items():
+        index.matches_by_day[day] = sorted(day_matches, key=lambda x: x['date_time'])
+    index.days = sorted(index.matches_by_day.keys())
+    index.matches_by_day = {day: index.matches_by_day[day] for day in index.days}
+
+    for day, day_matches in index.matches_by_day.items():
+        index.first_match_by_day[day] = day_matches[0]
+        index.last_match_by_day[day] = day_matches[-1]
+        index.playing_teams_by_day[day] = {match['home_team'] for match in day_matches}
+        index.go_matches_by_day[day] = [match for match in day_matches if is_go_competition(match['competition'])]
+        index.go_match_ids.update(match['match_id'] for match in index.go_matches_by_day[day])
+        index.go_blocks_by_day[day], index.go_separated_by_day[day] = group_go_blocks(index.go_matches_by_day[day])
+
+    weekend_days = [day for day in index.days if day.weekday() >= 5]
+    for day1, day2 in zip(weekend_days, weekend_days[1:]):
+        if day1.weekday() == 5 and day2.weekday() == 6:
+            index.weekend_pairs.append((day1, day2))
+
+    for team in jury_teams:
+        if team['team_id'] != 99:
+            index.team_id_by_name[team['team_name']] = team['team_id']
+
+    for away_match in away_matches:
+        index.away_teams_by_day.setdefault(away_match['match_date'], set()).add(away_match['away_team'])
+
+    return index
+
+
+def is_d1_d2_pair(home_team, team_name):
+    return d1_d2_counterparts.get(home_team) == team_name
+
+
+def compute_forbidden_pairs(index, jury_teams):
+    """Compute the (match_id, team_id) pairs that the hard rules always force to 0.
+
+    Mirrors add_team_not_jury_own_match_constraint, add_no_assignment_for_away_teams_constraint,
+    add_d1_d2_constraint and the single-playing-team branch of quiet_match_day_constraint,
+    so those pairs never get a variable.
+    """
+    team_ids = {team['team_id'] for team in jury_teams}
+    forbidden = set()
+
+    for day, day_matches in index.matches_by_day.items():
+        away_team_ids = [index.team_id_by_name.get(name) for name in index.away_teams_by_day.get(day, ())]
+
+        for match in day_matches:
+            match_id = match['match_id']
+
+            # Teams never jury their own match, and teams playing away that day are not available
+            for team_id in [index.team_id_by_name.get(match['home_team']),
+                            index.team_id_by_name.get(match['away_team'])] + away_team_ids:
+                if team_id is not None:
+                    forbidden.add((match_id, team_id))
+
+            # D1/D2 never jury each other
+            counterpart_id = index.team_id_by_name.get(d1_d2_counterparts.get(match['home_team']))
+            if counterpart_id in team_ids:
+                forbidden.add((match_id, counterpart_id))
+
+        # Quiet days with two matches and a single playing jury team
+        if len(day_matches) == 2:
+            playing_team_ids = [index.team_id_by_name[match['home_team']] for match in day_matches
+                                if match['home_team'] not in ['MNC Dordrecht H1', 'MNC Dordrecht H2']
+                                and match['home_team'] in index.team_id_by_name]
+            if len(playing_team_ids) == 1:
+                for match in day_matches:
+                    forbidden.add((match['match_id'], playing_team_ids[0]))
+
+    return forbidden
+
 def add_one_team_per_match_constraint(model, assignment_vars, home_matches, jury_teams, static_match_ids):
     for match in home_matches:
         match_id = match['match_id']
-        if match_id not in static_match_ids:
+        if match_id not in static_match_ids and match_id not in assignment_vars.locked_match_ids:
             model.Add(sum(assignment_vars[(match_id, team['team_id'])] 
                 for team in jury_teams 
                 if (match_id, team['team_id']) in assignment_vars) == 1)
 
-def add_forbid_2nd_assignment_constraint(model, assignment_vars, matches, jury_teams):
+def add_forbid_2nd_assignment_constraint(model, assignment_vars, index, jury_teams):
     logging.info("Starting to add forbid 2nd assignment constraint")
+    logging.debug(f"Matches grouped into {len(index.matches_by_day)} days")
     
-    # Group matches by day
-    matches_by_day = group_matches_by_day(matches)
-    logging.debug(f"Matches grouped into {len(matches_by_day)} days")
-    
-    for day, day_matches in matches_by_day.items():
-        sorted_day_matches = sorted(day_matches, key=lambda x: x['date_time'])
+    for day, sorted_day_matches in index.matches_by_day.items():
         logging.debug(f"Processing day {day} with {len(sorted_day_matches)} matches")
         
         for team in jury_teams:
@@ -350,20 +832,12 @@ def add_forbid_2nd_assignment_constraint(model, assignment_vars, matches, jury_t
     return model
 
 
-def add_consecutive_matches_constraint(model, assignment_vars, matches, grouped_matches, jury_teams, team_preferences, weight=1):
+def add_consecutive_matches_constraint(model, assignment_vars, index, jury_teams, team_preferences, weight=1):
     logging.info("Starting to add consecutive matches constraint")
     penalty_vars = []
-    matches_by_day = []
+    logging.debug(f"Grouped matches into {len(index.matches_by_day)} days")
     
-    # Group matches by day
-    matches_by_day = defaultdict(list)
-    for match in matches:
-        day = match['date_time'].date()
-        matches_by_day[day].append(match)
-    logging.debug(f"Grouped matches into {len(matches_by_day)} days")
-    
-    for day, day_matches in matches_by_day.items():
-        sorted_day_matches = sorted(day_matches, key=lambda x: x['date_time'])
+    for day, sorted_day_matches in index.matches_by_day.items():
         logging.debug(f"Processing day {day} with {len(sorted_day_matches)} matches")
         
         for team in jury_teams:
@@ -442,10 +916,11 @@ def add_consecutive_matches_constraint(model, assignment_vars, matches, grouped_
     logging.info(f"Finished adding consecutive matches constraint with {len(penalty_vars)} penalty variables")
     return penalty_vars
 
-def add_maximum_assignments_per_day_constraint(model, assignment_vars, matches, jury_teams, max_assignments_per_day, static_assignments):
-    matches_by_day = group_matches_by_day(matches)
+def add_maximum_assignments_per_day_constraint(model, assignment_vars, index, jury_teams, max_assignments_per_day, static_assignments, days=None, var_days=None):
+    days = index.days if days is None else days
     
-    for day, day_matches in matches_by_day.items():
+    for day in days:
+        day_matches = index.matches_by_day[day]
         for team in jury_teams:
             team_id = team['team_id']
             if team_id != 99:  # Skip team 99 (static assignments)
@@ -453,9 +928,9 @@ def add_maximum_assignments_per_day_constraint(model, assignment_vars, matches,
                 go_assignments = []
                 for match in day_matches:
                     match_id = match['match_id']
-                    competition = match.get('competition', '').lower().strip()
-                    is_go_match = 'go' in competition
-                    if (match_id, team_id) in assignment_vars:
+                    is_go_match = match_id in index.go_match_ids
+                    # Open pairs add their literal, locked pairs their constant 1
+                    if (match_id, team_id) in assignment_vars or assignment_vars[(match_id, team_id)]:
                         day_assignments.append(assignment_vars[(match_id, team_id)])
                         if is_go_match:
                             go_assignments.append(assignment_vars[(match_id, team_id)])
@@ -471,6 +946,8 @@ def add_maximum_assignments_per_day_constraint(model, assignment_vars, matches,
                 if day_assignments:
                     # Create a boolean variable for when exactly 4 GO matches are assigned
                     four_go_matches = model.NewBoolVar(f"four_go_matches_{team_id}_{day}")
+                    if var_days is not None:
+                        var_days[four_go_matches.Index()] = day
                     model.Add(sum(go_assignments) == 4).OnlyEnforceIf(four_go_matches)
                     model.Add(sum(go_assignments) != 4).OnlyEnforceIf(four_go_matches.Not())
 
@@ -483,6 +960,8 @@ def add_maximum_assignments_per_day_constraint(model, assignment_vars, matches,
                     # Check for odd number of matches and exactly 2 GO assignments
                     if len(day_matches) % 2 == 1:
                         two_go_matches = model.NewBoolVar(f"two_go_matches_{team_id}_{day}")
+                        if var_days is not None:
+                            var_days[two_go_matches.Index()] = day
                         model.Add(sum(go_assignments) == 2).OnlyEnforceIf(two_go_matches)
                         model.Add(sum(go_assignments) != 2).OnlyEnforceIf(two_go_matches.Not())
 
@@ -490,34 +969,29 @@ def add_maximum_assignments_per_day_constraint(model, assignment_vars, matches,
                         model.Add(sum(day_assignments) <= max_assignments_per_day + 1).OnlyEnforceIf(two_go_matches)
 
     # Add cross-day constraints to prevent assignments on consecutive days
-    days = sorted(matches_by_day.keys())
+    days = sorted(days)
     for day_index, day in enumerate(days):
-        matches = matches_by_day[day]
         if day_index > 0:
             prev_day = days[day_index - 1]
-            prev_day_matches = matches_by_day[prev_day]
             for team in jury_teams:
                 team_id = team['team_id']
                 if team_id != 99:  # Skip team 99 (static assignments)
-                    model.Add(assignment_vars[(matches[0]['match_id'], team_id)] + 
-                              assignment_vars[(prev_day_matches[-1]['match_id'], team_id)] <= 1)
+                    model.Add(assignment_vars[(index.first_match_by_day[day]['match_id'], team_id)] + 
+                              assignment_vars[(index.last_match_by_day[prev_day]['match_id'], team_id)] <= 1)
 
 
 
-def add_no_assignment_for_away_teams_constraint(model, assignment_vars, home_matches, away_matches, jury_teams):
-    away_teams_by_day = group_matches_by_day(away_matches)
-    home_matches_by_day = group_matches_by_day(home_matches)
+def add_no_assignment_for_away_teams_constraint(model, assignment_vars, index, jury_teams, days=None):
+    team_ids = {team['team_id'] for team in jury_teams}
 
-    for day, day_away_matches in away_teams_by_day.items():
-        if day in home_matches_by_day:
-            day_home_matches = home_matches_by_day[day]
-            for away_match in day_away_matches:
-                away_team_name = away_match['away_team']
-                for jury_team in jury_teams:
-                    if jury_team['team_name'] == away_team_name:
-                        # This jury team has an away match on this day
-                        for home_match in day_home_matches:
-                            model.Add(assignment_vars[(home_match['match_id'], jury_team['team_id'])] == 0)
+    for day in (index.days if days is None else days):
+        for away_team_name in index.away_teams_by_day.get(day, ()):
+            team_id = index.team_id_by_name.get(away_team_name)
+            if team_id in team_ids:
+                # This jury team has an away match on this day
+                for home_match in index.matches_by_day[day]:
+                    if (home_match['match_id'], team_id) in assignment_vars:
+                        model.Add(assignment_vars[(home_match['match_id'], team_id)] == 0)
 
     # No violations are returned as these are hard constraints
     return []
@@ -526,177 +1000,85 @@ def add_no_assignment_for_away_teams_constraint(model, assignment_vars, home_mat
 
 
 
-def add_go_matches_constraint(model, assignment_vars, matches, jury_teams):
-    go_matches = [m for m in matches if 'go' in m['competition'].lower()]
-    other_matches = [m for m in matches if 'go' not in m['competition'].lower()]
-    other_matches.sort(key=lambda x: x['date_time'])
+def add_go_matches_constraint(model, assignment_vars, index, day, jury_teams):
+    """Tie the GO matches of a day into their blocks.
 
-    all_matches = go_matches + other_matches
+    Blocks merged into one literal per team by create_assignment_variables need no
+    constraints; blocks holding a locked match keep member-wise equalities. Separated
+    pairs get different jury teams.
+    """
+    for block in index.go_blocks_by_day.get(day, ()):
+        if block in assignment_vars.merged_blocks:
+            continue
+        for team in jury_teams:
+            team_id = team['team_id']
+            for match_id in block[1:]:
+                model.Add(assignment_vars[(block[0], team_id)] == assignment_vars[(match_id, team_id)])
 
-    available_teams = set(team['team_id'] for team in jury_teams if team['team_id'] != 99)
-    if len(go_matches) == 2:
-        # Existing constraints for 3 and 4 GO matches
-        if len(go_matches) == 2 and (go_matches[0]['date_time'] == go_matches[1]['date_time']):
-            for team in jury_teams:
-                team_id = team['team_id']
-                model.Add(assignment_vars[(go_matches[0]['match_id'], team_id)] ==
-                          assignment_vars[(go_matches[1]['match_id'], team_id)])
-        elif len(go_matches) == 2 and (go_matches[0]['date_time'] != go_matches[1]['date_time']):
-            for team in jury_teams:
-                team_id = team['team_id']
-                model.Add(assignment_vars[(go_matches[0]['match_id'], team_id)] ==
-                          assignment_vars[(go_matches[1]['match_id'], team_id)])
+    for first_id, second_id in index.go_separated_by_day.get(day, ()):
+        model.Add(sum(assignment_vars[(first_id, team['team_id'])] * team['team_id'] for team in jury_teams) !=
+                  sum(assignment_vars[(second_id, team['team_id'])] * team['team_id'] for team in jury_teams))
 
-    elif len(go_matches) == 3:
-        if len(go_matches) == 3 and (go_matches[0]['date_time'] == go_matches[1]['date_time'] or 
-                                     go_matches[1]['date_time'] == go_matches[2]['date_time']):
-            for team in jury_teams:
-                team_id = team['team_id']
-                model.Add(assignment_vars[(go_matches[0]['match_id'], team_id)] ==
-                          assignment_vars[(go_matches[1]['match_id'], team_id)])
-                model.Add(assignment_vars[(go_matches[1]['match_id'], team_id)] ==
-                          assignment_vars[(go_matches[2]['match_id'], team_id)])
-
-    elif len(go_matches) == 4:
-        if len(go_matches) == 4 and (go_matches[0]['date_time'] == go_matches[1]['date_time'] and 
-                                     go_matches[2]['date_time'] == go_matches[3]['date_time']):
-            for team in jury_teams:
-                team_id = team['team_id']
-                model.Add(assignment_vars[(go_matches[0]['match_id'], team_id)] ==
-                          assignment_vars[(go_matches[1]['match_id'], team_id)])
-                model.Add(assignment_vars[(go_matches[1]['match_id'], team_id)] ==
-                          assignment_vars[(go_matches[2]['match_id'], team_id)])
-                model.Add(assignment_vars[(go_matches[2]['match_id'], team_id)] ==
-                          assignment_vars[(go_matches[3]['match_id'], team_id)])
-        
-        elif len(go_matches) == 4 and (go_matches[0]['date_time'] == go_matches[1]['date_time'] and 
-                                       go_matches[2]['date_time'] != go_matches[3]['date_time']):
-            for team in jury_teams:
-                team_id = team['team_id']
-                model.Add(assignment_vars[(go_matches[0]['match_id'], team_id)] ==
-                          assignment_vars[(go_matches[1]['match_id'], team_id)])
-                model.Add(assignment_vars[(go_matches[1]['match_id'], team_id)] ==
-                          assignment_vars[(go_matches[2]['match_id'], team_id)])
-    
-                model.Add(sum(assignment_vars[(go_matches[0]['match_id'], team['team_id'])] for team in jury_teams) ==
-                          sum(assignment_vars[(go_matches[1]['match_id'], team['team_id'])] for team in jury_teams))
-                model.Add(sum(assignment_vars[(go_matches[0]['match_id'], team['team_id'])] * team['team_id'] for team in jury_teams) !=
-                          sum(assignment_vars[(go_matches[3]['match_id'], team['team_id'])] * team['team_id'] for team in jury_teams))
 
-    
-    elif len(go_matches) >= 5:
-        if len(go_matches) >= 5 and (go_matches[0]['date_time'] == go_matches[1]['date_time'] and 
-                                     go_matches[2]['date_time'] != go_matches[3]['date_time'] or
-                                   
-                                     go_matches[0]['date_time'] != go_matches[1]['date_time'] and
-                                     go_matches[2]['date_time'] == go_matches[3]['date_time'] or
-                                     go_matches[0]['date_time'] != go_matches[1]['date_time'] and
-                                     go_matches[1]['date_time'] == go_matches[2]['date_time']):
-            for team in jury_teams:
-                team_id = team['team_id']
-                model.Add(assignment_vars[(go_matches[0]['match_id'], team_id)] ==
-                          assignment_vars[(go_matches[1]['match_id'], team_id)])
-                model.Add(assignment_vars[(go_matches[1]['match_id'], team_id)] ==
-                          assignment_vars[(go_matches[2]['match_id'], team_id)])
-                model.Add(assignment_vars[(go_matches[1]['match_id'], team_id)] ==
-                          assignment_vars[(go_matches[3]['match_id'], team_id)])
-                   
-
-                #model.Add(sum(assignment_vars[(go_matches[0]['match_id'], team['team_id'])] for team in jury_teams) ==
-                #          sum(assignment_vars[(go_matches[3]['match_id'], team['team_id'])] for team in jury_teams))
-                #model.Add(sum(assignment_vars[(go_matches[0]['match_id'], team['team_id'])] * team['team_id'] for team in jury_teams) !=
-                #          sum(assignment_vars[(go_matches[4]['match_id'], team['team_id'])] * team['team_id'] for team in jury_teams))
-        elif len(go_matches) >= 5 and (go_matches[0]['date_time'] == go_matches[1]['date_time'] and 
-                                       go_matches[2]['date_time'] == go_matches[3]['date_time']):
-                          
-            for team in jury_teams:
-                team_id = team['team_id']
-                model.Add(assignment_vars[(go_matches[0]['match_id'], team_id)] ==
-                          assignment_vars[(go_matches[1]['match_id'], team_id)])
-                model.Add(assignment_vars[(go_matches[1]['match_id'], team_id)] ==
-                          assignment_vars[(go_matches[2]['match_id'], team_id)])
-                model.Add(assignment_vars[(go_matches[2]['match_id'], team_id)] ==
-                          assignment_vars[(go_matches[3]['match_id'], team_id)])
-        
-                model.Add(sum(assignment_vars[(go_matches[0]['match_id'], team['team_id'])] for team in jury_teams) ==
-                          sum(assignment_vars[(go_matches[1]['match_id'], team['team_id'])] for team in jury_teams))
-                model.Add(sum(assignment_vars[(go_matches[0]['match_id'], team['team_id'])] * team['team_id'] for team in jury_teams) !=
-                          sum(assignment_vars[(go_matches[4]['match_id'], team['team_id'])] * team['team_id'] for team in jury_teams))
-        
+def add_team_not_jury_own_match_constraint(model, index, assignment_vars, jury_teams):
+    team_ids = {team['team_id'] for team in jury_teams}
 
-                
- 
-
-def add_team_not_jury_own_match_constraint(model, matches, assignment_vars, jury_teams):
-    for match in matches:
-        match_id = match['match_id']
-        home_team = match['home_team']
-        away_team = match['away_team']  # Assuming there's an away_team field
-        
-        for team in jury_teams:
-            team_id = team['team_id']
-            team_name = team['team_name']
-            
-            if team_name == home_team or team_name == away_team:
-                # Add a hard constraint to prevent assignment
-                model.Add(assignment_vars[(match_id, team_id)] == 0)
+    for day_matches in index.matches_by_day.values():
+        for match in day_matches:
+            match_id = match['match_id']
+            for team_name in (match['home_team'], match['away_team']):
+                team_id = index.team_id_by_name.get(team_name)
+                if team_id in team_ids and (match_id, team_id) in assignment_vars:
+                    # Add a hard constraint to prevent assignment
+                    model.Add(assignment_vars[(match_id, team_id)] == 0)
 
     # No need to return penalty variables as we're using hard constraints
     return []
 
-def add_d1_d2_constraint(model, assignment_vars, home_matches, jury_teams):
-    for match in home_matches:
-        for team in jury_teams:
-            if (match['match_id'], team['team_id']) in assignment_vars:
-                if (match['home_team'] == 'MNC Dordrecht Da1' and team['team_name'] == 'MNC Dordrecht Da2') or \
-                   (match['home_team'] == 'MNC Dordrecht Da2' and team['team_name'] == 'MNC Dordrecht Da1'):
-                    model.Add(assignment_vars[(match['match_id'], team['team_id'])] == 0)
+def add_d1_d2_constraint(model, assignment_vars, index, jury_teams):
+    team_ids = {team['team_id'] for team in jury_teams}
 
+    for day_matches in index.matches_by_day.values():
+        for match in day_matches:
+            team_id = index.team_id_by_name.get(d1_d2_counterparts.get(match['home_team']))
+            if team_id in team_ids and (match['match_id'], team_id) in assignment_vars:
+                model.Add(assignment_vars[(match['match_id'], team_id)] == 0)
 
 
-def add_no_double_weekend_assignments_constraint(model, assignment_vars, matches, jury_teams):
 
-    # Group matches by day
-    matches_by_day = group_matches_by_day(matches)
-    
-    # Identify weekend days
-    weekend_days = [day for day in matches_by_day.keys() if day.weekday() >= 5]
-    
-    if len(weekend_days) < 2:
+def add_no_double_weekend_assignments_constraint(model, assignment_vars, index, jury_teams, var_days=None):
+
+    if not index.weekend_pairs:
         print("Not enough weekend days to apply the restriction.")
         return model
 
-    # Sort weekend days to ensure we have consecutive weekend days
-    weekend_days.sort()
-
-    for i in range(len(weekend_days) - 1):
-        day1 = weekend_days[i]
-        day2 = weekend_days[i + 1]
+    for day1, day2 in index.weekend_pairs:
+        matches_day1 = index.matches_by_day[day1]
+        matches_day2 = index.matches_by_day[day2]
         
-        if day1.weekday() == 5 and day2.weekday() == 6:  # Ensure day1 is Saturday and day2 is Sunday
-            matches_day1 = matches_by_day[day1]
-            matches_day2 = matches_by_day[day2]
-            
-            for team in jury_teams:
-                team_id = team['team_id']
-                if team_id != 99:  # Skip team 99 (static assignments)
-                    home_matches_day1 = [assignment_vars[(match['match_id'], team_id)] for match in matches_day1 if match['home_team'] == team['team_name']]
-                    assignments_day1 = [assignment_vars[(match['match_id'], team_id)] for match in matches_day1]
-                    assignments_day2 = [assignment_vars[(match['match_id'], team_id)] for match in matches_day2]
-                    
-                    # Create a boolean variable for assignments on both days
-                    assigned_on_day1 = model.NewBoolVar(f'assigned_on_day1_{team_id}_{day1}')
-                    assigned_on_day2 = model.NewBoolVar(f'assigned_on_day2_{team_id}_{day2}')
-                    
-                    model.Add(sum(home_matches_day1) + sum(assignments_day1) > 0).OnlyEnforceIf(assigned_on_day1)
-                    model.Add(sum(home_matches_day1) + sum(assignments_day1) == 0).OnlyEnforceIf(assigned_on_day1.Not())
-                    
-                    model.Add(sum(assignments_day2) > 0).OnlyEnforceIf(assigned_on_day2)
-                    model.Add(sum(assignments_day2) == 0).OnlyEnforceIf(assigned_on_day2.Not())
-                    
-                    # Add hard constraint to prevent assignments on both days
-                    model.AddBoolOr([assigned_on_day1.Not(), assigned_on_day2.Not()])
-    
+        for team in jury_teams:
+            team_id = team['team_id']
+            if team_id != 99:  # Skip team 99 (static assignments)
+                home_matches_day1 = [assignment_vars[(match['match_id'], team_id)] for match in matches_day1 if match['home_team'] == team['team_name']]
+                assignments_day1 = [assignment_vars[(match['match_id'], team_id)] for match in matches_day1]
+                assignments_day2 = [assignment_vars[(match['match_id'], team_id)] for match in matches_day2]
+                
+                # Create a boolean variable for assignments on both days
+                assigned_on_day1 = model.NewBoolVar(f'assigned_on_day1_{team_id}_{day1}')
+                assigned_on_day2 = model.NewBoolVar(f'assigned_on_day2_{team_id}_{day2}')
+                if var_days is not None:
+                    var_days[assigned_on_day1.Index()] = day1
+                    var_days[assigned_on_day2.Index()] = day2
+                
+                model.Add(sum(home_matches_day1) + sum(assignments_day1) > 0).OnlyEnforceIf(assigned_on_day1)
+                model.Add(sum(home_matches_day1) + sum(assignments_day1) == 0).OnlyEnforceIf(assigned_on_day1.Not())
+                
+                model.Add(sum(assignments_day2) > 0).OnlyEnforceIf(assigned_on_day2)
+                model.Add(sum(assignments_day2) == 0).OnlyEnforceIf(assigned_on_day2.Not())
+                
+                # Add hard constraint to prevent assignments on both days
+                model.AddBoolOr([assigned_on_day1.Not(), assigned_on_day2.Not()])
+
     print('Hard constraint to prevent double weekend assignments added.')
     return model
 
@@ -737,22 +1119,16 @@ def add_weekend_assignment_constraint(model, matches, jury_teams, assignment_var
             print(f"Added constraint for team {team_id} on day {day}: at most one match")
 
 
-def add_no_consecutive_assignments_between_days_constraint(model, assignment_vars, matches, jury_teams):
+def add_no_consecutive_assignments_between_days_constraint(model, assignment_vars, index, jury_teams):
     logging.info("Starting to add no consecutive assignments between days constraint")
-    matches_by_day = group_matches_by_day(matches)
-    
-    days = sorted(matches_by_day.keys())
+    days = index.days
     logging.debug(f"Processing {len(days)} days")
     
     for day_index, day in enumerate(days):
         if day_index < len(days) - 1:
             logging.debug(f"Processing day {day} (index: {day_index})")
-            current_day_matches = matches_by_day[day]
-            next_day_matches = matches_by_day[days[day_index + 1]]
-            logging.debug(f"Current day matches: {len(current_day_matches)}, Next day matches: {len(next_day_matches)}")
-            
-            last_match_of_current_day = max(current_day_matches, key=lambda x: x['date_time'])
-            first_match_of_next_day = min(next_day_matches, key=lambda x: x['date_time'])
+            last_match_of_current_day = index.last_match_by_day[day]
+            first_match_of_next_day = index.first_match_by_day[days[day_index + 1]]
             logging.debug(f"Last match ID of current day: {last_match_of_current_day['match_id']}, First match ID of next day: {first_match_of_next_day['match_id']}")
             
             for team in jury_teams:
@@ -793,30 +1169,37 @@ def add_no_single_last_match_constraint(model, assignment_vars, matches, jury_te
     
     print('No single last match constraint added.')
 
-def prefer_home_playing_jury_teams_constraint(grouped_matches, jury_teams, assignment_vars, team_preferences):
+def prefer_home_playing_jury_teams_constraint(index, jury_teams, assignment_vars, team_preferences):
     objective_terms = []
-    for day, matches in grouped_matches.items():
+    for day, matches in index.matches_by_day.items():
+        # One term per literal: a merged GO block counts its preference once per match
+        literal_weights = {}
         for match in matches:
             for team in jury_teams:
-                objective_terms.append(
-                    assignment_vars[(match['match_id'], team['team_id'])] * 
-                    team_preferences[day][team['team_id']]
-                )
+                key = (match['match_id'], team['team_id'])
+                preference = team_preferences[day][team['team_id']]
+                if key in assignment_vars:
+                    var = assignment_vars[key]
+                    literal_weights[var.Index()] = (var, literal_weights.get(var.Index(), (var, 0))[1] + preference)
+                else:
+                    objective_terms.append(assignment_vars[key] * preference)
+        objective_terms.extend(var * weight for var, weight in literal_weights.values())
     return objective_terms
 
 
-def quiet_match_day_constraint(model, assignment_vars, grouped_matches, jury_teams):
+def quiet_match_day_constraint(model, assignment_vars, index, jury_teams):
     penalty_vars = []
+    teams_by_id = {team['team_id']: team for team in jury_teams}
     
-    for day, matches in grouped_matches.items():
+    for day, matches in index.matches_by_day.items():
         if len(matches) in [2, 3]:
             # Get playing jury teams for this day (only considering home teams)
             playing_jury_teams = []
             for match in matches:
                 if match['home_team'] not in ['MNC Dordrecht H1', 'MNC Dordrecht H2']:
-                    for team in jury_teams:
-                        if team['team_name'] == match['home_team']:
-                            playing_jury_teams.append(team)
+                    team_id = index.team_id_by_name.get(match['home_team'])
+                    if team_id in teams_by_id:
+                        playing_jury_teams.append(teams_by_id[team_id])
 
             if len(matches) == 2:
                 if len(playing_jury_teams) == 2:
@@ -833,7 +1216,8 @@ def quiet_match_day_constraint(model, assignment_vars, grouped_matches, jury_tea
                     # Prevent the single playing jury team from being assigned to either match
                     team = playing_jury_teams[0]
                     for match in matches:
-                        model.Add(assignment_vars[(match['match_id'], team['team_id'])] == 0)
+                        if (match['match_id'], team['team_id']) in assignment_vars:
+                            model.Add(assignment_vars[(match['match_id'], team['team_id'])] == 0)
                     #print(f"For day {day}: Preventing {team['team_name']} from being assigned to either match.")
             elif len(matches) == 3 and len(playing_jury_teams) >= 2:
                 # Soft constraint for 3 matches
@@ -874,14 +1258,10 @@ def quiet_match_day_constraint(model, assignment_vars, grouped_matches, jury_tea
 
 
 
-def add_proximity_constraint(model, assignment_vars, matches, jury_teams, weight=10):
+def add_proximity_constraint(model, assignment_vars, index, jury_teams, weight=10):
     penalty_vars = []
     
-    # Group matches by day
-    matches_by_day = group_matches_by_day(matches)
-    
-    for day, day_matches in matches_by_day.items():
-        sorted_day_matches = sorted(day_matches, key=lambda x: x['date_time'])
+    for day, sorted_day_matches in index.matches_by_day.items():
         
         for team in jury_teams:
             team_id = team['team_id']
@@ -893,7 +1273,8 @@ def add_proximity_constraint(model, assignment_vars, matches, jury_teams, weight
             
             for i, (match, assigned) in enumerate(assigned_matches):
                 for j, (other_match, other_assigned) in enumerate(assigned_matches):
-                    if i != j:
+                    # Pruned pairs are constant 0 and can never trigger the penalty
+                    if i != j and (match['match_id'], team_id) in assignment_vars and (other_match['match_id'], team_id) in assignment_vars:
                         matches_in_between = abs(i - j) - 1
                         #print(f"Matches in between {matches_in_between} for team {team_id} between match {match['match_id']} and {other_match['match_id']}")
                         
@@ -905,13 +1286,13 @@ def add_proximity_constraint(model, assignment_vars, matches, jury_teams, weight
     #print('Proximity constraint added.')
     return penalty_vars
 
-def add_prefer_no_jury_same_weekend_as_match(model, assignment_vars, matches, jury_teams, weight=1000):
+def add_prefer_no_jury_same_weekend_as_match(model, assignment_vars, index, jury_teams, weight=1000):
     logging.info("Adding soft constraint for jury duty based on home/away matches")
     penalty_vars = []
     
     # Group matches by weekend and day
     weekend_day_matches = defaultdict(lambda: defaultdict(list))
-    for date, day_matches in matches.items():
+    for date, day_matches in index.matches_by_day.items():
         year, week, _ = date.isocalendar()
         weekend_key = (year, week)
         weekend_day_matches[weekend_key][date].extend(day_matches)
@@ -919,29 +1300,22 @@ def add_prefer_no_jury_same_weekend_as_match(model, assignment_vars, matches, ju
     # Process each weekend
     for weekend_key, days in weekend_day_matches.items():
         weekend_dates = list(days.keys())
+        home_sides = {day: {match['home_team'] for match in day_matches} for day, day_matches in days.items()}
+        weekend_away_sides = {match['away_team'] for day_matches in days.values() for match in day_matches}
         
         for team in jury_teams:
             team_id = team['team_id']
+            # Check for away matches in the weekend
+            has_away_match_weekend = team_id in weekend_away_sides
             
             for current_date, current_day_matches in days.items():
-                has_home_match_today = any(
-                    match['home_team'] == team_id 
-                    for match in current_day_matches
-                )
-                has_away_match_today = any(
-                    match['away_team'] == team_id 
-                    for match in current_day_matches
-                )
-                
-                # Check for away matches in the weekend
-                has_away_match_weekend = any(
-                    any(match['away_team'] == team_id for match in day_matches)
-                    for day_matches in days.values()
-                )
+                has_home_match_today = team_id in home_sides[current_date]
                 
                 # Rule 1: Heavy penalty if team has away match in weekend
                 if has_away_match_weekend:
                     for match in current_day_matches:
+                        if (match['match_id'], team_id) not in assignment_vars:
+                            continue
                         penalty_var = model.NewIntVar(0, 1, 
                             f'penalty_away_match_{team_id}_weekend_{weekend_key}_match_{match["match_id"]}')
                         model.Add(penalty_var == 1).OnlyEnforceIf(assignment_vars[(match['match_id'], team_id)])
@@ -952,12 +1326,11 @@ def add_prefer_no_jury_same_weekend_as_match(model, assignment_vars, matches, ju
                 elif not has_home_match_today:
                     other_dates = [d for d in weekend_dates if d != current_date]
                     for other_date in other_dates:
-                        has_home_match_other_day = any(
-                            match['home_team'] == team_id 
-                            for match in days[other_date]
-                        )
+                        has_home_match_other_day = team_id in home_sides[other_date]
                         if not has_home_match_other_day:
                             for match in days[other_date]:
+                                if (match['match_id'], team_id) not in assignment_vars:
+                                    continue
                                 penalty_var = model.NewIntVar(0, 1,
                                     f'penalty_no_home_{team_id}_day_{other_date}_match_{match["match_id"]}')
                                 model.Add(penalty_var == 1).OnlyEnforceIf(assignment_vars[(match['match_id'], team_id)])
@@ -968,21 +1341,26 @@ def add_prefer_no_jury_same_weekend_as_match(model, assignment_vars, matches, ju
     return penalty_vars
 
 
-def apply_static_assignments(model, assignment_vars, matches, jury_teams, static_assignments):    
+def apply_static_assignments(model, assignment_vars, index, jury_teams, static_assignments):    
     logging.info("Starting static assignments process")
-    grouped_matches = {}
     static_match_ids = set()
+    other_team_ids = [team['team_id'] for team in jury_teams if team['team_id'] != 99]
+
+    def pin_to_static_team(match_id):
+        if match_id in assignment_vars.locked_match_ids:
+            # Locked matches keep their stored team
+            if assignment_vars[(match_id, 99)]:
+                static_match_ids.add(match_id)
+            return
+        model.Add(assignment_vars[(match_id, 99)] == 1)
+        static_match_ids.add(match_id)
+        # Ensure no other team is assigned to this match
+        for team_id in other_team_ids:
+            if (match_id, team_id) in assignment_vars:
+                model.Add(assignment_vars[(match_id, team_id)] == 0)
 
-    for match in matches:
-        day = match['date_time'].date()
-        if day not in grouped_matches:
-            logging.debug(f"Creating new group for day: {day}")
-            grouped_matches[day] = []
-        grouped_matches[day].append(match)
-
-    for day, day_matches in grouped_matches.items():
+    for day, day_matches in index.matches_by_day.items():
         logging.info(f"\nProcessing day: {day}")
-        last_match = get_last_match_of_day(day_matches)
         if len(day_matches) == 2:
             logging.debug(f"Day has exactly 2 matches")
             static_matches = [match for match in day_matches if match['home_team'] in static_assignments]
@@ -991,22 +1369,12 @@ def apply_static_assignments(model, assignment_vars, matches, jury_teams, static
                 logging.info("Both matches are static")
                 for match in day_matches:
                     logging.debug(f"Setting match {match['match_id']} as static")
-                    model.Add(assignment_vars[(match['match_id'], 99)] == 1)
-                    static_match_ids.add(match['match_id'])
-                    # Ensure no other team is assigned to this match
-                    for team_id in assignment_vars.keys():
-                        if team_id[0] == match['match_id'] and team_id[1] != 99:
-                            model.Add(assignment_vars[team_id] == 0)
+                    pin_to_static_team(match['match_id'])
             elif len(static_matches) == 1:
                 logging.info("One match is static, treating both as static")
                 for match in day_matches:
                     logging.debug(f"Setting match {match['match_id']} as static")
-                    model.Add(assignment_vars[(match['match_id'], 99)] == 1)
-                    static_match_ids.add(match['match_id'])
-                    # Ensure no other team is assigned to this match
-                    for team_id in assignment_vars.keys():
-                        if team_id[0] == match['match_id'] and team_id[1] != 99:
-                            model.Add(assignment_vars[team_id] == 0)
+                    pin_to_static_team(match['match_id'])
             else:
                 logging.debug("No static matches, no special handling needed")
                 pass
@@ -1017,101 +1385,173 @@ def apply_static_assignments(model, assignment_vars, matches, jury_teams, static
                 if i == len(day_matches) - 1:  # Last match of the day
                     if day_matches[i-1]['match_id'] in static_match_ids:
                         logging.info(f"Last match of day {day}, making static due to previous match")
-                        model.Add(assignment_vars[(day_matches[i]['match_id'], 99)] == 1)
-                        static_match_ids.add(day_matches[i]['match_id'])
-                        # Ensure no other team is assigned to this match
-                        for team_id in assignment_vars.keys():
-                            if team_id[0] == day_matches[i]['match_id'] and team_id[1] != 99:
-                                model.Add(assignment_vars[team_id] == 0)
+                        pin_to_static_team(day_matches[i]['match_id'])
                 elif match['home_team'] in static_assignments:
                     logging.info(f"Static assignment found for match {match['match_id']} (Home team: {match['home_team']})")
-                    model.Add(assignment_vars[(match['match_id'], 99)] == 1)
-                    static_match_ids.add(match['match_id'])
-                    # Ensure no other team is assigned to this match
-                    for team_id in assignment_vars.keys():
-                        if team_id[0] == match['match_id'] and team_id[1] != 99:
-                            model.Add(assignment_vars[team_id] == 0)
+                    pin_to_static_team(match['match_id'])
 
     logging.info(f"Total static match IDs: {len(static_match_ids)}")
     return model, static_match_ids
 
 
 
-def calculate_points(model, assignment_vars, home_matches, jury_teams):
-    point_vars = {}
-    team_total_points = {}
-    for team in jury_teams:
-        team_id = team['team_id']
-        team_total_points[team_id] = model.NewIntVar(0, len(home_matches) * 15, f'total_points_{team_id}')
-    
-    for match in home_matches:
-        match_id = match['match_id']
-        for team in jury_teams:
-            team_id = team['team_id']
-            point_vars[(match_id, team_id)] = model.NewIntVar(0,5000, f'points_{match_id}_{team_id}')
-            
-            # Point assignment logic for all teams
-            is_first_match = match_id == home_matches[0]['match_id']
-            is_last_match = match_id == home_matches[-1]['match_id']
-            is_go_match = 'go' in match['competition'].lower()
-            
-            if is_first_match:
-                model.Add(point_vars[(match_id, team_id)] == 15).OnlyEnforceIf(assignment_vars[(match_id, team_id)])
-
-            elif is_last_match:
-                model.Add(point_vars[(match_id, team_id)] == 15).OnlyEnforceIf(assignment_vars[(match_id, team_id)])
-
-            elif is_go_match:
-                model.Add(point_vars[(match_id, team_id)] == 10).OnlyEnforceIf(assignment_vars[(match_id, team_id)])
+def get_match_points(match, first_match_id, last_match_id):
+    if match['match_id'] in (first_match_id, last_match_id):
+        return 15
+    # GO matches and regular matches score the same
+    return 10
 
-            else:
-                model.Add(point_vars[(match_id, team_id)] == 10).OnlyEnforceIf(assignment_vars[(match_id, team_id)])
 
-            
-            model.Add(point_vars[(match_id, team_id)] == 0).OnlyEnforceIf(assignment_vars[(match_id, team_id)].Not())
+def calculate_points(model, assignment_vars, home_matches, jury_teams, point_offsets=None, first_match_id=None, last_match_id=None):
+    """Build the fairness model as linear expressions over the assignment literals.
 
-    # Sum up points for each team (only for home matches)
+    A pair's points are a constant times its assignment literal, so no per-pair
+    point variables are needed. Returns the constant points per (match_id, team_id)
+    in place of point variables.
+    """
+    # point_offsets carries points a team already earned outside this model (earlier planning windows)
+    point_offsets = point_offsets or {}
+    if first_match_id is None:
+        first_match_id = home_matches[0]['match_id']
+    if last_match_id is None:
+        last_match_id = home_matches[-1]['match_id']
+    variables_before = len(model.Proto().variables)
+    constraints_before = len(model.Proto().constraints)
+
+    match_points = {}
+    team_terms = defaultdict(list)
+    locked_points = defaultdict(int)
+    for match in home_matches:
+        points = get_match_points(match, first_match_id, last_match_id)
+        for team in jury_teams:
+            key = (match['match_id'], team['team_id'])
+            if key in assignment_vars:
+                match_points[key] = points
+                team_terms[team['team_id']].append((assignment_vars[key], points))
+            elif assignment_vars[key]:
+                # Locked to this team: its points are a constant
+                match_points[key] = points
+                locked_points[team['team_id']] += points
+
+    # Each team's total is bounded by the points of the matches it can still jury
+    team_total_points = {}
+    team_bounds = {}
     for team in jury_teams:
         team_id = team['team_id']
-        model.Add(team_total_points[team_id] == sum(point_vars[(match['match_id'], team_id)] for match in home_matches))
-        #print(f"Debug: Total points for team {team_id}: {team_total_points[team_id]}")
+        offset = point_offsets.get(team_id, 0) + locked_points[team_id]
+        team_bounds[team_id] = (offset, offset + sum(points for _, points in team_terms[team_id]))
+        team_total_points[team_id] = model.NewIntVar(*team_bounds[team_id], f'total_points_{team_id}')
+        model.Add(team_total_points[team_id] == offset + sum(var * points for var, points in team_terms[team_id]))
 
     # Calculate min and max total points (excluding team 99)
     non_static_team_points = [points for team_id, points in team_total_points.items() if team_id != 99]
-    min_total_points = model.NewIntVar(0, len(home_matches) * 15, 'min_total_points')
-    max_total_points = model.NewIntVar(0, len(home_matches) * 15, 'max_total_points')
+    non_static_bounds = [bounds for team_id, bounds in team_bounds.items() if team_id != 99]
+    lower_bound = min((lower for lower, _ in non_static_bounds), default=0)
+    upper_bound = max((upper for _, upper in non_static_bounds), default=0)
+    min_total_points = model.NewIntVar(lower_bound, upper_bound, 'min_total_points')
+    max_total_points = model.NewIntVar(lower_bound, upper_bound, 'max_total_points')
 
     model.AddMinEquality(min_total_points, non_static_team_points)
     model.AddMaxEquality(max_total_points, non_static_team_points)
 
     # Calculate the difference between max and min total points
-    points_difference = model.NewIntVar(0, len(home_matches) * 15, 'points_difference')
+    points_difference = model.NewIntVar(0, upper_bound - lower_bound, 'points_difference')
     model.Add(points_difference == max_total_points - min_total_points)
 
-    total_points = model.NewIntVar(0, len(home_matches) * 15 * len(jury_teams), 'total_points')
+    total_points = model.NewIntVar(0, sum(upper for _, upper in team_bounds.values()), 'total_points')
+    model.Add(total_points == sum(team_total_points.values()))
+
+    open_pairs = sum(len(terms) for terms in team_terms.values())
+    logging.info(f"Points model: {len(model.Proto().variables) - variables_before} variables and "
+                 f"{len(model.Proto().constraints) - constraints_before} constraints "
+                 f"(per-pair encoding would add {open_pairs} variables and {2 * open_pairs} constraints more)")
+
+    return total_points, match_points, points_difference, team_total_points, min_total_points, max_total_points
 
-    return total_points, point_vars, points_difference, team_total_points, min_total_points, max_total_points
 
 
 
 
+def find_interchangeable_teams(index, jury_teams, assignment_vars, forbidden_pairs, team_preferences, point_offsets=None):
+    """Group the jury teams that every constraint of this model treats alike.
+
+    A team qualifies when it plays none of the model's home matches, has no D1/D2
+    counterpart, is not the static team and holds no locked match. Qualifying teams
+    with the same forbidden matches, day preferences and point offset can swap all
+    their assignments without changing feasibility or the objective. Returns the
+    classes of two or more team ids, each sorted by team_id.
+    """
+    point_offsets = point_offsets or {}
+    named_teams = {name for day_matches in index.matches_by_day.values() for match in day_matches
+                   for name in (match['home_team'], match['away_team'])}
+    locked_team_ids = {team_id for (_, team_id), value in assignment_vars.fixed.items() if value}
+    forbidden_by_team = defaultdict(set)
+    for match_id, team_id in forbidden_pairs:
+        forbidden_by_team[team_id].add(match_id)
+
+    classes = defaultdict(list)
+    for team in jury_teams:
+        team_id = team['team_id']
+        if team_id == 99 or team_id in locked_team_ids or team['team_name'] in named_teams:
+            continue
+        if team['team_name'] in d1_d2_counterparts or team['team_name'] in d1_d2_counterparts.values():
+            continue
+        signature = (frozenset(forbidden_by_team[team_id]), point_offsets.get(team_id, 0),
+                     tuple(team_preferences[day][team_id] for day in index.days))
+        classes[signature].append(team_id)
+
+    return [sorted(team_ids) for team_ids in classes.values() if len(team_ids) > 1]
+
+
+def add_symmetry_breaking_constraints(model, assignment_vars, index, classes, team_total_points, match_points, mode, hints=None):
+    """Order the members of each class of interchangeable teams.
+
+    'points' requires non-increasing total points along the class, 'first-assignment'
+    requires each member's first match to come before the next member's. Any plan can
+    be permuted within a class to meet either order, so no objective value is lost.
+    Members are ranked by the hinted plan, which then already satisfies the order.
+    """
+    hints = hints or {}
+    match_order = [match['match_id'] for day in index.days for match in index.matches_by_day[day]]
+    position = {match_id: i for i, match_id in enumerate(match_order)}
+    hinted_matches = defaultdict(list)
+    for match_id, team_id in hints.items():
+        if match_id in position:
+            hinted_matches[team_id].append(match_id)
+
+    for team_ids in classes:
+        if mode == 'points':
+            ranked = sorted(team_ids, key=lambda team_id: (
+                -sum(match_points.get((match_id, team_id), 0) for match_id in hinted_matches[team_id]), team_id))
+            for team_id, next_team_id in zip(ranked, ranked[1:]):
+                model.Add(team_total_points[team_id] >= team_total_points[next_team_id])
+        else:
+            ranked = sorted(team_ids, key=lambda team_id: (
+                min((position[match_id] for match_id in hinted_matches[team_id]), default=len(match_order)), team_id))
+            for team_id, next_team_id in zip(ranked, ranked[1:]):
+                # seen: team_id juried one of the matches before the current one
+                seen = 0
+                for match_id in match_order:
+                    if (match_id, next_team_id) in assignment_vars:
+                        model.Add(assignment_vars[(match_id, next_team_id)] <= seen)
+                    if (match_id, team_id) in assignment_vars:
+                        next_seen = model.NewBoolVar(f'symmetry_seen_{team_id}_{next_team_id}_{match_id}')
+                        model.Add(next_seen <= seen + assignment_vars[(match_id, team_id)])
+                        seen = next_seen
+
+    logging.info(f"Symmetry breaking ({mode}) over {len(classes)} classes of interchangeable teams: "
+                 + ", ".join(str(team_ids) for team_ids in classes))
 
-def calculate_team_preferences(home_matches, away_matches, jury_teams):
+
+def calculate_team_preferences(index, jury_teams):
     logging.info("Starting to calculate team preferences")
     preferences = {}
-    all_matches = home_matches
-    logging.debug(f"Processing {len(all_matches)} home matches")
-    
-    grouped_matches = group_matches_by_day(all_matches)
-    logging.debug(f"Matches grouped into {len(grouped_matches)} days")
+    logging.debug(f"Matches grouped into {len(index.matches_by_day)} days")
 
-    for day, matches in grouped_matches.items():
+    for day in index.days:
         logging.debug(f"Processing day: {day}")
         preferences[day] = {}
-        playing_teams = set()
-        
-        for match in matches:
-            playing_teams.add(match['home_team'])
+        playing_teams = index.playing_teams_by_day[day]
         logging.debug(f"Found {len(playing_teams)} playing teams for day {day}")
         
         for team in jury_teams:
@@ -1126,121 +1566,339 @@ def calculate_team_preferences(home_matches, away_matches, jury_teams):
     return preferences
 
 
-def create_assignment_variables(model, home_matches, jury_teams):
-    assignment_vars = {}
-    
-    #print("\nCreating assignment variables:")
+def create_assignment_variables(model, index, jury_teams, forbidden_pairs):
+    """Create a BoolVar for every open (match, team) pair.
+
+    Locked matches get no variables at all: their stored team is folded in as the
+    constant 1 and every other team as 0. Pairs in `forbidden_pairs` are skipped.
+    The matches of a GO block share one literal per non-static team, so sums over
+    the block's matches weigh that literal by the block's match count; a team
+    forbidden on any match of the block gets no literal for the whole block.
+    """
+    team_ids = {team['team_id'] for team in jury_teams}
+    fixed = {}
+    for matches in index.matches_by_day.values():
+        for match in matches:
+            if match.get('locked') and match.get('assigned_team') in team_ids:
+                fixed[(match['match_id'], match['assigned_team'])] = 1
+
+    assignment_vars = AssignmentVars(fixed)
+
+    # Blocks holding a locked match keep per-match pairs, tied by add_go_matches_constraint
+    block_by_match = {}
+    for blocks in index.go_blocks_by_day.values():
+        for block in blocks:
+            if not assignment_vars.locked_match_ids.intersection(block):
+                assignment_vars.merged_blocks.add(block)
+                block_by_match.update((match_id, block) for match_id in block)
+
+    for matches in index.matches_by_day.values():
+        for match in matches:
+            match_id = match['match_id']
+            if match_id in assignment_vars.locked_match_ids:
+                continue
+            block = block_by_match.get(match_id)
+            for team in jury_teams:
+                team_id = team['team_id']
+                if block and team_id != 99:
+                    if match_id != block[0] or any((member, team_id) in forbidden_pairs for member in block):
+                        continue
+                    block_var = model.NewBoolVar(f"go_block_{block[0]}_team_{team_id}")
+                    for member in block:
+                        assignment_vars[(member, team_id)] = block_var
+                    continue
+                if (match_id, team_id) in forbidden_pairs:
+                    continue
+                var_name = f"match_{match_id}_team_{team_id}"
+                assignment_vars[(match_id, team_id)] = model.NewBoolVar(var_name)
+
+    if assignment_vars.merged_blocks:
+        logging.info(f"Merged {sum(len(block) for block in assignment_vars.merged_blocks)} GO matches "
+                     f"into {len(assignment_vars.merged_blocks)} block variables per team")
+    return assignment_vars
+
+
+def repair_assignment_hints(home_matches, index, jury_teams):
+    """Return the stored (match_id, team_id) plan, minus entries that can no longer be feasible."""
+    team_ids = {team['team_id'] for team in jury_teams}
+    forbidden_pairs = compute_forbidden_pairs(index, jury_teams)
+
+    hints = {}
+    dropped = 0
     for match in home_matches:
+        team_id = match.get('assigned_team')
+        if team_id is None:
+            continue
+        # Locked rows are kept as entered; unlocked rows must still respect the hard rules
+        if team_id not in team_ids or (not match.get('locked', False) and (match['match_id'], team_id) in forbidden_pairs):
+            dropped += 1
+            continue
+        hints[match['match_id']] = team_id
+
+    logging.info(f"Hint repair kept {len(hints)} stored assignments, dropped {dropped}")
+    return hints
+
+
+def add_assignment_hints(model, assignment_vars, home_matches, index, jury_teams, hint_mode):
+    """Warm-start the solver from the assignments already stored in jury_assignments.
+
+    Returns the hinted plan as match_id -> team_id.
+    """
+    if hint_mode == 'off':
+        return {}
+
+    if hint_mode == 'repair':
+        hints = repair_assignment_hints(home_matches, index, jury_teams)
+    else:
+        hints = {match['match_id']: match['assigned_team'] for match in home_matches if match.get('assigned_team') is not None}
+
+    hinted = 0
+    hinted_literals = set()
+    for match_id, assigned_team in hints.items():
+        # Hint the whole row of the match so the solver gets a complete partial assignment
         for team in jury_teams:
-            var_name = f"match_{match['match_id']}_team_{team['team_id']}"
-            
-            if match.get('locked', False) and match.get('assigned_team') == team['team_id']:
-                # For locked assignments, set the variable to 1
-                assignment_vars[(match['match_id'], team['team_id'])] = model.NewIntVar(1, 1, var_name)
-                #print(f"  Team {team['team_id']} (Locked): Variable set to 1")
-            elif not match.get('locked', False):
-                # For unlocked assignments, create a binary variable
-                assignment_vars[(match['match_id'], team['team_id'])] = model.NewBoolVar(var_name)
-                #print(f"  Team {team['team_id']} (Unlocked): Binary variable created")
-            else:
-                # For locked assignments to other teams, set the variable to 0
-                assignment_vars[(match['match_id'], team['team_id'])] = model.NewIntVar(0, 0, var_name)
-                #print(f"  Team {team['team_id']} (Locked to another team): Variable set to 0")
-    
-    return assignment_vars
+            key = (match_id, team['team_id'])
+            # GO block members share a literal, which may be hinted only once
+            if key in assignment_vars and assignment_vars[key].Index() not in hinted_literals:
+                hinted_literals.add(assignment_vars[key].Index())
+                model.AddHint(assignment_vars[key], 1 if team['team_id'] == assigned_team else 0)
+        hinted += 1
+
+    logging.info(f"Added solution hints for {hinted} of {len(home_matches)} matches (mode: {hint_mode})")
+    return hints
+
+
+class SolvedPlan(list):
+    """Assignments of a solved plan, with the seed and scores that produced it.
+
+    `score` is the blended objective without the seed-dependent randomization
+    term, so plans solved with different seeds can be compared.
+    """
 
+    def __init__(self, assignments=(), seed=None, objective=None, points_difference=None, status=None,
+                 stop_reason=None, gap=None, score=None):
+        super().__init__(assignments)
+        self.seed = seed
+        self.objective = objective
+        self.score = score
+        self.points_difference = points_difference
+        self.status = status
+        self.stop_reason = stop_reason
+        self.gap = gap
 
-def assign_jury_teams_to_matches(home_matches, away_matches, jury_teams, static_assignments):
-    grouped_matches = group_matches_by_day(home_matches)
-    weekend_matches = group_matches_by_weekend(home_matches)
+
+def resolve_seed(seed):
+    """Return `seed`, or draw and log a fresh one so the run can be reproduced."""
+    if seed is None:
+        seed = random.randrange(2 ** 31)
+        logging.info(f"No random seed given, using {seed}")
+    return seed
+
+
+def create_solver(time_limit, hint_mode, seed=None, num_workers=None):
+    solver = cp_model.CpSolver()
+    if time_limit:
+        solver.parameters.max_time_in_seconds = time_limit
+    if seed is not None:
+        solver.parameters.random_seed = seed
+    if num_workers:
+        solver.parameters.num_workers = num_workers
+    if hint_mode == 'repair':
+        # Let CP-SAT repair a hint that became infeasible instead of discarding it
+        solver.parameters.repair_hint = True
+    return solver
+
+
+def solve_in_stages(model, stages, hint_vars, hint_mode, seed, num_workers, make_callback, policy):
+    """Minimise (name, expression, time_limit) stages lexicographically.
+
+    After each stage its objective value is added as an upper bound and the
+    solution is hinted to the next stage. Each stage runs under `policy`, with
+    its own time limit as the hard cap. Returns the solver, status and stop
+    outcome of the last stage that found a solution.
+    """
+    solver, status, outcome = None, cp_model.UNKNOWN, None
+    for stage_index, (name, expression, time_limit) in enumerate(stages):
+        model.Minimize(expression)
+        stage_solver = create_solver(time_limit, hint_mode, seed, num_workers)
+        callback = make_callback()
+        stage_status, stage_outcome = policy.with_time_limit(time_limit).solve(stage_solver, model, callback)
+
+        if stage_status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            logging.warning(f"Stage '{name}' found no solution ({stage_solver.StatusName(stage_status)})")
+            if solver is None:
+                return stage_solver, stage_status, stage_outcome
+            break
+
+        solver, status, outcome = stage_solver, stage_status, stage_outcome
+        value = round(stage_solver.ObjectiveValue())
+        logging.info(f"Stage '{name}': {value} ({stage_solver.StatusName(stage_status)}) in {stage_solver.WallTime():.2f}s, "
+                     f"{len(callback.progress)} improving solutions")
+
+        if stage_index < len(stages) - 1:
+            model.Add(expression <= value)
+            model.ClearHints()
+            for var in hint_vars:
+                model.AddHint(var, stage_solver.Value(var))
+            # The previous solution satisfies the new bound, so the hint needs no repair
+            hint_mode = 'as-is'
+
+    return solver, status, outcome
+
+
+def assign_jury_teams_to_matches(home_matches, away_matches, jury_teams, static_assignments, point_offsets=None, first_match_id=None, last_match_id=None, time_limit=None, hint_mode=None, plan_interval=None,
+                                 objective_mode=None, stage_time_limits=None, seed=None, num_workers=None, diagnose=False,
+                                 build_report=None, stopping_policy=None, symmetry_mode=None):
+    build_started = time.perf_counter()
+    index = build_planning_index(home_matches, away_matches, jury_teams)
     assignments = []
     model = cp_model.CpModel()
     
-    # Create variables
-    assignment_vars = {}
-    
-    # Respect original assignments
-    assignment_vars = create_assignment_variables(model, home_matches, jury_teams)
-
     soft_constraints = []          
     # Define non-static jury teams
     non_static_jury_teams = [team for team in jury_teams if team['team_id'] != 99]
 
-   # Create assignment variables
-    assignment_vars = {}
-    for day, matches in grouped_matches.items():
-        for match in matches:
-            for team in jury_teams:
-                var_name = f"match_{match['match_id']}_team_{team['team_id']}"
-                assignment_vars[(match['match_id'], team['team_id'])] = model.NewBoolVar(var_name)
-
-    model, static_match_ids = apply_static_assignments(model, assignment_vars, home_matches, jury_teams, static_assignments)
+    # Create assignment variables for the open matches, skipping pairs the hard rules always forbid.
+    # Diagnosis keeps them, so not_own_match, away_teams and d1_d2 pin them under their own guards.
+    builder = SeasonModelBuilder(model)
+    with builder.family('assignment_variables'):
+        forbidden_pairs = compute_forbidden_pairs(index, jury_teams)
+        pruned_pairs = set() if diagnose else forbidden_pairs
+        assignment_vars = create_assignment_variables(model, index, jury_teams, pruned_pairs)
+    logging.info(f"Pruned {len(pruned_pairs)} of {len(home_matches) * len(jury_teams)} (match, team) pairs before building the model")
+    logging.info(f"Fixed {len(assignment_vars.locked_match_ids)} locked matches as constants, "
+                 f"{len(home_matches) - len(assignment_vars.locked_match_ids)} matches left to plan")
+
+    with builder.family('static_assignments'):
+        model, static_match_ids = apply_static_assignments(model, assignment_vars, index, jury_teams, static_assignments)
+
+    # Warm start from the stored plan
+    hint_mode = hint_mode or solution_hint_mode
+    with builder.family('hints'):
+        hints = add_assignment_hints(model, assignment_vars, home_matches, index, jury_teams, hint_mode)
 
     # Calculate team preferences
-    team_preferences = calculate_team_preferences(home_matches, away_matches, jury_teams)   
+    team_preferences = calculate_team_preferences(index, jury_teams)   
+
+    # Teams that can swap all their assignments; the constraints below cannot tell them apart
+    symmetry_mode = symmetry_mode or symmetry_breaking_mode
+    symmetry_classes = []
+    if symmetry_mode != 'off':
+        symmetry_classes = find_interchangeable_teams(index, jury_teams, assignment_vars, forbidden_pairs, team_preferences, point_offsets)
 
     # Add no double weekend assignments constraint
-    add_no_double_weekend_assignments_constraint(model, assignment_vars, matches, jury_teams)
+    with builder.family('no_double_weekend'):
+        add_no_double_weekend_assignments_constraint(model, assignment_vars, index, jury_teams, builder.var_days)
 
     # Add cross-day constraints to prevent assignments on consecutive days
-    add_no_consecutive_assignments_between_days_constraint(model, assignment_vars, home_matches, non_static_jury_teams)
+    with builder.family('no_consecutive_days'):
+        add_no_consecutive_assignments_between_days_constraint(model, assignment_vars, index, non_static_jury_teams)
 
     # Forbid 2 shifts per day
-    add_forbid_2nd_assignment_constraint(model, assignment_vars, home_matches, non_static_jury_teams)
+    with builder.family('forbid_2nd_assignment'):
+        add_forbid_2nd_assignment_constraint(model, assignment_vars, index, non_static_jury_teams)
 
     # Make sure match are consecutive
-    consecutive_match_violations = add_consecutive_matches_constraint(model, assignment_vars, home_matches, grouped_matches, non_static_jury_teams, team_preferences, weight=1)
-
-    for day, matches in grouped_matches.items():
-        add_one_team_per_match_constraint(model, assignment_vars, matches, non_static_jury_teams, static_match_ids)
-        add_go_matches_constraint(model, assignment_vars, matches, non_static_jury_teams)
-        add_maximum_assignments_per_day_constraint(model, assignment_vars, matches, non_static_jury_teams, max_assignments_per_day,static_assignments)
-        add_no_assignment_for_away_teams_constraint(model, assignment_vars, matches, away_matches, non_static_jury_teams)
-        add_team_not_jury_own_match_constraint(model, home_matches, assignment_vars, non_static_jury_teams) 
-        add_d1_d2_constraint(model, assignment_vars, home_matches, jury_teams)
-
-        # Add soft constraints
-        quiet_match_day_violations = quiet_match_day_constraint(model, assignment_vars, grouped_matches, non_static_jury_teams)
-        home_playing_jury_teams_violations = prefer_home_playing_jury_teams_constraint(grouped_matches, non_static_jury_teams, assignment_vars, team_preferences)
-        weekend_match_penalties = add_prefer_no_jury_same_weekend_as_match(model, assignment_vars, grouped_matches, non_static_jury_teams, weight=1000)
-
-        soft_constraints.extend(consecutive_match_violations)
-        soft_constraints.extend(quiet_match_day_violations)
-        soft_constraints.extend(home_playing_jury_teams_violations)
-        soft_constraints.extend(weekend_match_penalties)
+    with builder.family('consecutive_matches'):
+        consecutive_match_violations = add_consecutive_matches_constraint(model, assignment_vars, index, non_static_jury_teams, team_preferences, weight=1)
+
+    # Per-day hard constraints
+    for day, matches in index.matches_by_day.items():
+        with builder.family('one_team_per_match', day):
+            add_one_team_per_match_constraint(model, assignment_vars, matches, non_static_jury_teams, static_match_ids)
+        with builder.family('go_matches', day):
+            add_go_matches_constraint(model, assignment_vars, index, day, non_static_jury_teams)
+        with builder.family('max_assignments_per_day', day):
+            add_maximum_assignments_per_day_constraint(model, assignment_vars, index, non_static_jury_teams, max_assignments_per_day, static_assignments,
+                                                       days=[day], var_days=builder.var_days)
+        with builder.family('away_teams', day):
+            add_no_assignment_for_away_teams_constraint(model, assignment_vars, index, non_static_jury_teams, days=[day])
+
+    # Season-wide hard constraints, added once
+    with builder.family('not_own_match'):
+        add_team_not_jury_own_match_constraint(model, index, assignment_vars, non_static_jury_teams)
+    with builder.family('d1_d2'):
+        add_d1_d2_constraint(model, assignment_vars, index, jury_teams)
+
+    # Add soft constraints
+    with builder.family('quiet_match_day'):
+        quiet_match_day_violations = quiet_match_day_constraint(model, assignment_vars, index, non_static_jury_teams)
+    with builder.family('home_playing_jury_teams'):
+        home_playing_jury_teams_violations = prefer_home_playing_jury_teams_constraint(index, non_static_jury_teams, assignment_vars, team_preferences)
+    with builder.family('weekend_match'):
+        weekend_match_penalties = add_prefer_no_jury_same_weekend_as_match(model, assignment_vars, index, non_static_jury_teams, weight=1000)
+
+    soft_constraints.extend(builder.objective_terms('consecutive_matches', consecutive_match_violations))
+    soft_constraints.extend(builder.objective_terms('quiet_match_day', quiet_match_day_violations))
+    soft_constraints.extend(builder.objective_terms('home_playing_jury_teams', home_playing_jury_teams_violations))
+    soft_constraints.extend(builder.objective_terms('weekend_match', weekend_match_penalties))
 
     # Add soft constraint to ensure proximity between home match and assigned matches
-    proximity_penalties = add_proximity_constraint(model, assignment_vars, home_matches, non_static_jury_teams)
+    with builder.family('proximity'):
+        proximity_penalties = builder.objective_terms('proximity', add_proximity_constraint(model, assignment_vars, index, non_static_jury_teams))
 
 
     # Calculate points
-    total_points, point_vars, points_difference, team_total_points, min_total_points, max_total_points = calculate_points(model, assignment_vars, home_matches, jury_teams)
+    with builder.family('points'):
+        total_points, match_points, points_difference, team_total_points, min_total_points, max_total_points = calculate_points(
+            model, assignment_vars, home_matches, jury_teams, point_offsets, first_match_id, last_match_id)
 
-    # Create random weights for assignments
-    assignment_weights = {}
-    for match in home_matches:
-        for team in jury_teams:
-            if team['team_id'] != 99:  # Skip static team
-                assignment_weights[(match['match_id'], team['team_id'])] = random.randint(1, 10)
-
-    # Calculate randomization penalty
-    randomization_terms = []
-    for (match_id, team_id), var in assignment_vars.items():
-        if team_id != 99:  # Skip static team
-            randomization_terms.append(assignment_weights[(match_id, team_id)] * var)
-            
-    # Objective: Minimize point difference and soft constraint violations
-    model.Minimize(points_difference * 1 + sum(soft_constraints) * 100 + sum(proximity_penalties) * 1 + sum(randomization_terms) * 0.5)
+    if symmetry_classes:
+        with builder.family('symmetry_breaking'):
+            add_symmetry_breaking_constraints(model, assignment_vars, index, symmetry_classes, team_total_points,
+                                              match_points, symmetry_mode, hints)
 
-    # Solve the model
-    solver = cp_model.CpSolver()
-    
-    # Without logging
-    status = solver.Solve(model)
-
-    # With Logging
-    callback = AssignmentDebugCallback(assignment_vars, grouped_matches, non_static_jury_teams)
-    status = solver.Solve(model, callback) 
+    # Create random weights for assignments
+    seed = resolve_seed(seed)
+    with builder.family('randomization'):
+        rng = random.Random(seed)
+        assignment_weights = {}
+        for match in home_matches:
+            for team in jury_teams:
+                if team['team_id'] != 99:  # Skip static team
+                    assignment_weights[(match['match_id'], team['team_id'])] = rng.randint(1, 10)
+            # Interchangeable teams share their weights so the objective cannot tell them apart either
+            for team_ids in symmetry_classes:
+                for team_id in team_ids[1:]:
+                    assignment_weights[(match['match_id'], team_id)] = assignment_weights[(match['match_id'], team_ids[0])]
+
+        # Calculate randomization penalty
+        randomization_terms = []
+        for (match_id, team_id), var in assignment_vars.items():
+            if team_id != 99:  # Skip static team
+                randomization_terms.append(assignment_weights[(match_id, team_id)] * var)
+    # One term per free pair, nothing to deduplicate
+    builder.stats['randomization']['terms'] += len(randomization_terms)
+
+    builder.deduplicate()
+    builder.report()
+    build_time = time.perf_counter() - build_started
+    if build_report:
+        presolve = presolve_statistics(model, time_limit)
+
+    objective_mode = objective_mode or season_objective_mode
+    policy = (stopping_policy or season_stopping_policy).with_time_limit(time_limit)
+    if objective_mode == 'staged':
+        # Proximity keeps its 2:1 ratio to the random term without the 0.5 float coefficient
+        stage_limits = stage_time_limits or [time_limit] * 3
+        stages = [
+            ('soft constraints', sum(soft_constraints), stage_limits[0]),
+            ('points difference', points_difference, stage_limits[1]),
+            ('tie-break', sum(proximity_penalties) * 2 + sum(randomization_terms), stage_limits[2]),
+        ]
+        solver, status, outcome = solve_in_stages(
+            model, stages, assignment_vars.literals(), hint_mode, seed, num_workers,
+            lambda: AssignmentDebugCallback(assignment_vars, index.matches_by_day, non_static_jury_teams, plan_interval=plan_interval),
+            policy)
+    else:
+        # Objective: Minimize point difference and soft constraint violations
+        model.Minimize(points_difference * 1 + sum(soft_constraints) * 100 + sum(proximity_penalties) * 1 + sum(randomization_terms) * 0.5)
+
+        # Solve the model
+        solver = create_solver(time_limit, hint_mode, seed, num_workers)
+        callback = AssignmentDebugCallback(assignment_vars, index.matches_by_day, non_static_jury_teams, plan_interval=plan_interval)
+        status, outcome = policy.solve(solver, model, callback)
+        logging.info(f"Solver reported {len(callback.progress)} improving solutions")
     
     # Print the solution
     if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
@@ -1248,6 +1906,7 @@ def assign_jury_teams_to_matches(home_matches, away_matches, jury_teams, static_
         #print(solver.Value(assignment_vars))
         for match in home_matches:
             for team in jury_teams:
+                # Locked pairs read back as their constant
                 if solver.Value(assignment_vars[(match['match_id'], team['team_id'])]) == 1:
                     assignments.append({
                         'match_id': match['match_id'],
@@ -1271,6 +1930,8 @@ def assign_jury_teams_to_matches(home_matches, away_matches, jury_teams, static_
         print("FEASIBLE - A feasible solution has been found, but it may not be optimal.")
     elif status == cp_model.INFEASIBLE:
         print("INFEASIBLE - The problem has been proven infeasible.")
+        if diagnose:
+            diagnose_infeasibility(model, builder, assignment_vars, index, time_limit)
     elif status == cp_model.MODEL_INVALID:
         print("MODEL_INVALID - The model is invalid.")
     else:
@@ -1280,16 +1941,43 @@ def assign_jury_teams_to_matches(home_matches, away_matches, jury_teams, static_
     print(f"Solve time: {solver.WallTime():.2f} seconds")
     print(f"Number of branches explored: {solver.NumBranches()}")
     print(f"Number of conflicts: {solver.NumConflicts()}")
-
+    gap = outcome['final_gap']
+    print(f"Stopped on: {outcome['stop_reason']}" + (f", final gap {gap:.4%}" if gap is not None else ""))
+
+    if build_report:
+        write_build_report(build_report, builder, presolve, {
+            'status': solver.StatusName(status),
+            'objective_mode': objective_mode,
+            'seed': seed,
+            'build_time': build_time,
+            'solve_time': solver.WallTime(),
+            'objective': solver.ObjectiveValue() if status in (cp_model.OPTIMAL, cp_model.FEASIBLE) else None,
+            'points_difference': solver.Value(points_difference) if status in (cp_model.OPTIMAL, cp_model.FEASIBLE) else None,
+            'best_bound': outcome['best_bound'],
+            'first_solution_time': outcome['first_solution_time'],
+            'stop_reason': outcome['stop_reason'],
+            'final_gap': outcome['final_gap'],
+            'branches': solver.NumBranches(),
+            'conflicts': solver.NumConflicts(),
+            'matches': len(home_matches),
+            'jury_teams': len(jury_teams),
+        })
 
      # Process the results
     if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
-        assignments = []
+        # Same weights as the blended objective, minus the random tie-break weights
+        score = (solver.Value(points_difference) + sum(solver.Value(term) for term in soft_constraints) * 100
+                 + sum(solver.Value(term) for term in proximity_penalties))
+        assignments = SolvedPlan(seed=seed, objective=solver.ObjectiveValue(), score=score,
+                                 points_difference=solver.Value(points_difference),
+                                 status=solver.StatusName(status), stop_reason=outcome['stop_reason'],
+                                 gap=outcome['final_gap'])
         for match in home_matches:
             for team in jury_teams:
+                # Locked pairs read back as their constant
                 if solver.Value(assignment_vars[(match['match_id'], team['team_id'])]) == 1:
                     if match['match_id'] in [m['match_id'] for m in home_matches]:
-                        points = solver.Value(point_vars[(match['match_id'], team['team_id'])])
+                        points = match_points[(match['match_id'], team['team_id'])]
                         assignments.append({
                             'match_id': match['match_id'],
                             'date_time': match['date_time'],
@@ -1303,6 +1991,7 @@ def assign_jury_teams_to_matches(home_matches, away_matches, jury_teams, static_
 
         print(f"Total points: {solver.Value(total_points)}")
         print(f"Points difference: {solver.Value(points_difference)}")
+        print(f"Random seed: {seed}")
         print(f"Min total points: {solver.Value(min_total_points)}")
         print(f"Max total points: {solver.Value(max_total_points)}")
  #       print(f"Consecutive match violations: {solver.Value(sum(consecutive_match_violations))}")
@@ -1325,32 +2014,286 @@ def assign_jury_teams_to_matches(home_matches, away_matches, jury_teams, static_
 
 
 
+def group_matches_by_planning_weekend(matches):
+    """Group matches by ISO (year, week), the unit the rolling horizon advances by."""
+    weekends = {}
+    for match in matches:
+        year, week, _ = match['match_date'].isocalendar()
+        weekends.setdefault((year, week), []).append(match)
+    return weekends
+
+
+def assign_jury_teams_rolling_horizon(home_matches, away_matches, jury_teams, static_assignments,
+                                      window_weekends=rolling_window_weekends, overlap_weekends=rolling_overlap_weekends,
+                                      window_time_limit=None, hint_mode=None, plan_interval=None,
+                                      objective_mode=None, stage_time_limits=None, seed=None, num_workers=None,
+                                      point_offsets=None, first_match_id=None, last_match_id=None, stopping_policy=None,
+                                      symmetry_mode=None):
+    """Solve the season in overlapping windows of weekends.
+
+    Each window is a regular season model over its own matches. Assignments of the
+    weekends before the overlap are committed, and the points they earn are carried
+    into the next window as fixed offsets so the fairness objective spans the season.
+    """
+    if overlap_weekends >= window_weekends:
+        raise ValueError("overlap_weekends must be smaller than window_weekends")
+
+    logging.info(f"Rolling horizon: {window_weekends} weekends per window, {overlap_weekends} overlapping")
+    weekend_matches = group_matches_by_planning_weekend(home_matches)
+    away_by_weekend = group_matches_by_planning_weekend(away_matches)
+    weekends = sorted(weekend_matches.keys())
+    step = window_weekends - overlap_weekends
+
+    # The first and last match of the season keep their bonus points in every window
+    if first_match_id is None:
+        first_match_id = home_matches[0]['match_id'] if home_matches else None
+    if last_match_id is None:
+        last_match_id = home_matches[-1]['match_id'] if home_matches else None
+
+    # Window n is solved with seed + n so the whole run is reproducible from one seed
+    seed = resolve_seed(seed)
+    point_offsets = {team['team_id']: (point_offsets or {}).get(team['team_id'], 0) for team in jury_teams if team['team_id'] != 99}
+    committed_assignments = []
+    window_reports = []
+
+    for window_index, window_start in enumerate(range(0, len(weekends), step)):
+        window_keys = weekends[window_start:window_start + window_weekends]
+        is_last_window = window_start + window_weekends >= len(weekends)
+        commit_keys = set(window_keys if is_last_window else window_keys[:step])
+
+        window_matches = [match for key in window_keys for match in weekend_matches[key]]
+        window_away_matches = [match for key in window_keys for match in away_by_weekend.get(key, [])]
+
+        started = time.perf_counter()
+        assignments = assign_jury_teams_to_matches(
+            window_matches, window_away_matches, jury_teams, static_assignments,
+            point_offsets=dict(point_offsets), first_match_id=first_match_id, last_match_id=last_match_id,
+            time_limit=window_time_limit, hint_mode=hint_mode, plan_interval=plan_interval,
+            objective_mode=objective_mode, stage_time_limits=stage_time_limits,
+            seed=seed + window_index, num_workers=num_workers, stopping_policy=stopping_policy,
+            symmetry_mode=symmetry_mode)
+        solve_time = time.perf_counter() - started
+
+        if assignments is None:
+            logging.error(f"Window {window_index + 1} ({window_keys[0]} - {window_keys[-1]}) has no solution, aborting rolling horizon")
+            return None
+
+        commit_match_ids = {match['match_id'] for key in commit_keys for match in weekend_matches[key]}
+        committed = [a for a in assignments if a['match_id'] in commit_match_ids]
+        for assignment in committed:
+            if assignment['team_id'] != 99:
+                point_offsets[assignment['team_id']] += assignment['points']
+        committed_assignments.extend(committed)
+
+        window_reports.append({
+            'window': window_index + 1,
+            'weekends': len(window_keys),
+            'matches': len(window_matches),
+            'committed': len(committed),
+            'solve_time': solve_time,
+        })
+        logging.info(f"Window {window_index + 1}: weeks {window_keys[0]} - {window_keys[-1]}, "
+                     f"{len(window_matches)} matches, {len(committed)} committed, solved in {solve_time:.2f}s")
+
+        if is_last_window:
+            break
+
+    points_spread = max(point_offsets.values()) - min(point_offsets.values()) if point_offsets else 0
+    logging.info("Rolling horizon summary:")
+    for report in window_reports:
+        logging.info(f"  Window {report['window']}: {report['matches']} matches, solve time {report['solve_time']:.2f}s")
+    logging.info(f"  Total solve time: {sum(r['solve_time'] for r in window_reports):.2f}s")
+    logging.info(f"  Global points spread: {points_spread} "
+                 f"(min {min(point_offsets.values(), default=0)}, max {max(point_offsets.values(), default=0)})")
+
+    return SolvedPlan(committed_assignments, seed=seed, points_difference=points_spread, status='ROLLING_HORIZON')
+
+
+def solve_plan_with_seed(job):
+    home_matches, away_matches, jury_teams, static_assignments, seed, solve_options = job
+    return assign_jury_teams_to_matches(home_matches, away_matches, jury_teams, static_assignments,
+                                        seed=seed, **solve_options)
+
+
+def generate_diverse_plans(home_matches, away_matches, jury_teams, static_assignments, plan_count,
+                           seed=None, max_processes=None, **solve_options):
+    """Solve the season with `plan_count` consecutive seeds in a process pool.
+
+    Returns the plans that found a solution, best first by score (the objective
+    without the seed-dependent randomization term) and then points difference.
+    """
+    seed = resolve_seed(seed)
+    cpu_count = os.cpu_count() or 1
+    processes = min(plan_count, max_processes or cpu_count)
+    # Share the cores between the worker processes instead of oversubscribing them
+    solve_options.setdefault('num_workers', max(1, cpu_count // processes))
+
+    jobs = [(home_matches, away_matches, jury_teams, static_assignments, seed + i, solve_options)
+            for i in range(plan_count)]
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        plans = [plan for plan in executor.map(solve_plan_with_seed, jobs) if plan]
+
+    plans.sort(key=lambda plan: (plan.score, plan.points_difference))
+    logging.info(f"Generated {len(plans)} of {plan_count} plans with seeds {seed} - {seed + plan_count - 1}:")
+    for rank, plan in enumerate(plans, 1):
+        logging.info(f"  Plan {rank}: seed {plan.seed}, score {plan.score}, objective {plan.objective:.1f}, "
+                     f"points difference {plan.points_difference} ({plan.status})")
+    return plans
+
+
+def parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d')
+
+
+def split_at_cutoff(data, cutoff):
+    """Split the loaded window into home matches before `cutoff` and the home and away matches to plan."""
+    cutoff_day = cutoff.date()
+    played_matches = [match for match in data.home_matches if match['match_date'] < cutoff_day]
+    home_matches = [match for match in data.home_matches if match['match_date'] >= cutoff_day]
+    away_matches = [match for match in data.away_matches if match['match_date'] >= cutoff_day]
+    return played_matches, home_matches, away_matches
+
+
+def carry_over_points(played_matches, jury_teams, first_match_id=None, last_match_id=None):
+    """Points each jury team earned with the stored assignments of `played_matches`."""
+    points = {team['team_id']: 0 for team in jury_teams if team['team_id'] != 99}
+    for match in played_matches:
+        team_id = match.get('assigned_team')
+        if team_id in points:
+            points[team_id] += get_match_points(match, first_match_id, last_match_id)
+    return points
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Assign jury teams to the home matches of the season')
+    parser.add_argument('--start-date', type=parse_date, default=os.getenv('JURY_PLANNER_START_DATE', default_start_date),
+                        help='First day of the planning window, YYYY-MM-DD (default: $JURY_PLANNER_START_DATE or %(default)s)')
+    parser.add_argument('--end-date', type=parse_date, default=os.getenv('JURY_PLANNER_END_DATE', default_end_date),
+                        help='Last day of the planning window, YYYY-MM-DD (default: $JURY_PLANNER_END_DATE or %(default)s)')
+    parser.add_argument('--replan-from', type=parse_date, nargs='?', const=date.today().isoformat(),
+                        default=os.getenv('JURY_PLANNER_REPLAN_FROM'),
+                        help='Only plan matches from this date on (default today); earlier matches keep their '
+                             'stored assignments and count as carry-over points')
+    parser.add_argument('--rolling-horizon', action='store_true',
+                        help='Solve the season in overlapping windows of weekends instead of one model')
+    parser.add_argument('--window-weekends', type=int, default=rolling_window_weekends,
+                        help='Weekends per rolling-horizon window')
+    parser.add_argument('--overlap-weekends', type=int, default=rolling_overlap_weekends,
+                        help='Weekends re-planned by the next rolling-horizon window')
+    parser.add_argument('--time-limit', type=float, default=None,
+                        help='Hard solver time cap in seconds (per window in rolling-horizon mode, '
+                             f'default {season_stopping_policy.max_time_seconds:g})')
+    parser.add_argument('--relative-gap', type=float, default=season_stopping_policy.relative_gap,
+                        help='Stop once the relative gap between objective and bound is below this (default: off)')
+    parser.add_argument('--absolute-gap', type=float, default=season_stopping_policy.absolute_gap,
+                        help='Stop once the absolute gap between objective and bound is below this')
+    parser.add_argument('--no-improvement', type=float, default=season_stopping_policy.no_improvement_seconds,
+                        metavar='SECONDS', help='Stop after this many seconds without a better plan (0 disables, default %(default)s)')
+    parser.add_argument('--hints', choices=['off', 'as-is', 'repair'], default=solution_hint_mode,
+                        help='Warm-start from stored jury_assignments: off, as-is, or repair conflicting rows first')
+    parser.add_argument('--progress-interval', type=float, default=progress_plan_interval,
+                        help='Minimum seconds between full plan dumps while solving')
+    parser.add_argument('--objective', choices=['blended', 'staged'], default=season_objective_mode,
+                        help='One weighted objective, or staged: soft constraints, then points difference, then tie-break')
+    parser.add_argument('--stage-time-limits', type=float, nargs=3, default=None, metavar=('SOFT', 'FAIRNESS', 'TIEBREAK'),
+                        help='Time limit in seconds for each stage of the staged objective (defaults to --time-limit)')
+    parser.add_argument('--symmetry-breaking', choices=['off', 'points', 'first-assignment'], default=symmetry_breaking_mode,
+                        help='Order interchangeable jury teams by total points or by first assignment, or off (default %(default)s)')
+    parser.add_argument('--seed', type=int, default=os.getenv('JURY_PLANNER_SEED'),
+                        help='Random seed for tie-breaking weights and the solver (default: $JURY_PLANNER_SEED, else random)')
+    parser.add_argument('--plans', type=int, default=1,
+                        help='Solve with this many consecutive seeds in parallel and keep the best plan')
+    parser.add_argument('--diagnose', action='store_true',
+                        help='If the model is infeasible, report a minimal set of conflicting hard constraints per day '
+                             '(builds the model without pruning forbidden pairs)')
+    parser.add_argument('--build-report', nargs='?', const='model_report.json', default=None, metavar='PATH',
+                        help='Write per-family build profile, presolve statistics and solve summary as JSON '
+                             '(default path: %(const)s)')
+    parser.add_argument('--keep-unlocked', action='store_true',
+                        help='Write planned assignments unlocked so the next run may still change them')
+    args = parser.parse_args()
+    if args.end_date < args.start_date:
+        parser.error('--end-date lies before --start-date')
+    if args.plans > 1 and args.rolling_horizon:
+        parser.error('--plans cannot be combined with --rolling-horizon')
+    return args
+
+
 def main():
+    args = parse_arguments()
+    stopping_policy = StoppingPolicy(relative_gap=args.relative_gap, absolute_gap=args.absolute_gap,
+                                     no_improvement_seconds=args.no_improvement or None,
+                                     max_time_seconds=season_stopping_policy.max_time_seconds)
     env_vars = load_env_variables()
     connection = get_database_connection(env_vars)
 
-    start_date = datetime(2024,9, 1)
-    end_date = datetime(2025,4,30)
-
-
-
-    #end_date = start_date + timedelta(days=200)
-
-    home_matches,away_matches  = fetch_matches(connection, start_date, end_date)
-    static_assignments = get_static_assignments(connection)
-    jury_teams = get_jury_teams(connection)
-
-      # Set the maximum number of assignments per day
-
-
-    assignments = assign_jury_teams_to_matches(home_matches, away_matches, jury_teams, static_assignments)
+    # The whole window is loaded so matches before the cutoff still count for fairness
+    data = load_planning_data(connection, args.start_date, args.end_date.replace(hour=23, minute=59, second=59))
+    static_assignments = data.static_assignments
+    jury_teams = data.jury_teams
+    fairness_options = {}
+    if data.home_matches:
+        fairness_options['first_match_id'] = data.home_matches[0]['match_id']
+        fairness_options['last_match_id'] = data.home_matches[-1]['match_id']
+
+    if args.replan_from:
+        played_matches, home_matches, away_matches = split_at_cutoff(data, args.replan_from)
+        fairness_options['point_offsets'] = carry_over_points(played_matches, jury_teams, **fairness_options)
+        logging.info(f"Re-planning {len(home_matches)} matches from {args.replan_from:%Y-%m-%d}, "
+                     f"carrying over points of {len(played_matches)} earlier matches")
+    else:
+        home_matches, away_matches = data.home_matches, data.away_matches
+
+    if not home_matches:
+        print("No matches to plan in the planning window.")
+        connection.close()
+        return
+
+    if args.plans > 1:
+        plans = generate_diverse_plans(home_matches, away_matches, jury_teams, static_assignments, args.plans,
+                                       seed=args.seed, time_limit=args.time_limit, hint_mode=args.hints,
+                                       plan_interval=args.progress_interval,
+                                       objective_mode=args.objective,
+                                       stage_time_limits=args.stage_time_limits,
+                                       stopping_policy=stopping_policy,
+                                       symmetry_mode=args.symmetry_breaking,
+                                       **fairness_options)
+        print("\nAlternative plans:")
+        for rank, plan in enumerate(plans, 1):
+            print(f"{rank}. seed {plan.seed}: score {plan.score}, objective {plan.objective:.1f}, points difference {plan.points_difference}")
+        assignments = plans[0] if plans else None
+    elif args.rolling_horizon:
+        assignments = assign_jury_teams_rolling_horizon(home_matches, away_matches, jury_teams, static_assignments,
+                                                        window_weekends=args.window_weekends,
+                                                        overlap_weekends=args.overlap_weekends,
+                                                        window_time_limit=args.time_limit,
+                                                        hint_mode=args.hints,
+                                                        plan_interval=args.progress_interval,
+                                                        objective_mode=args.objective,
+                                                        stage_time_limits=args.stage_time_limits,
+                                                        stopping_policy=stopping_policy,
+                                                        symmetry_mode=args.symmetry_breaking,
+                                                        seed=args.seed,
+                                                        **fairness_options)
+    else:
+        assignments = assign_jury_teams_to_matches(home_matches, away_matches, jury_teams, static_assignments,
+                                                   time_limit=args.time_limit, hint_mode=args.hints,
+                                                   plan_interval=args.progress_interval,
+                                                   objective_mode=args.objective,
+                                                   stage_time_limits=args.stage_time_limits,
+                                                   seed=args.seed, diagnose=args.diagnose,
+                                                   build_report=args.build_report,
+                                                   stopping_policy=stopping_policy,
+                                                   symmetry_mode=args.symmetry_breaking,
+                                                   **fairness_options)
 
     if assignments:
-        print("\nAssigned Matches:")
+        print(f"\nAssigned Matches (seed {assignments.seed}):")
         for assignment in assignments:
             print(f"Match {assignment['match_id']} on {assignment['date_time']}: {assignment['home_team']} vs {assignment['away_team']} - Assigned to {assignment['assigned_team']}")
         # Insert assignments into the database
-        insert_assignments_to_database(assignments, connection)
+        insert_assignments_to_database(assignments, connection, data.existing_assignments,
+                                       lock_assignments=not args.keep_unlocked)
     else:
         print("No valid assignment found.")    
 